@@ -0,0 +1,119 @@
+"""Action execution on a dedicated thread, independent of the GUI event loop."""
+import threading
+import time
+from typing import Callable, Optional
+
+from latency import LatencyRecorder
+from scheduler import FrameScheduler
+
+
+class DirectInputBackend:
+    """Sends mouse and keyboard input through pydirectinput.
+
+    pydirectinput is imported by load() or by the first action, so creating the
+    backend costs nothing at startup.
+    """
+
+    def __init__(self):
+        self._input = None
+
+    def load(self):
+        """Import pydirectinput now, from any thread, so the first action does not wait for it."""
+        if self._input is None:
+            import pydirectinput
+            self._input = pydirectinput
+        return self._input
+
+    def click(self):
+        (self._input or self.load()).click()
+
+    def press(self, key: str):
+        (self._input or self.load()).press(key)
+
+
+class NullActionBackend:
+    """Counts actions instead of sending them, for headless runs and benchmarks."""
+
+    def __init__(self):
+        self.click_count = 0
+        self.last_click_ns = None
+        self.presses = {}
+
+    def click(self):
+        self.last_click_ns = time.perf_counter_ns()
+        self.click_count += 1
+
+    def press(self, key: str):
+        self.presses[key] = self.presses.get(key, 0) + 1
+
+
+class ClickExecutor(threading.Thread):
+    """Clicks at a precise interval on its own thread while active.
+
+    The detector switches clicking on and off with activate() and deactivate().
+    These only flip a flag and set an event, so they never block the caller. The
+    first click after each activation is recorded in the latency recorder against
+    the timestamps passed to activate().
+    """
+
+    SPIN_NS = 200_000
+
+    def __init__(self, click: Callable[[], None], interval_ms: int = 30,
+                 recorder: Optional[LatencyRecorder] = None):
+        super().__init__(name="ClickExecutor", daemon=True)
+        self.click = click
+        self.scheduler = FrameScheduler(1000 / interval_ms, spin_ns=self.SPIN_NS)
+        self.recorder = recorder or LatencyRecorder()
+        self.active = False
+        self.detected_ns = None
+        self.captured_ns = None
+        self._running = True
+        self._wake = threading.Event()
+
+    def set_interval(self, interval_ms: int):
+        """Change the delay between clicks; takes effect from the next click."""
+        self.scheduler.set_rate(1000 / interval_ms)
+
+    def activate(self, detected_ns: Optional[int] = None, captured_ns: Optional[int] = None):
+        """Start clicking.
+
+        detected_ns and captured_ns are the perf_counter_ns times at which the
+        triggering frame finished analysis and started capture.
+        """
+        if self.active:
+            return
+        self.detected_ns = detected_ns
+        self.captured_ns = captured_ns
+        self.active = True
+        self._wake.set()
+
+    def deactivate(self):
+        """Stop clicking after the click in progress, if any."""
+        self.active = False
+
+    def shutdown(self):
+        """Stop the thread."""
+        self._running = False
+        self.active = False
+        self._wake.set()
+
+    def run(self):
+        """Idle until activated, then click on every scheduler deadline until deactivated."""
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+
+            # The first wait returns immediately so the first click is not delayed
+            self.scheduler.reset()
+            while self.active and self._running:
+                self.scheduler.wait()
+                if not self.active:
+                    break
+                self.click()
+                if self.detected_ns is not None:
+                    clicked_ns = time.perf_counter_ns()
+                    self.recorder.record("click", clicked_ns - self.detected_ns)
+                    if self.captured_ns is not None:
+                        self.recorder.record("total", clicked_ns - self.captured_ns)
+                    self.detected_ns = None
+                    self.captured_ns = None
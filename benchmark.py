@@ -0,0 +1,134 @@
+"""Headless benchmarks for the detection pipeline.
+
+Runs without a display, mouse or keyboard: frames come from a synthetic capture
+source and clicks go to a null action backend. --capture instead times the real
+capture backends on the current display, which can be a virtual one.
+
+Run with: python benchmark.py [--frames N] [--size PX]
+          python benchmark.py --capture [--region LEFT,TOP,WIDTH,HEIGHT] [--grabs N]
+          xvfb-run python benchmark.py --capture
+"""
+import argparse
+import time
+
+import numpy as np
+
+from actions import ClickExecutor, NullActionBackend
+from capture import (SyntheticCapture, benchmark_backends, fastest_backend, format_timings, noise_frames,
+                     solid_frame, static_frames, step_frames)
+from detection import detect_change
+from engine import DetectionEngine, RegionConfig
+from latency import LatencyRecorder
+
+REGION_SIZES = (4, 8, 16, 32, 64, 128, 256, 384, 512)
+BASE_COLOR = (40, 40, 40)
+CHANGED_COLOR = (220, 30, 30)
+TOLERANCE = 20
+THRESHOLD_PERCENT = 2.0
+
+
+def time_frame(frame: np.ndarray, iterations: int, scan_order: str = "center") -> float:
+    """Returns the mean time per detect_change call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        detect_change(frame, BASE_COLOR, TOLERANCE, THRESHOLD_PERCENT, scan_order=scan_order)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run_region_sizes(iterations: int = 200):
+    """Prints the frame time for a static region and a fully changed region at each size.
+
+    The last column is a static region scanned coarse-to-fine.
+    """
+    print(f"{'Region':>10} {'Static (us)':>12} {'Changed (us)':>13} {'Pyramid (us)':>13}")
+    for size in REGION_SIZES:
+        static = solid_frame(size, size, BASE_COLOR)
+        static_us = time_frame(static, iterations)
+        changed_us = time_frame(solid_frame(size, size, CHANGED_COLOR), iterations)
+        pyramid_us = time_frame(static, iterations, "pyramid")
+        print(f"{size:>4}x{size:<5} {static_us:>12.1f} {changed_us:>13.1f} {pyramid_us:>13.1f}")
+
+
+def run_scenario(name: str, frame_source, frames: int, size: int, step_at: int = None):
+    """Runs the engine unpaced over a synthetic source and prints throughput and latency."""
+    actions = NullActionBackend()
+    recorder = LatencyRecorder()
+    executor = ClickExecutor(actions.click, interval_ms=1, recorder=recorder)
+    executor.start()
+    region = RegionConfig((0, 0, size, size), BASE_COLOR, TOLERANCE, THRESHOLD_PERCENT)
+    engine = DetectionEngine(SyntheticCapture(frame_source), [region], [executor], recorder=recorder)
+
+    step_capture_ns = None
+    detected_frame = None
+    detected_ns = None
+    start = time.perf_counter_ns()
+    for index in range(frames):
+        engine.step()
+        if index == step_at:
+            step_capture_ns = engine.capture_ns
+        if engine.active and detected_frame is None:
+            detected_frame = index
+            detected_ns = engine.analysis_ns
+    elapsed_ns = time.perf_counter_ns() - start
+
+    # Give the executor a moment to send its first click
+    time.sleep(0.01)
+    executor.shutdown()
+    executor.join()
+
+    summary = recorder.summary()
+    fps = frames / (elapsed_ns / 1e9)
+    line = (f"{name:<8} {fps:>10.0f} {summary['analysis']['p50']:>10.1f} "
+            f"{summary['analysis']['p99']:>10.1f}")
+    if step_at is not None and detected_frame is not None and step_capture_ns is not None:
+        latency_us = (detected_ns - step_capture_ns) / 1000
+        click_us = summary["total"]["p50"]
+        line += f" {detected_frame - step_at:>8d} {latency_us:>10.1f}"
+        line += f" {click_us:>10.1f}" if click_us is not None else f" {'-':>10}"
+    elif step_at is not None:
+        line += f" {'missed':>8}"
+    print(line)
+
+
+def run_scenarios(frames: int, size: int):
+    """Runs the static, noise and step-change scenarios."""
+    print(f"\n{size}x{size} region, {frames} frames")
+    print(f"{'Scenario':<8} {'FPS':>10} {'p50 (us)':>10} {'p99 (us)':>10} "
+          f"{'Frames':>8} {'Detect us':>10} {'Click us':>10}")
+    run_scenario("static", static_frames(BASE_COLOR), frames, size)
+    run_scenario("noise", noise_frames(), frames, size)
+    step_at = frames // 2
+    run_scenario("step", step_frames(BASE_COLOR, CHANGED_COLOR, step_at), frames, size, step_at=step_at)
+
+
+def run_capture_backends(region, grabs: int):
+    """Times every capture backend on the display and prints which one would be picked."""
+    timings = benchmark_backends(region, grabs)
+    print(f"{region[2]}x{region[3]} region at ({region[0]}, {region[1]}), {grabs} grabs per backend")
+    print(format_timings(timings))
+    fastest = fastest_backend(timings)
+    print(f"Selected: {fastest}" if fastest else "No capture backend works on this display")
+    return fastest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless detection benchmarks")
+    parser.add_argument("--frames", type=int, default=2000, help="Frames per scenario")
+    parser.add_argument("--size", type=int, default=16, help="Region width and height in pixels")
+    parser.add_argument("--capture", action="store_true", help="Time the screen capture backends instead")
+    parser.add_argument("--region", default="0,0,64,64", help="Region for --capture as LEFT,TOP,WIDTH,HEIGHT")
+    parser.add_argument("--grabs", type=int, default=100, help="Timed grabs per backend for --capture")
+    args = parser.parse_args()
+
+    if args.capture:
+        try:
+            # Lets the Qt backend take part when PySide6 is installed
+            from PySide6.QtGui import QGuiApplication
+            app = QGuiApplication([])
+        except ImportError:
+            pass
+        if run_capture_backends(tuple(int(v) for v in args.region.split(",")), args.grabs) is None:
+            raise SystemExit(1)
+    else:
+        run_region_sizes()
+        run_scenarios(args.frames, args.size)
@@ -0,0 +1,469 @@
+"""Capture backends that return screen regions as BGRA NumPy frames.
+
+A backend provides grab(region) -> (height, width, 4) uint8 array and close().
+Regions are (left, top, width, height) tuples in screen pixels. A backend that
+cannot work here (missing library, no display) raises ImportError or OSError
+from its constructor. The alpha channel carries no information.
+"""
+import ctypes
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from detection import frame_from_grab
+
+Region = Tuple[int, int, int, int]
+
+
+class MssCapture:
+    """Grabs screen regions with mss. Create it on the thread that will use it."""
+
+    def __init__(self):
+        import mss
+        self.sct = mss.mss()
+
+    def grab(self, region: Region) -> np.ndarray:
+        left, top, width, height = region
+        img = self.sct.grab({"left": left, "top": top, "width": width, "height": height})
+        return frame_from_grab(img)
+
+    def monitors(self) -> List[Region]:
+        """Returns each monitor's rectangle in physical pixels."""
+        return [(m["left"], m["top"], m["width"], m["height"]) for m in self.sct.monitors[1:]]
+
+    def close(self):
+        self.sct.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _XImage(ctypes.Structure):
+    # The leading fields of Xlib's XImage, up to the ones needed here
+    _fields_ = [("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+                ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+                ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int), ("bitmap_pad", ctypes.c_int),
+                ("depth", ctypes.c_int), ("bytes_per_line", ctypes.c_int), ("bits_per_pixel", ctypes.c_int)]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int), ("shmaddr", ctypes.c_void_p),
+                ("readOnly", ctypes.c_int)]
+
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+_x_errors = []
+
+
+@_X_ERROR_HANDLER
+def _record_x_error(display, event):
+    # Xlib's default handler exits the process; note the error and let the caller raise instead
+    _x_errors.append(event)
+    return 0
+
+
+class XShmCapture:
+    """Grabs screen regions through the X11 MIT-SHM extension, on Linux.
+
+    The X server writes pixels straight into a shared memory segment instead of
+    sending them over the socket. A segment is kept for each of the last few
+    regions grabbed, and grab() returns a view into it that the next grab of the
+    same region overwrites; copy the frame to keep it.
+    """
+
+    CACHED_REGIONS = 4
+    ZPIXMAP = 2
+    ALL_PLANES = 0xFFFFFFFF
+    IPC_PRIVATE, IPC_CREAT, IPC_RMID = 0, 0o1000, 0
+
+    def __init__(self, display_name: Optional[str] = None):
+        if not sys.platform.startswith("linux"):
+            raise OSError("XShm capture is only available on Linux")
+        # Imported here as it pulls in subprocess and shutil, which the other backends never need
+        import ctypes.util
+        names = [ctypes.util.find_library(name) for name in ("X11", "Xext", "c")]
+        if not all(names):
+            raise OSError("XShm capture needs libX11 and libXext")
+        x11, xext, libc = (ctypes.CDLL(name, use_errno=True) for name in names)
+        self.x11, self.xext, self.libc = x11, xext, libc
+
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        for function in ("XDefaultScreen", "XCloseDisplay"):
+            getattr(x11, function).argtypes = [ctypes.c_void_p]
+        x11.XRootWindow.restype = ctypes.c_ulong
+        x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XFree.argtypes = [ctypes.c_void_p]
+        x11.XSetErrorHandler.restype = ctypes.c_void_p
+        x11.XSetErrorHandler.argtypes = [_X_ERROR_HANDLER]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                         ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo),
+                                         ctypes.c_uint, ctypes.c_uint]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                                      ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+        self.display = x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise OSError("Cannot open the X display")
+        if not xext.XShmQueryExtension(self.display):
+            x11.XCloseDisplay(self.display)
+            raise OSError("The X server does not support MIT-SHM")
+        x11.XSetErrorHandler(_record_x_error)
+        screen = x11.XDefaultScreen(self.display)
+        self.root = x11.XRootWindow(self.display, screen)
+        self.visual = x11.XDefaultVisual(self.display, screen)
+        self.depth = x11.XDefaultDepth(self.display, screen)
+        # region -> (image, segment info, frame view), least recently used first
+        self._images: "OrderedDict[Region, tuple]" = OrderedDict()
+
+    def _check_errors(self, action: str):
+        self.x11.XSync(self.display, 0)
+        if _x_errors:
+            _x_errors.clear()
+            raise OSError(f"X error while {action}")
+
+    def _attach(self, width: int, height: int) -> tuple:
+        info = _XShmSegmentInfo()
+        image = self.xext.XShmCreateImage(self.display, self.visual, self.depth, self.ZPIXMAP, None,
+                                          ctypes.byref(info), width, height)
+        if not image:
+            raise OSError("XShmCreateImage failed")
+        if image.contents.bits_per_pixel != 32:
+            self.x11.XFree(image)
+            raise OSError(f"XShm capture needs a 32-bit visual, not {image.contents.bits_per_pixel}-bit")
+        stride = image.contents.bytes_per_line
+        size = stride * height
+        info.shmid = self.libc.shmget(self.IPC_PRIVATE, size, self.IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            self.x11.XFree(image)
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        address = self.libc.shmat(info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            self.libc.shmctl(info.shmid, self.IPC_RMID, None)
+            self.x11.XFree(image)
+            raise OSError(ctypes.get_errno(), "shmat failed")
+        info.shmaddr = image.contents.data = address
+        info.readOnly = 0
+        self.xext.XShmAttach(self.display, ctypes.byref(info))
+        try:
+            self._check_errors("attaching shared memory")
+        except OSError:
+            self.libc.shmdt(address)
+            image.contents.data = None
+            self.x11.XFree(image)
+            raise
+        finally:
+            # Marked for removal now, the segment goes away once both sides detach
+            self.libc.shmctl(info.shmid, self.IPC_RMID, None)
+        buffer = (ctypes.c_uint8 * size).from_address(address)
+        frame = np.frombuffer(buffer, dtype=np.uint8).reshape(height, stride)[:, :width * 4]
+        return image, info, frame.reshape(height, width, 4)
+
+    def _release(self, image, info):
+        self.xext.XShmDetach(self.display, ctypes.byref(info))
+        self.x11.XSync(self.display, 0)
+        self.libc.shmdt(info.shmaddr)
+        # The pixel data was ours, so only the XImage struct itself is freed
+        image.contents.data = None
+        self.x11.XFree(image)
+
+    def grab(self, region: Region) -> np.ndarray:
+        region = tuple(region)
+        entry = self._images.get(region)
+        if entry is None:
+            entry = self._images[region] = self._attach(region[2], region[3])
+            if len(self._images) > self.CACHED_REGIONS:
+                _, (old_image, old_info, _) = self._images.popitem(last=False)
+                self._release(old_image, old_info)
+        else:
+            self._images.move_to_end(region)
+        image, _, frame = entry
+        if not self.xext.XShmGetImage(self.display, self.root, image, region[0], region[1], self.ALL_PLANES):
+            _x_errors.clear()
+            raise OSError(f"XShmGetImage failed for {region}; is it inside the screen?")
+        return frame
+
+    def close(self):
+        if not self.display:
+            return
+        for image, info, _ in self._images.values():
+            self._release(image, info)
+        self._images.clear()
+        self.x11.XCloseDisplay(self.display)
+        self.display = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class QtCapture:
+    """Grabs screen regions with QScreen.grabWindow; needs a running QGuiApplication.
+
+    Regions are physical pixels; each is grabbed from the screen it starts on,
+    which Qt addresses in logical units from the screen's origin.
+    """
+
+    def __init__(self):
+        from PySide6.QtGui import QGuiApplication, QImage
+        if QGuiApplication.instance() is None:
+            raise OSError("Qt capture needs a QGuiApplication")
+        self.app = QGuiApplication
+        self.image_format = QImage.Format_RGB32
+
+    def grab(self, region: Region) -> np.ndarray:
+        left, top, width, height = region
+        for screen in self.app.screens():
+            geometry, scale = screen.geometry(), screen.devicePixelRatio()
+            if (geometry.x() <= left < geometry.x() + geometry.width() * scale
+                    and geometry.y() <= top < geometry.y() + geometry.height() * scale):
+                break
+        else:
+            screen = self.app.primaryScreen()
+            geometry, scale = screen.geometry(), screen.devicePixelRatio()
+        pixmap = screen.grabWindow(0, round((left - geometry.x()) / scale), round((top - geometry.y()) / scale),
+                                   max(1, round(width / scale)), max(1, round(height / scale)))
+        if pixmap.isNull():
+            raise OSError(f"QScreen.grabWindow returned nothing for {region}")
+        image = pixmap.toImage().convertToFormat(self.image_format)
+        if (image.width(), image.height()) != (width, height):
+            image = image.scaled(width, height)
+        # RGB32 is 0xffRRGGBB per pixel, which is BGRA in little-endian memory
+        rows = np.frombuffer(image.constBits(), dtype=np.uint8).reshape(height, image.bytesPerLine())
+        return rows[:, :width * 4].reshape(height, width, 4).copy()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Tried in this order; on a tie the earlier one wins
+BACKENDS: Dict[str, Callable] = {"mss": MssCapture, "xshm": XShmCapture, "qt": QtCapture}
+
+
+@dataclass
+class BackendTiming:
+    """How long one backend took per grab, or why it could not run."""
+    name: str
+    median_us: Optional[float] = None
+    p99_us: Optional[float] = None
+    error: str = ""
+
+
+def benchmark_backends(region: Region, grabs: int = 30,
+                       names: Optional[Sequence[str]] = None) -> List[BackendTiming]:
+    """Times grabs of region with each backend, opening and closing them on the calling thread.
+
+    Call it from the thread that will capture, since some grabbers behave
+    differently across threads. Each backend gets one untimed warm-up grab.
+    """
+    timings = []
+    for name in names or BACKENDS:
+        try:
+            backend = BACKENDS[name]()
+        # Backends fail in library-specific ways (mss raises its own ScreenShotError)
+        except Exception as e:
+            timings.append(BackendTiming(name, error=str(e) or type(e).__name__))
+            continue
+        try:
+            backend.grab(region)
+            samples = np.empty(grabs, dtype=np.int64)
+            for index in range(grabs):
+                start = time.perf_counter_ns()
+                backend.grab(region)
+                samples[index] = time.perf_counter_ns() - start
+            timings.append(BackendTiming(name, float(np.median(samples)) / 1000,
+                                         float(np.percentile(samples, 99)) / 1000))
+        except Exception as e:
+            timings.append(BackendTiming(name, error=str(e) or type(e).__name__))
+        finally:
+            backend.close()
+    return timings
+
+
+def fastest_backend(timings: Sequence[BackendTiming]) -> Optional[str]:
+    """Returns the name of the backend with the lowest median grab time, or None if none ran."""
+    working = [t for t in timings if t.median_us is not None]
+    return min(working, key=lambda t: t.median_us).name if working else None
+
+
+def format_timings(timings: Sequence[BackendTiming]) -> str:
+    """One line per backend, fastest first, failures last."""
+    lines = []
+    for timing in sorted(timings, key=lambda t: (t.median_us is None, t.median_us or 0)):
+        if timing.median_us is None:
+            lines.append(f"{timing.name:<5} unavailable: {timing.error}")
+        else:
+            lines.append(f"{timing.name:<5} p50 {timing.median_us:8.1f} us  p99 {timing.p99_us:8.1f} us")
+    return "\n".join(lines)
+
+
+class CaptureService:
+    """Keeps capture backends open across detector start/stop cycles.
+
+    Screen grabbers are not safe to share between threads, so one backend is
+    created lazily per thread and then reused for every later grab on that thread,
+    whether it comes from the detector or the color picker. Backends are only
+    closed when the service is, or by their own thread after set_backend().
+    """
+
+    def __init__(self, backend_factory: Callable = MssCapture):
+        self.backend_factory = backend_factory
+        self._local = threading.local()
+        self._backends = []
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def backend(self):
+        """Returns the calling thread's backend, creating it on first use."""
+        local = self._local
+        backend = getattr(local, "backend", None)
+        if backend is None or local.generation != self._generation:
+            with self._lock:
+                if backend is not None:
+                    self._backends.remove(backend)
+                    backend.close()
+                local.generation = self._generation
+                backend = local.backend = self.backend_factory()
+                self._backends.append(backend)
+        return backend
+
+    def grab(self, region: Region) -> np.ndarray:
+        return self.backend().grab(region)
+
+    def set_backend(self, backend_factory: Callable):
+        """Switch to another kind of backend, from any thread.
+
+        Each thread closes its old backend and opens the new kind on its next
+        grab, so a running detector switches between two frames. Choosing the
+        backend already in use changes nothing.
+        """
+        with self._lock:
+            if backend_factory is self.backend_factory:
+                return
+            self.backend_factory = backend_factory
+            self._generation += 1
+
+    def monitors(self) -> List[Region]:
+        """Returns the physical monitor rectangles, or an empty list if the backend cannot tell."""
+        backend = self.backend()
+        return backend.monitors() if hasattr(backend, "monitors") else []
+
+    def pixel(self, x: int, y: int) -> Tuple[int, int, int]:
+        """Returns the RGB color of one screen pixel."""
+        b, g, r = self.grab((x, y, 1, 1))[0, 0, :3]
+        return int(r), int(g), int(b)
+
+    def warm(self, region: Region):
+        """Grab once so the calling thread's handle and buffers are set up before they are needed."""
+        self.grab(region)
+
+    def close(self):
+        """Close every backend the service has opened."""
+        with self._lock:
+            backends, self._backends = self._backends, []
+        for backend in backends:
+            backend.close()
+        self._local = threading.local()
+
+
+class SyntheticCapture:
+    """Serves scripted frames in place of the screen, for headless benchmarks.
+
+    frame_source(index, width, height) returns the BGRA frame for each grab.
+    """
+
+    def __init__(self, frame_source: Callable[[int, int, int], np.ndarray]):
+        self.frame_source = frame_source
+        self.frame_index = 0
+
+    def grab(self, region: Region) -> np.ndarray:
+        _, _, width, height = region
+        frame = self.frame_source(self.frame_index, width, height)
+        self.frame_index += 1
+        return frame
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solid_frame(width: int, height: int, color: Tuple[int, int, int]) -> np.ndarray:
+    """Returns a BGRA frame filled with an RGB color."""
+    frame = np.empty((height, width, 4), dtype=np.uint8)
+    frame[...] = (color[2], color[1], color[0], 255)
+    return frame
+
+
+def static_frames(color: Tuple[int, int, int]) -> Callable[[int, int, int], np.ndarray]:
+    """Frame source that always shows the same solid color."""
+    cache = {}
+
+    def source(index: int, width: int, height: int) -> np.ndarray:
+        if (width, height) not in cache:
+            cache[(width, height)] = solid_frame(width, height, color)
+        return cache[(width, height)]
+    return source
+
+
+def noise_frames(seed: int = 0, pool: int = 8) -> Callable[[int, int, int], np.ndarray]:
+    """Frame source that cycles through a small pool of random-noise frames."""
+    cache = {}
+
+    def source(index: int, width: int, height: int) -> np.ndarray:
+        if (width, height) not in cache:
+            rng = np.random.default_rng(seed)
+            cache[(width, height)] = rng.integers(0, 256, (pool, height, width, 4), dtype=np.uint8)
+        frames = cache[(width, height)]
+        return frames[index % len(frames)]
+    return source
+
+
+def step_frames(before: Tuple[int, int, int], after: Tuple[int, int, int],
+                step_at: int) -> Callable[[int, int, int], np.ndarray]:
+    """Frame source that switches from one solid color to another at frame step_at."""
+    first, second = static_frames(before), static_frames(after)
+
+    def source(index: int, width: int, height: int) -> np.ndarray:
+        return (first if index < step_at else second)(index, width, height)
+    return source
+
+
+def sequence_frames(frames: Sequence[np.ndarray]) -> Callable[[int, int, int], np.ndarray]:
+    """Frame source that replays a fixed sequence of frames, holding the last one."""
+    def source(index: int, width: int, height: int) -> np.ndarray:
+        return frames[min(index, len(frames) - 1)]
+    return source
@@ -0,0 +1,881 @@
+"""Vectorized detection kernels that operate directly on raw BGRA screen grabs."""
+import itertools
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def frame_from_grab(img) -> np.ndarray:
+    """Returns a (height, width, 4) BGRA view over an mss grab without copying it."""
+    return np.frombuffer(img.raw, dtype=np.uint8).reshape(img.height, img.width, 4)
+
+
+def count_mismatches(frame: np.ndarray, base_color: Tuple[int, int, int], tolerance: int) -> int:
+    """Counts the pixels whose RGB distance from the base color exceeds the tolerance.
+
+    Squared distances are compared against tolerance**2 for the whole region at
+    once, which gives the same answer as the per-pixel Euclidean check without a
+    square root per pixel.
+    """
+    r, g, b = base_color
+    # The grab is BGRA, so the base color is laid out the same way
+    diff = frame[..., :3].astype(np.int32) - np.array((b, g, r), dtype=np.int32)
+    dist_sq = np.einsum("...c,...c->...", diff, diff)
+    return int(np.count_nonzero(dist_sq > tolerance * tolerance))
+
+
+def palette_distance_sq(frame: np.ndarray, colors: Tuple[Tuple[int, int, int], ...]) -> np.ndarray:
+    """Returns each BGR(A) pixel's squared RGB distance to the nearest of colors."""
+    palette = np.array([color[::-1] for color in colors], dtype=np.int32)
+    diff = frame[..., None, :3].astype(np.int32) - palette
+    return np.einsum("...kc,...kc->...k", diff, diff).min(axis=-1)
+
+
+MATCH_MODES = ("rgb", "box", "hsv", "lab")
+
+# Color tables quantize each channel to 5 bits: 32768 entries indexed by RRRRRGGGGGBBBBB
+TABLE_BITS = 5
+TABLE_SHIFT = 8 - TABLE_BITS
+# Bumped whenever tables are compiled differently, so tables cached on disk by an older version are rebuilt
+TABLE_FORMAT = 3
+
+
+def table_bins() -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the lowest and highest (32768, 3) RGB colors of each color table bin."""
+    levels = np.arange(1 << TABLE_BITS) << TABLE_SHIFT
+    r, g, b = np.meshgrid(levels, levels, levels, indexing="ij")
+    low = np.stack((r.ravel(), g.ravel(), b.ravel()), axis=1).astype(np.float64)
+    return low, low + (1 << TABLE_SHIFT) - 1
+
+
+def rgb_to_hsv(rgb: np.ndarray) -> np.ndarray:
+    """Converts (..., 3) RGB in 0-255 to HSV with hue in degrees and saturation/value in 0-1."""
+    rgb = rgb / 255.0
+    high = rgb.max(axis=-1)
+    low = rgb.min(axis=-1)
+    delta = high - low
+    safe = np.where(delta == 0, 1, delta)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    hue = np.select(
+        [delta == 0, high == r, high == g],
+        [0.0, ((g - b) / safe) % 6, (b - r) / safe + 2],
+        (r - g) / safe + 4,
+    ) * 60
+    saturation = np.where(high == 0, 0, delta / np.where(high == 0, 1, high))
+    return np.stack((hue, saturation, high), axis=-1)
+
+
+def _lab_f(rgb: np.ndarray) -> np.ndarray:
+    # (..., 3) sRGB in 0-255 to the f(X), f(Y), f(Z) that L*a*b* is made of; each rises with every channel
+    c = rgb / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.array([
+        [0.4124, 0.2126, 0.0193],
+        [0.3576, 0.7152, 0.1192],
+        [0.1805, 0.0722, 0.9505],
+    ])
+    xyz = xyz / np.array([0.95047, 1.0, 1.08883])
+    return np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Converts (..., 3) sRGB in 0-255 to CIE L*a*b* under a D65 white point."""
+    f = _lab_f(rgb)
+    return np.stack((116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])), axis=-1)
+
+
+def to_match_space(colors: np.ndarray, mode: str) -> np.ndarray:
+    """Converts (..., 3) RGB colors into the color space a match mode compares in."""
+    if mode in ("rgb", "box"):
+        return np.asarray(colors, dtype=np.float64)
+    if mode == "hsv":
+        return rgb_to_hsv(np.asarray(colors, dtype=np.float64))
+    if mode == "lab":
+        return rgb_to_lab(np.asarray(colors, dtype=np.float64))
+    raise ValueError(f"Unknown match mode: {mode}")
+
+
+def _mismatch_in_space(points: np.ndarray, base: np.ndarray, tolerance: int, mode: str) -> np.ndarray:
+    if mode in ("rgb", "lab"):
+        return ((points - base) ** 2).sum(axis=-1) > tolerance * tolerance
+    if mode == "box":
+        return (np.abs(points - base) > tolerance).any(axis=-1)
+    hue_diff = np.abs(points[..., 0] - base[0])
+    hue_diff = np.minimum(hue_diff, 360 - hue_diff)
+    # Hue is meaningless for greys, so only compare it when both colors have some saturation
+    chromatic = np.minimum(points[..., 1], base[1]) > 0.1
+    return (chromatic & (hue_diff > tolerance)) | (np.abs(points[..., 1] - base[1]) > tolerance / 100)
+
+
+def mismatch_mask(colors: np.ndarray, base_color: Tuple[int, int, int], tolerance: int, mode: str) -> np.ndarray:
+    """Returns True for each (..., 3) RGB color that does not match the base color under a mode.
+
+    rgb  Euclidean RGB distance above tolerance
+    box  any single channel differs by more than tolerance
+    hsv  hue differs by more than tolerance degrees or saturation by more than tolerance percent
+    lab  CIE76 delta E above tolerance
+    """
+    return _mismatch_in_space(to_match_space(colors, mode), to_match_space(base_color, mode), tolerance, mode)
+
+
+@lru_cache(maxsize=None)
+def _lab_bin_ranges() -> Tuple[np.ndarray, np.ndarray]:
+    # The L*a*b* box around every bin. f(X), f(Y) and f(Z) are monotonic, so the bin's
+    # lowest and highest corners give their ranges and L, a and b follow by interval arithmetic
+    low, high = table_bins()
+    f_low, f_high = _lab_f(low), _lab_f(high)
+    lab_low = np.stack((116 * f_low[:, 1] - 16, 500 * (f_low[:, 0] - f_high[:, 1]),
+                        200 * (f_low[:, 1] - f_high[:, 2])), axis=1)
+    lab_high = np.stack((116 * f_high[:, 1] - 16, 500 * (f_high[:, 0] - f_low[:, 1]),
+                         200 * (f_high[:, 1] - f_low[:, 2])), axis=1)
+    lab_low.setflags(write=False)
+    lab_high.setflags(write=False)
+    return lab_low, lab_high
+
+
+@lru_cache(maxsize=None)
+def _hsv_bin_ranges() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Bounds on the saturation of every color in each bin, from the ranges of its largest
+    # and smallest channel, and the hues of the bin's corners
+    low, high = table_bins()
+    chroma_low = np.maximum(low.max(axis=1) - high.min(axis=1), 0)
+    chroma_high = high.max(axis=1) - low.min(axis=1)
+    saturation_low = chroma_low / high.max(axis=1)
+    saturation_high = np.minimum(1.0, chroma_high / np.maximum(low.max(axis=1), 1))
+    hues = np.stack([
+        rgb_to_hsv(np.where(np.array(pick, dtype=bool), high, low))[..., 0]
+        for pick in itertools.product((False, True), repeat=3)
+    ])
+    for array in (saturation_low, saturation_high, hues):
+        array.setflags(write=False)
+    return saturation_low, saturation_high, hues
+
+
+def _hsv_bin_bound(base: np.ndarray) -> np.ndarray:
+    # A lower bound on the hsv deviation of any color in each bin from base. A bin that
+    # stays off the grey axis spans the hues between its corners' hues, an arc under 180
+    # degrees; one that may hold a color of saturation 0.1 or less may skip the hue test
+    saturation_low, saturation_high, hues = _hsv_bin_ranges()
+    saturation = np.maximum(np.maximum(saturation_low - base[1], base[1] - saturation_high), 0) * 100
+    offsets = (hues - base[0] + 180) % 360 - 180
+    low, high = offsets.min(axis=0), offsets.max(axis=0)
+    inside = (low <= 0) & (high >= 0) & (high - low < 180)
+    hue = np.where(inside, 0.0, np.abs(offsets).min(axis=0))
+    hue = np.where((saturation_low > 0.1) & (base[1] > 0.1), hue, 0.0)
+    return np.maximum(hue, saturation)
+
+
+# Tables compiled in an earlier session, keyed like color_table's arguments
+_preloaded_tables = {}
+
+
+def preload_color_table(base_colors: Tuple[Tuple[int, int, int], ...], tolerance: int, mode: str,
+                        table: np.ndarray):
+    """Installs a previously compiled table so color_table() returns it without rebuilding."""
+    table = np.asarray(table, dtype=bool)
+    if table.shape != (1 << (3 * TABLE_BITS),):
+        raise ValueError(f"A color table needs {1 << (3 * TABLE_BITS)} entries, not {table.size}")
+    table.setflags(write=False)
+    key = (tuple(tuple(int(c) for c in color) for color in base_colors), int(tolerance), mode)
+    _preloaded_tables[key] = table
+
+
+def _bin_deviations(base_colors: Tuple[Tuple[int, int, int], ...], mode: str) -> np.ndarray:
+    # The smallest deviation of any color in each bin from the nearest of base_colors;
+    # for hsv and lab a lower bound of it, so no bin holding a matching color is ever a mismatch
+    low, high = table_bins()
+    deviations = np.full(len(low), np.inf)
+    for color in base_colors:
+        base = to_match_space(color, mode)
+        # The color of each bin nearest the base in RGB; for rgb and box no other color of the bin is closer
+        nearest = np.clip(np.asarray(color, dtype=np.float64), low, high)
+        deviation = _deviation_in_space(to_match_space(nearest, mode), base, mode)
+        if mode == "lab":
+            lab_low, lab_high = _lab_bin_ranges()
+            gap = np.maximum(np.maximum(lab_low - base, base - lab_high), 0)
+            deviation = np.minimum(deviation, np.sqrt((gap ** 2).sum(axis=-1)))
+        elif mode == "hsv":
+            deviation = np.minimum(deviation, _hsv_bin_bound(base))
+        deviations = np.minimum(deviations, deviation)
+    return deviations
+
+
+@lru_cache(maxsize=16)
+def color_table(base_colors: Tuple[Tuple[int, int, int], ...], tolerance: int, mode: str) -> np.ndarray:
+    """Compiles a match mode and a set of allowed colors into a 32768-entry mismatch table.
+
+    A quantized RGB value is a mismatch only if it matches none of base_colors, so
+    classifying a pixel costs one indexed load however many colors are in the set.
+    A bin matches when any color inside it is within tolerance, so the bins
+    holding the allowed colors themselves never mismatch, however low the
+    tolerance; the price is that colors up to a bin width past the tolerance
+    can pass, a little more for hsv and lab, whose bins are bounded
+    conservatively.
+    The table is deviation_table() compared against the tolerance, so a new
+    tolerance costs one vectorized compare, and nothing at all when
+    preload_color_table() supplied the table.
+    """
+    preloaded = _preloaded_tables.get((base_colors, tolerance, mode))
+    if preloaded is not None:
+        return preloaded
+    table = deviation_table(base_colors, mode) > tolerance
+    table.setflags(write=False)
+    return table
+
+
+def _deviation_in_space(points: np.ndarray, base: np.ndarray, mode: str) -> np.ndarray:
+    # The same tests as _mismatch_in_space folded into one number per point, so that
+    # a point mismatches under tolerance t exactly when its deviation exceeds t
+    if mode in ("rgb", "lab"):
+        return np.sqrt(((points - base) ** 2).sum(axis=-1))
+    if mode == "box":
+        return np.abs(points - base).max(axis=-1)
+    hue_diff = np.abs(points[..., 0] - base[0])
+    hue_diff = np.minimum(hue_diff, 360 - hue_diff)
+    chromatic = np.minimum(points[..., 1], base[1]) > 0.1
+    return np.maximum(np.where(chromatic, hue_diff, 0.0), np.abs(points[..., 1] - base[1]) * 100)
+
+
+@lru_cache(maxsize=16)
+def deviation_table(base_colors: Tuple[Tuple[int, int, int], ...], mode: str) -> np.ndarray:
+    """Returns each color table bin's deviation from the nearest of base_colors.
+
+    A bin's deviation is that of its closest color (for hsv and lab, a lower
+    bound on it), and the bin is a mismatch under tolerance t exactly when its deviation
+    exceeds t, so one table answers the question for every tolerance at once.
+    """
+    table = _bin_deviations(base_colors, mode).astype(np.float32)
+    table.setflags(write=False)
+    return table
+
+
+def table_index(frame: np.ndarray) -> np.ndarray:
+    """Returns the color table bin of every BGR(A) pixel."""
+    b = frame[..., 0] >> TABLE_SHIFT
+    g = frame[..., 1] >> TABLE_SHIFT
+    r = frame[..., 2] >> TABLE_SHIFT
+    return (r.astype(np.uint16) << (2 * TABLE_BITS)) | (g.astype(np.uint16) << TABLE_BITS) | b
+
+
+# boundary_bins() values for a bin settled by the table, and for one to check against every color
+_NO_CHECK = -2
+_CHECK_ALL = -1
+
+
+@lru_cache(maxsize=16)
+def _rgb_bin_reach(base_colors: Tuple[Tuple[int, int, int], ...]) -> Tuple[np.ndarray, ...]:
+    # Per bin and whatever the tolerance: the squared RGB distance from the bin to its nearest and
+    # second-nearest allowed color, which color is nearest, and the smallest squared distance
+    # within which one allowed color reaches every color of the bin
+    low, high = table_bins()
+    near = np.empty((len(base_colors), len(low)), dtype=np.int32)
+    far = np.empty_like(near)
+    for k, color in enumerate(base_colors):
+        color = np.asarray(color, dtype=np.float64)
+        gap = color - np.clip(color, low, high)
+        spread = np.maximum(np.abs(color - low), np.abs(high - color))
+        near[k] = (gap ** 2).sum(axis=1)
+        far[k] = (spread ** 2).sum(axis=1)
+    columns = np.arange(len(low))
+    order = np.argsort(near, axis=0, kind="stable")
+    nearest = order[0].astype(np.int16)
+    second = near[order[1], columns] if len(base_colors) > 1 else np.full(len(low), np.iinfo(np.int32).max)
+    reach = (near[order[0], columns], second, nearest, far.min(axis=0))
+    for array in reach:
+        array.setflags(write=False)
+    return reach
+
+
+@lru_cache(maxsize=16)
+def boundary_bins(base_colors: Tuple[Tuple[int, int, int], ...], tolerance: int) -> np.ndarray:
+    """Marks the bins of the rgb color table that straddle the tolerance.
+
+    Such a bin holds colors within tolerance of an allowed color and colors
+    that are not, so its pixels need an exact distance. The entry is the index
+    of the one allowed color that reaches the bin, -1 when several do, and -2
+    for bins the table settles. Every comparison is against the tolerance, so
+    a new tolerance costs no recompile.
+    """
+    near, second, nearest, cover = _rgb_bin_reach(base_colors)
+    limit = tolerance * tolerance
+    check = np.full(len(near), _NO_CHECK, dtype=np.int16)
+    edge = (near <= limit) & (cover > limit)
+    check[edge] = np.where(second[edge] <= limit, _CHECK_ALL, nearest[edge])
+    check.setflags(write=False)
+    return check
+
+
+@lru_cache(maxsize=16)
+def _bgr_palette(colors: Tuple[Tuple[int, int, int], ...]) -> np.ndarray:
+    palette = np.array([color[::-1] for color in colors], dtype=np.int32)
+    palette.setflags(write=False)
+    return palette
+
+
+def palette_mismatch_mask(frame: np.ndarray, colors: Tuple[Tuple[int, int, int], ...], tolerance: int) -> np.ndarray:
+    """Returns True for each BGR(A) pixel whose RGB distance from every one of colors exceeds tolerance.
+
+    The rgb color table settles every pixel whose bin lies wholly within or
+    beyond the tolerance. Only pixels in bins that straddle it are measured,
+    against the one color that reaches the bin where there is just one, so the
+    cost per pixel does not grow with the number of colors.
+    """
+    index = table_index(frame)
+    mismatched = color_table(colors, tolerance, "rgb")[index]
+    check = boundary_bins(colors, tolerance)[index]
+    edge = check != _NO_CHECK
+    if not edge.any():
+        return mismatched
+    # Measuring every pixel against its bin's color is cheaper than gathering the straddling ones
+    palette = _bgr_palette(colors)
+    diff = frame[..., :3].astype(np.int32) - np.take(palette, np.maximum(check, 0), axis=0)
+    outside = np.einsum("...c,...c->...", diff, diff) > tolerance * tolerance
+    shared = check == _CHECK_ALL
+    if shared.any():
+        outside[shared] = palette_distance_sq(frame[shared], colors) > tolerance * tolerance
+    return np.where(edge, outside, mismatched)
+
+
+def uses_color_table(match_mode: str, extra_colors: Tuple[Tuple[int, int, int], ...]) -> bool:
+    """True when scan_change classifies pixels through a color table rather than exact RGB distance alone."""
+    return match_mode != "rgb" or bool(extra_colors)
+
+
+def count_table_mismatches(frame: np.ndarray, table: np.ndarray) -> int:
+    """Counts mismatching pixels with one table lookup per pixel."""
+    return int(np.count_nonzero(table[table_index(frame)]))
+
+
+def mismatch_limit(pixel_count: int, threshold_percent: float) -> int:
+    """Returns the mismatch count that must be exceeded to trigger detection."""
+    return int(pixel_count * threshold_percent / 100)
+
+
+def sample_stride(width: int, height: int, max_samples: int) -> int:
+    """Returns the smallest pixel stride that keeps the sampled grid within max_samples."""
+    stride = 1
+    while -(-width // stride) * -(-height // stride) > max_samples:
+        stride += 1
+    return stride
+
+
+SCAN_ORDERS = ("center", "interleaved", "raster", "pyramid")
+# Samples per tile side in pyramid_change's summary, which keeps the tile count bounded
+PYRAMID_TILE = 8
+
+
+@lru_cache(maxsize=32)
+def scan_indices(width: int, height: int, stride: int, order: str) -> np.ndarray:
+    """Returns flat pixel indices of the sampled grid in the order they should be scanned.
+
+    "center" visits pixels nearest the middle of the region first, "interleaved"
+    visits a sparse lattice spread over the whole region before filling it in,
+    and "raster" is plain row-major order. "pyramid" is not an order of samples
+    and is handled by pyramid_change() instead.
+    """
+    ys, xs = np.mgrid[0:height:stride, 0:width:stride]
+    ys, xs = ys.ravel(), xs.ravel()
+    if order == "center":
+        key = (ys - (height - 1) / 2) ** 2 + (xs - (width - 1) / 2) ** 2
+        perm = np.argsort(key, kind="stable")
+    elif order == "interleaved":
+        gy, gx = ys // stride, xs // stride
+        perm = np.lexsort((gx, gy, gx % 4, gy % 4))
+    elif order == "raster":
+        perm = np.arange(ys.size)
+    else:
+        raise ValueError(f"Unknown scan order: {order}")
+    indices = ys[perm] * width + xs[perm]
+    indices.setflags(write=False)
+    return indices
+
+
+@lru_cache(maxsize=32)
+def scan_coords(width: int, height: int, stride: int, order: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the scan order as separate row and column arrays, for frames that are views."""
+    indices = scan_indices(width, height, stride, order)
+    ys, xs = indices // width, indices % width
+    ys.setflags(write=False)
+    xs.setflags(write=False)
+    return ys, xs
+
+
+def _tile_reduce(ufunc: np.ufunc, frame: np.ndarray, tile_h: int, tile_w: int) -> np.ndarray:
+    # Reduces a frame to one value per tile and channel, one axis at a time. When a side
+    # is not a multiple of the tile, the last tile is shifted back to end at the edge
+    height, width = frame.shape[:2]
+    rows_full, cols_full = height // tile_h, width // tile_w
+    rows = ufunc.reduce(frame[:rows_full * tile_h].reshape(rows_full, tile_h, width, -1), axis=1)
+    if height % tile_h:
+        rows = np.concatenate((rows, ufunc.reduce(frame[height - tile_h:], axis=0)[None]))
+    # Across columns, folding strided slices together is far faster than reducing a short axis
+    tiles = rows[:, 0:cols_full * tile_w:tile_w].copy()
+    for offset in range(1, tile_w):
+        ufunc(tiles, rows[:, offset:cols_full * tile_w:tile_w], out=tiles)
+    if width % tile_w:
+        tiles = np.concatenate((tiles, ufunc.reduce(rows[:, width - tile_w:], axis=1)[:, None]), axis=1)
+    return tiles
+
+
+@lru_cache(maxsize=16)
+def table_box_counts(base_colors: Tuple[Tuple[int, int, int], ...], tolerance: int, mode: str) -> np.ndarray:
+    """Returns the color table as a (33, 33, 33) summed-volume table over (r, g, b) bins.
+
+    The number of mismatching bins in any box of bins is then eight lookups, which
+    tells pyramid_change() whether every color between a tile's extremes matches.
+    For rgb, bins that straddle the tolerance count as mismatching too.
+    """
+    side = 1 << TABLE_BITS
+    table = color_table(base_colors, tolerance, mode)
+    if mode == "rgb":
+        table = table | (boundary_bins(base_colors, tolerance) != _NO_CHECK)
+    table = table.reshape(side, side, side)
+    counts = np.zeros((side + 1,) * 3, dtype=np.int32)
+    counts[1:, 1:, 1:] = table.cumsum(axis=0).cumsum(axis=1).cumsum(axis=2)
+    counts.setflags(write=False)
+    return counts
+
+
+def pyramid_change(frame: np.ndarray, base_color: Tuple[int, int, int], tolerance: int,
+                   threshold_percent: float, match_mode: str = "rgb",
+                   extra_colors: Tuple[Tuple[int, int, int], ...] = (),
+                   tile: int = PYRAMID_TILE, max_samples: int = 4096) -> Tuple[bool, int]:
+    """Coarse-to-fine version of scan_change for large regions.
+
+    A region of at most max_samples pixels is scanned whole, centre first. A
+    larger one is summarized from the same bounded grid of samples the other
+    orders use: the per-channel minimum and maximum of the samples in each
+    tile of tile x tile samples. A tile whose sampled color box lies within tolerance is skipped;
+    only the remaining tiles are counted pixel by pixel at full resolution,
+    most deviating first, in batches that grow fourfold until the result is
+    known. A static region therefore costs about the same whatever its size,
+    and a change the samples touch is counted exactly, but like the grid scan
+    it misses a change that falls wholly between samples.
+    """
+    height, width = frame.shape[:2]
+    if height * width <= max_samples:
+        return scan_change(frame, base_color, tolerance, threshold_percent, max_samples=max_samples,
+                           match_mode=match_mode, extra_colors=extra_colors)
+    stride = sample_stride(width, height, max_samples)
+    tile_h, tile_w = min(tile * stride, height), min(tile * stride, width)
+    limit = mismatch_limit(height * width, threshold_percent)
+    sample = np.ascontiguousarray(frame[::stride, ::stride])
+    side_h, side_w = min(tile, sample.shape[0]), min(tile, sample.shape[1])
+    low = _tile_reduce(np.minimum, sample, side_h, side_w)[..., :3].astype(np.int32)
+    high = _tile_reduce(np.maximum, sample, side_h, side_w)[..., :3].astype(np.int32)
+
+    colors = (tuple(base_color),) + tuple(extra_colors)
+    table = None
+    if uses_color_table(match_mode, extra_colors):
+        table = color_table(colors, tolerance, match_mode)
+        counts = table_box_counts(colors, tolerance, match_mode)
+        # Bin boxes in (r, g, b) order, the table's axis order
+        r0, g0, b0 = (low[..., c] >> TABLE_SHIFT for c in (2, 1, 0))
+        r1, g1, b1 = ((high[..., c] >> TABLE_SHIFT) + 1 for c in (2, 1, 0))
+        deviation = (counts[r1, g1, b1] - counts[r0, g1, b1] - counts[r1, g0, b1] - counts[r1, g1, b0]
+                     + counts[r0, g0, b1] + counts[r0, g1, b0] + counts[r1, g0, b0] - counts[r0, g0, b0])
+        if match_mode == "rgb":
+            # Bins straddling the tolerance leave a tile suspect, but the tile is still clear
+            # when its whole box lies within tolerance of one color: try the one nearest its middle
+            nearest = _rgb_bin_reach(colors)[2][table_index((low + high) >> 1)]
+            bgr = np.take(_bgr_palette(colors), nearest, axis=0)
+            spread = np.maximum(np.abs(low - bgr), np.abs(high - bgr))
+            deviation[np.einsum("...c,...c->...", spread, spread) <= tolerance * tolerance] = 0
+    else:
+        # The farthest point of the box from the base color is one of its corners
+        bgr = np.array(base_color[::-1], dtype=np.int32)
+        spread = np.maximum(np.abs(low - bgr), np.abs(high - bgr))
+        deviation = np.einsum("...c,...c->...", spread, spread) - tolerance * tolerance
+
+    suspect = np.flatnonzero(deviation.ravel() > 0)
+    pixels_left = suspect.size * tile_h * tile_w
+    if pixels_left <= limit:
+        return False, 0
+    suspect = suspect[np.argsort(-deviation.ravel()[suspect], kind="stable")]
+    tiles_y, tiles_x = np.divmod(suspect, deviation.shape[1])
+
+    offsets_y, offsets_x = np.arange(tile_h), np.arange(tile_w)
+    mismatch_count = 0
+    start, chunk = 0, 4
+    while start < suspect.size:
+        end = min(start + chunk, suspect.size)
+        ty, tx = tiles_y[start:end], tiles_x[start:end]
+        # Shifted edge tiles overlap their neighbours; only count the pixels they own
+        ys = np.minimum(ty * tile_h, height - tile_h)[:, None] + offsets_y
+        xs = np.minimum(tx * tile_w, width - tile_w)[:, None] + offsets_x
+        owned = (ys >= (ty * tile_h)[:, None])[:, :, None] & (xs >= (tx * tile_w)[:, None])[:, None, :]
+        sample = frame[ys[:, :, None], xs[:, None, :]]
+        if table is None:
+            r, g, b = base_color
+            diff = sample[..., :3].astype(np.int32) - np.array((b, g, r), dtype=np.int32)
+            mismatched = np.einsum("...c,...c->...", diff, diff) > tolerance * tolerance
+        elif match_mode == "rgb":
+            mismatched = palette_mismatch_mask(sample, colors, tolerance)
+        else:
+            mismatched = table[table_index(sample)]
+        mismatch_count += int(np.count_nonzero(mismatched & owned))
+        pixels_left -= (end - start) * tile_h * tile_w
+        if mismatch_count > limit:
+            return True, mismatch_count
+        if mismatch_count + pixels_left <= limit:
+            return False, mismatch_count
+        start, chunk = end, chunk * 4
+    return False, mismatch_count
+
+
+def scan_change(frame: np.ndarray, base_color: Tuple[int, int, int], tolerance: int,
+                threshold_percent: float, max_samples: int = 4096, scan_order: str = "center",
+                first_chunk: int = 32, match_mode: str = "rgb",
+                extra_colors: Tuple[Tuple[int, int, int], ...] = ()) -> Tuple[bool, int]:
+    """Returns (changed, mismatches seen) for the region; see detect_change.
+
+    The mismatch count only covers the pixels scanned before the result was known,
+    so it is zero only if no scanned pixel deviated.
+    """
+    if scan_order == "pyramid":
+        return pyramid_change(frame, base_color, tolerance, threshold_percent, match_mode, extra_colors,
+                              max_samples=max_samples)
+    colors = (tuple(base_color),) + tuple(extra_colors)
+    table = None
+    if uses_color_table(match_mode, extra_colors):
+        table = color_table(colors, tolerance, match_mode)
+    height, width = frame.shape[:2]
+    stride = sample_stride(width, height, max_samples)
+    contiguous = frame.flags.c_contiguous
+    if contiguous:
+        pixels = frame.reshape(-1, 4)
+        indices = scan_indices(width, height, stride, scan_order)
+        total = indices.size
+    else:
+        ys, xs = scan_coords(width, height, stride, scan_order)
+        total = ys.size
+    limit = mismatch_limit(total, threshold_percent)
+
+    mismatch_count = 0
+    start, chunk = 0, first_chunk
+    while start < total:
+        end = min(start + chunk, total)
+        if contiguous:
+            sample = pixels[indices[start:end]]
+        else:
+            sample = frame[ys[start:end], xs[start:end]]
+        if table is None:
+            mismatch_count += count_mismatches(sample, base_color, tolerance)
+        elif match_mode == "rgb":
+            mismatch_count += int(np.count_nonzero(palette_mismatch_mask(sample, colors, tolerance)))
+        else:
+            mismatch_count += count_table_mismatches(sample, table)
+        if mismatch_count > limit:
+            return True, mismatch_count
+        # Stop once even the remaining pixels could not push the count past the limit
+        if mismatch_count + (total - end) <= limit:
+            return False, mismatch_count
+        start, chunk = end, chunk * 4
+    return False, mismatch_count
+
+
+def detect_change(frame: np.ndarray, base_color: Tuple[int, int, int], tolerance: int,
+                  threshold_percent: float, max_samples: int = 4096, scan_order: str = "center",
+                  first_chunk: int = 32, match_mode: str = "rgb",
+                  extra_colors: Tuple[Tuple[int, int, int], ...] = ()) -> bool:
+    """Returns True when more than threshold_percent of the region differs from the base color.
+
+    With extra_colors, a pixel only counts as changed if it matches none of the
+    base color and extra colors.
+
+    Large regions are sampled on a regular grid so that at most max_samples pixels
+    are analysed. The samples are reduced in chunks that grow fourfold, and the
+    scan stops as soon as the threshold is crossed or can no longer be reached.
+    The frame may be a view into a larger grab; it is never copied as a whole.
+    Color sets and match modes other than "rgb" classify pixels through a
+    precompiled color table. For an "rgb" color set the result stays exact:
+    pixels in bins that straddle the tolerance are measured directly.
+    """
+    return scan_change(
+        frame, base_color, tolerance, threshold_percent, max_samples=max_samples,
+        scan_order=scan_order, first_chunk=first_chunk, match_mode=match_mode,
+        extra_colors=extra_colors
+    )[0]
+
+
+class TransitionFilter:
+    """Turns per-frame detection results into debounced state transitions.
+
+    The state only switches on after on_frames consecutive changed frames and
+    only switches off after off_frames consecutive unchanged frames.
+    """
+
+    def __init__(self, on_frames: int = 1, off_frames: int = 1):
+        self.configure(on_frames, off_frames)
+        self.state = False
+        self.streak = 0
+
+    def configure(self, on_frames: int, off_frames: int):
+        """Change the debounce counts without losing the current state."""
+        self.on_frames = max(1, on_frames)
+        self.off_frames = max(1, off_frames)
+
+    def update(self, changed: bool) -> Optional[bool]:
+        """Feed one frame result; returns the new state on a transition, otherwise None."""
+        if changed == self.state:
+            self.streak = 0
+            return None
+
+        self.streak += 1
+        if self.streak >= (self.on_frames if changed else self.off_frames):
+            self.state = changed
+            self.streak = 0
+            return changed
+        return None
+
+    def reset(self):
+        """Return to the off state."""
+        self.state = False
+        self.streak = 0
+
+
+class MotionDetector:
+    """Counts pixels that changed against the previous frame or a rolling background.
+
+    Sampled pixels are copied into one of two preallocated buffers; after each
+    frame the buffers swap roles by reference, so the previous frame is never
+    copied. With background_alpha above zero the comparison is against an
+    exponential moving average of past frames instead of the last frame.
+    """
+
+    def __init__(self, background_alpha: float = 0.0, max_samples: int = 4096):
+        self.background_alpha = background_alpha
+        self.max_samples = max_samples
+        self.front = None
+        self.back = None
+        self.diff = None
+        self.background = None
+
+    def reset(self):
+        """Forget the reference frame; the next frame becomes the new reference."""
+        self.front = None
+
+    def _allocate(self, shape: Tuple[int, ...]):
+        self.front = np.empty(shape, dtype=np.int16)
+        self.back = np.empty(shape, dtype=np.int16)
+        self.diff = np.empty(shape, dtype=np.int16)
+        self.background = np.empty(shape, dtype=np.float32)
+
+    def count(self, frame: np.ndarray, tolerance: int) -> Tuple[int, int]:
+        """Returns (changed pixel count, sampled pixel count) for a new frame."""
+        height, width = frame.shape[:2]
+        stride = sample_stride(width, height, self.max_samples)
+        sample = frame[::stride, ::stride, :3]
+        total = sample.shape[0] * sample.shape[1]
+
+        if self.front is None or self.front.shape != sample.shape:
+            self._allocate(sample.shape)
+            np.copyto(self.front, sample)
+            self.background[...] = self.front
+            return 0, total
+
+        np.copyto(self.back, sample)
+        if self.background_alpha > 0:
+            np.subtract(self.back, self.background, out=self.diff, casting="unsafe")
+            self.background += self.background_alpha * (self.back - self.background)
+        else:
+            np.subtract(self.back, self.front, out=self.diff)
+        dist_sq = np.einsum("...c,...c->...", self.diff, self.diff, dtype=np.int32)
+        changed = int(np.count_nonzero(dist_sq > tolerance * tolerance))
+
+        self.front, self.back = self.back, self.front
+        return changed, total
+
+    def detect(self, frame: np.ndarray, tolerance: int, threshold_percent: float) -> bool:
+        """Returns True when more than threshold_percent of the region changed since the reference."""
+        changed, total = self.count(frame, tolerance)
+        return changed > mismatch_limit(total, threshold_percent)
+
+
+def to_gray(frame: np.ndarray) -> np.ndarray:
+    """Converts a BGRA (or BGR) frame to float32 luma."""
+    return (frame[..., 0] * np.float32(0.114) + frame[..., 1] * np.float32(0.587)
+            + frame[..., 2] * np.float32(0.299))
+
+
+def downscale(image: np.ndarray, factor: int) -> np.ndarray:
+    """Block-averages a 2D image by an integer factor, dropping any ragged edge."""
+    if factor == 1:
+        return image
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    blocks = image[:height * factor, :width * factor].reshape(height, factor, width, factor)
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def window_sums(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Sums over every height x width window of a 2D image, using an integral image."""
+    integral = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(image, axis=0, dtype=np.float64), axis=1, out=integral[1:, 1:])
+    return (integral[height:, width:] - integral[:-height, width:]
+            - integral[height:, :-width] + integral[:-height, :-width])
+
+
+class TemplateDetector:
+    """Finds a reference patch in the region by normalized cross-correlation.
+
+    The correlation is computed with FFTs and normalized with integral images, so
+    each frame costs a fixed number of array passes regardless of the template
+    size. The region and template can be block-averaged by a factor first. A
+    block-averaged score depends on where the target sits on the block grid, so
+    that pass only proposes candidates: the best few, plus the last match, are
+    re-scored at full resolution within REFINE_RADIUS pixels of where they were
+    found. The cost of every factor tried is measured, and the factor only moves
+    to one that is measured, or yet to be measured, to be cheaper when a frame
+    takes longer than target_ms, and back to a finer one when a frame takes less
+    than half of it. The factor is capped so the downscaled template keeps at
+    least MIN_TEMPLATE_SIDE pixels per side. The best match position (in region
+    pixels) and its score in [-1, 1] are kept in last_match.
+    """
+
+    MAX_FACTOR = 8
+    MIN_TEMPLATE_SIDE = 12
+    CANDIDATES = 8
+    # Coarse candidates scoring further than this below the best are not re-scored
+    CANDIDATE_MARGIN = 0.25
+    REFINE_RADIUS = 2
+
+    def __init__(self, template: np.ndarray, target_ms: float = 2.0):
+        self.template_gray = to_gray(template)
+        self.target_ns = int(target_ms * 1_000_000)
+        self.factor = 1
+        self.max_factor = max(1, min(self.MAX_FACTOR, min(self.template_gray.shape) // self.MIN_TEMPLATE_SIDE))
+        self.last_match = None
+        # Smoothed frame time of each factor used so far
+        self.costs = {}
+        # Template FFTs per factor for the current region size, so a factor that
+        # moves back and forth is not transformed again
+        self._region_shape = None
+        self._prepared = {}
+        zero_mean = self.template_gray - self.template_gray.mean()
+        self._full_template = zero_mean
+        self._full_norm = float(np.sqrt((zero_mean ** 2).sum()))
+
+    def _prepare(self, shape: Tuple[int, int]) -> Tuple[np.ndarray, Tuple[int, int], float]:
+        prepared = self._prepared.get(self.factor)
+        if prepared is None:
+            template = downscale(self.template_gray, self.factor)
+            zero_mean = template - template.mean()
+            # Correlation is convolution with the flipped template
+            prepared = (np.fft.rfft2(zero_mean[::-1, ::-1], s=shape), template.shape,
+                        float(np.sqrt((zero_mean ** 2).sum())))
+            self._prepared[self.factor] = prepared
+        return prepared
+
+    def _scores(self, image: np.ndarray, template_fft: np.ndarray, t_height: int, t_width: int,
+                template_norm: float) -> np.ndarray:
+        full = np.fft.irfft2(np.fft.rfft2(image) * template_fft, s=image.shape)
+        numerator = full[t_height - 1:, t_width - 1:]
+        count = t_height * t_width
+        sums = window_sums(image, t_height, t_width)
+        sums_sq = window_sums(image * image, t_height, t_width)
+        variance = np.maximum(sums_sq - sums * sums / count, 0)
+        denominator = np.sqrt(variance) * template_norm
+        return np.where(denominator > 1e-6, numerator / np.maximum(denominator, 1e-6), 0)
+
+    @staticmethod
+    def _peak_offset(scores: np.ndarray, y: int, x: int) -> Tuple[float, float]:
+        # Where the peak lies between cells, from a parabola through each axis' neighbours
+        offsets = []
+        for before, here, after in ((scores[y - 1, x] if y > 0 else None, scores[y, x],
+                                     scores[y + 1, x] if y + 1 < scores.shape[0] else None),
+                                    (scores[y, x - 1] if x > 0 else None, scores[y, x],
+                                     scores[y, x + 1] if x + 1 < scores.shape[1] else None)):
+            curve = before - 2 * here + after if before is not None and after is not None else 0
+            offsets.append(float(np.clip(0.5 * (before - after) / curve, -0.5, 0.5)) if curve < 0 else 0.0)
+        return offsets[0], offsets[1]
+
+    def _refine(self, gray: np.ndarray, x: int, y: int, radius: int) -> Tuple[int, int, float]:
+        # Full-resolution scores for every placement within radius of (x, y)
+        t_height, t_width = self.template_gray.shape
+        x = min(max(x, 0), gray.shape[1] - t_width)
+        y = min(max(y, 0), gray.shape[0] - t_height)
+        top, left = max(0, y - radius), max(0, x - radius)
+        bottom = min(gray.shape[0] - t_height, y + radius)
+        right = min(gray.shape[1] - t_width, x + radius)
+        window = gray[top:bottom + t_height, left:right + t_width]
+        patches = np.lib.stride_tricks.sliding_window_view(window, (t_height, t_width))
+        # The template has zero mean, so the patch means drop out of the numerator
+        numerator = np.einsum("yxij,ij->yx", patches, self._full_template)
+        count = t_height * t_width
+        sums = patches.sum(axis=(2, 3))
+        variance = np.maximum(np.einsum("yxij,yxij->yx", patches, patches) - sums * sums / count, 0)
+        denominator = np.sqrt(variance) * self._full_norm
+        scores = np.where(denominator > 1e-6, numerator / np.maximum(denominator, 1e-6), 0)
+        dy, dx = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        return left + int(dx), top + int(dy), float(scores[dy, dx])
+
+    def _next_factor(self, factor: int) -> int:
+        costs = self.costs
+        if costs[factor] > self.target_ns:
+            # A coarser factor re-scores the same candidates, so it is not always faster:
+            # try the next one once, then settle on whichever was measured cheapest
+            coarser = factor + 1
+            if coarser <= self.max_factor and costs.get(coarser, 0) < costs[factor]:
+                return coarser
+            return min(costs, key=costs.get)
+        finer = factor - 1
+        if costs[factor] < self.target_ns // 2 and finer >= 1 and costs.get(finer, 0) <= self.target_ns:
+            return finer
+        return factor
+
+    def match(self, frame: np.ndarray) -> Optional[Tuple[int, int, float]]:
+        """Returns (x, y, score) of the best match in the frame, or None if the template does not fit."""
+        start = time.perf_counter_ns()
+        gray = to_gray(frame)
+        if (gray.shape[0] < self.template_gray.shape[0] or gray.shape[1] < self.template_gray.shape[1]
+                or self._full_norm == 0):
+            self.last_match = None
+            return None
+        if gray.shape != self._region_shape:
+            # Transforms and costs both depend on the region size
+            self._region_shape = gray.shape
+            self._prepared = {}
+            self.costs = {}
+        factor = self.factor
+        image = downscale(gray, factor)
+        template_fft, (t_height, t_width), template_norm = self._prepare(image.shape)
+        scores = self._scores(image, template_fft, t_height, t_width, template_norm)
+
+        if factor == 1:
+            y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+            self.last_match = (int(x), int(y), float(scores[y, x]))
+        else:
+            # Take the best few coarse positions that are not next to one already taken
+            order = np.argsort(scores, axis=None)[::-1][:self.CANDIDATES * 9]
+            floor = scores.flat[order[0]] - self.CANDIDATE_MARGIN
+            candidates = []
+            for y, x in zip(*np.unravel_index(order, scores.shape)):
+                if scores[y, x] < floor:
+                    break
+                if all(abs(int(y) - cy) > 1 or abs(int(x) - cx) > 1 for cy, cx in candidates):
+                    candidates.append((int(y), int(x)))
+                    if len(candidates) == self.CANDIDATES:
+                        break
+            positions = []
+            for y, x in candidates:
+                dy, dx = self._peak_offset(scores, y, x)
+                positions.append((int(round((x + dx) * factor)), int(round((y + dy) * factor))))
+            if self.last_match is not None:
+                # A target that has not moved is re-checked where it was last seen
+                positions.append(self.last_match[:2])
+            self.last_match = max((self._refine(gray, x, y, self.REFINE_RADIUS) for x, y in positions),
+                                  key=lambda match: match[2])
+
+        # Trade resolution for time to stay near the frame-time target
+        elapsed = time.perf_counter_ns() - start
+        cost = self.costs.get(factor)
+        self.costs[factor] = elapsed if cost is None else (3 * cost + elapsed) // 4
+        self.factor = self._next_factor(factor)
+        return self.last_match
+
+    def detect(self, frame: np.ndarray, min_score: float) -> bool:
+        """Returns True when the template is found with at least min_score."""
+        match = self.match(frame)
+        return match is not None and match[2] >= min_score
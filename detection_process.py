@@ -0,0 +1,240 @@
+"""Capture and analysis in a child process, away from the GUI interpreter's GIL.
+
+The child owns the capture handle, the detection engine and the frame scheduler.
+Settings go to it over a control pipe, debounced transitions and periodic stats
+come back over an event pipe. When the parent asks for a frame the child
+publishes its next capture through a shared memory block, so a look at the
+child's frame costs one copy and no pickling, and frames nobody asked for cost
+nothing.
+"""
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from capture import CaptureService, Region
+from engine import DetectionEngine, RegionConfig
+from recording import TriggerRecorder
+from scheduler import AdaptiveScheduler
+
+HEADER_SLOTS = 4  # sequence, height, width, capture_ns
+HEADER_BYTES = HEADER_SLOTS * 8
+STATS_INTERVAL_NS = 1_000_000_000
+
+
+class SharedFrame:
+    """The most recent captured frame, in a shared memory block.
+
+    The writer makes the sequence number odd before copying a frame in and even
+    again afterwards. A reader that sees the same even number before and after
+    its copy knows the copy is whole. Frames larger than the block are skipped.
+    """
+
+    def __init__(self, capacity: int = 4 * 1024 * 1024, name: Optional[str] = None):
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + capacity)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+        self.pixels = np.ndarray((self.shm.size - HEADER_BYTES,), dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=HEADER_BYTES)
+        if self.owner:
+            self.header[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, frame: np.ndarray, capture_ns: int) -> bool:
+        """Copy a BGRA frame in; returns False if it does not fit."""
+        height, width = frame.shape[:2]
+        size = height * width * 4
+        if size > self.pixels.size:
+            return False
+        header = self.header
+        header[0] += 1
+        header[1], header[2], header[3] = height, width, capture_ns
+        np.copyto(self.pixels[:size].reshape(height, width, 4), frame)
+        header[0] += 1
+        return True
+
+    def read(self, attempts: int = 8) -> Optional[Tuple[np.ndarray, int]]:
+        """Returns a copy of the latest (frame, capture_ns), or None if there is none yet."""
+        header = self.header
+        for _ in range(attempts):
+            sequence = int(header[0])
+            if sequence == 0:
+                return None
+            if sequence & 1:
+                continue
+            height, width, capture_ns = int(header[1]), int(header[2]), int(header[3])
+            frame = self.pixels[:height * width * 4].reshape(height, width, 4).copy()
+            if int(header[0]) == sequence:
+                return frame, capture_ns
+        return None
+
+    def close(self):
+        """Release the block; the creating side also removes it."""
+        # The numpy views must go before the mapping can be closed
+        self.header = None
+        self.pixels = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def run_detection(control, events, frame_name: str, regions: Sequence[RegionConfig], rate_hz: float,
+                  spin_ns: int, idle: Tuple[bool, float, float], capture_factory: Callable,
+                  recording: Tuple[int, bool] = (0, False), monitors: Sequence[Region] = ()):
+    """Child process body: capture, analyse and report until told to stop."""
+    shared = SharedFrame(name=frame_name)
+    capture = capture_factory()
+    engine = DetectionEngine(capture, regions, monitors=monitors)
+    idle_enabled, idle_hz, quiet_s = idle
+    scheduler = AdaptiveScheduler(rate_hz, idle_hz, quiet_s, idle_enabled, spin_ns=spin_ns)
+    ring_frames, dump_on_trigger = recording
+    recorder = TriggerRecorder(ring_frames, dump_on_trigger) if ring_frames else None
+    next_stats = 0
+    publish = False
+    running = True
+    try:
+        while running:
+            while control.poll():
+                message = control.recv()
+                if message[0] == "stop":
+                    running = False
+                    break
+                if message[0] == "dump":
+                    if recorder:
+                        recorder.request_dump()
+                    continue
+                if message[0] == "frame":
+                    publish = True
+                    continue
+                _, regions, rate_hz, spin_ns, (idle_enabled, idle_hz, quiet_s) = message
+                engine.set_regions(regions)
+                scheduler.configure(rate_hz, idle_hz, quiet_s, idle_enabled)
+                scheduler.spin_ns = spin_ns
+            if not running:
+                break
+
+            scheduler.wait()
+            changes = engine.step()
+            scheduler.report(engine.activity, engine.analysis_ns - engine.capture_ns)
+            if publish:
+                shared.write(engine.frame, engine.capture_ns)
+                publish = False
+
+            for index, state in changes:
+                events.send(("transition", index, state, engine.capture_ns, engine.analysis_ns))
+            if recorder:
+                recorder.after_step(engine, any(state for _, state in changes))
+                while recorder.saved:
+                    events.send(("dumped", recorder.saved.popleft()))
+            if scheduler.last_tick >= next_stats:
+                stats = scheduler.stats()
+                stats["matches"] = engine.matches()
+                events.send(("stats", stats))
+                next_stats = scheduler.last_tick + STATS_INTERVAL_NS
+    except (BrokenPipeError, EOFError):
+        # The parent went away
+        pass
+    finally:
+        capture.close()
+        shared.close()
+
+
+class DetectionProcess:
+    """Parent-side handle on a detection child process.
+
+    Transitions arrive as ("transition", region index, state, capture_ns,
+    analysis_ns), stats as ("stats", dict) and finished frame dumps as
+    ("dumped", path) from poll(); the caller decides what to do with them. Timestamps are perf_counter_ns values, which share a
+    clock between processes.
+
+    The child imports the launching script again before it starts, so that script
+    should keep its heavy imports under __main__, as main.py does.
+    """
+
+    def __init__(self, regions: Sequence[RegionConfig], rate_hz: float = 33.0, spin_ns: int = 0,
+                 idle: Tuple[bool, float, float] = (False, 5.0, 2.0),
+                 capture_factory: Callable = CaptureService, frame_capacity: int = 4 * 1024 * 1024,
+                 recording: Tuple[int, bool] = (0, False), monitors: Sequence[Region] = ()):
+        self.frame = SharedFrame(frame_capacity)
+        # Spawn rather than fork so the child never inherits the GUI's threads and handles
+        context = multiprocessing.get_context("spawn")
+        child_control, self._control = context.Pipe(duplex=False)
+        self._events, child_events = context.Pipe(duplex=False)
+        self._send_lock = threading.Lock()
+        self.process = context.Process(
+            target=run_detection, name="DetectionProcess", daemon=True,
+            args=(child_control, child_events, self.frame.name, tuple(regions), rate_hz, spin_ns, idle,
+                  capture_factory, recording, tuple(monitors))
+        )
+        self.process.start()
+        # The child holds its own ends now
+        child_control.close()
+        child_events.close()
+
+    def update_settings(self, regions: Sequence[RegionConfig], rate_hz: float, spin_ns: int,
+                        idle: Tuple[bool, float, float]):
+        """Send new settings; safe to call from any thread."""
+        with self._send_lock:
+            self._control.send(("settings", tuple(regions), rate_hz, spin_ns, idle))
+
+    def request_dump(self):
+        """Ask the child to dump its frame ring, if it keeps one."""
+        with self._send_lock:
+            self._control.send(("dump",))
+
+    def poll(self, timeout: float = 0.0) -> List[tuple]:
+        """Returns every event waiting, blocking up to timeout seconds for the first."""
+        events = []
+        try:
+            if self._events.poll(timeout):
+                while True:
+                    events.append(self._events.recv())
+                    if not self._events.poll():
+                        break
+        except EOFError:
+            pass
+        return events
+
+    def latest_frame(self, timeout: float = 0.5) -> Optional[Tuple[np.ndarray, int]]:
+        """Asks the child for its next capture and returns a copy of (frame, capture_ns).
+
+        Returns None if no frame arrives within timeout seconds, or if the frame
+        does not fit the shared block.
+        """
+        sequence = int(self.frame.header[0])
+        with self._send_lock:
+            self._control.send(("frame",))
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if int(self.frame.header[0]) > sequence + 1:
+                return self.frame.read()
+            time.sleep(0.001)
+        return None
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self, timeout: float = 1.0):
+        """Ask the child to stop, wait for it, and release the pipes and shared memory."""
+        try:
+            with self._send_lock:
+                self._control.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self._control.close()
+        self._events.close()
+        self.frame.close()
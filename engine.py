@@ -0,0 +1,268 @@
+"""The capture, analysis and transition loop body, independent of Qt."""
+import time
+from dataclasses import dataclass, field, fields
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from capture import Region
+from detection import MotionDetector, TemplateDetector, TransitionFilter, mismatch_limit, scan_change
+from latency import LatencyRecorder
+
+DETECTORS = ("color", "motion", "template")
+
+
+@dataclass(frozen=True)
+class RegionConfig:
+    """One watched screen region and how it is evaluated.
+
+    detector is "color" to compare against base_color, or "motion" to compare
+    against the previous frame (or a rolling background when background_alpha
+    is above zero) without needing a base color, or "template" to search the
+    region for the template patch and trigger when the best normalized
+    cross-correlation score reaches min_score. extra_colors are further shades
+    that count as unchanged alongside base_color. match_mode is one of
+    detection.MATCH_MODES. action is "click" or the name of a key to press while
+    the region is triggered.
+    """
+    rect: Region
+    base_color: Tuple[int, int, int]
+    tolerance: int
+    threshold_percent: float = 2.0
+    scan_order: str = "center"
+    on_frames: int = 1
+    off_frames: int = 1
+    action: str = "click"
+    match_mode: str = "rgb"
+    extra_colors: Tuple[Tuple[int, int, int], ...] = ()
+    detector: str = "color"
+    background_alpha: float = 0.0
+    template: Optional[np.ndarray] = field(default=None, compare=False)
+    min_score: float = 0.8
+
+    def __post_init__(self):
+        if self.detector not in DETECTORS:
+            raise ValueError(f"Unknown detector: {self.detector}")
+        if self.detector == "template" and self.template is None:
+            raise ValueError("The template detector needs a template")
+
+
+def region_to_dict(region: RegionConfig) -> dict:
+    """Returns the region's settings as JSON-friendly values, leaving out the template."""
+    return {f.name: getattr(region, f.name) for f in fields(region) if f.name != "template"}
+
+
+def region_from_dict(values: dict, template: Optional[np.ndarray] = None) -> RegionConfig:
+    """Rebuilds a RegionConfig from region_to_dict() output, e.g. after a JSON round trip."""
+    values = dict(values)
+    values["rect"] = tuple(values["rect"])
+    values["base_color"] = tuple(values["base_color"])
+    values["extra_colors"] = tuple(tuple(c) for c in values.get("extra_colors", ()))
+    return RegionConfig(template=template, **values)
+
+
+def bounding_rect(rects: Sequence[Region]) -> Region:
+    """Returns the smallest (left, top, width, height) rectangle containing all rects."""
+    left = min(r[0] for r in rects)
+    top = min(r[1] for r in rects)
+    right = max(r[0] + r[2] for r in rects)
+    bottom = max(r[1] + r[3] for r in rects)
+    return (left, top, right - left, bottom - top)
+
+
+def action_callable(backend, action: str):
+    """Returns the zero-argument callable that performs a region action on a backend."""
+    if action == "click":
+        return backend.click
+    return lambda: backend.press(action)
+
+
+class DetectionEngine:
+    """Runs one detection frame at a time against a capture backend.
+
+    All regions on the same monitor are served from a single grab of their
+    bounding rectangle, and each region is evaluated on a view into that
+    buffer. monitors lists the physical monitor rectangles; without it every
+    region shares one grab. The GUI worker and the
+    headless tools both drive this; pacing is left to the caller. On a debounced
+    transition the region's executor, if any, is switched directly so actions
+    never wait on another thread's event loop.
+
+    Settings can be changed while running: set_regions() swaps in an immutable
+    snapshot that the next step() picks up, with no locking on either side.
+    """
+
+    def __init__(self, capture, regions: Sequence[RegionConfig], executors: Sequence = (),
+                 recorder: Optional[LatencyRecorder] = None, monitors: Sequence[Region] = ()):
+        self.capture = capture
+        self.monitors = tuple(monitors)
+        self.executors = list(executors)
+        self.transitions = []
+        self.detectors = []
+        self.recorder = recorder or LatencyRecorder()
+        self.regions = ()
+        self._apply_regions(tuple(regions))
+        self.pending_regions = self.regions
+        self.pending_executors = None
+        self.capture_ns = 0
+        self.analysis_ns = 0
+        self.activity = False
+        self.frame = None
+
+    def set_regions(self, regions: Sequence[RegionConfig], executors: Optional[Sequence] = None):
+        """Queue new region settings; safe to call from any thread.
+
+        With executors, the regions also get new actions, e.g. after switching
+        to a profile with different regions; executors no longer used are stopped.
+        """
+        # Published before the regions, which are what step() checks for. A later
+        # call without executors leaves queued ones in place.
+        if executors is not None:
+            self.pending_executors = list(executors)
+        self.pending_regions = tuple(regions)
+
+    def _apply_regions(self, regions: Tuple[RegionConfig, ...], executors: Optional[List] = None):
+        if executors is not None:
+            for executor in self.executors:
+                if executor and executor not in executors:
+                    executor.deactivate()
+            self.executors = executors
+        # Regions that disappear stop their actions
+        for executor in self.executors[len(regions):]:
+            if executor:
+                executor.deactivate()
+        self.executors = self.executors[:len(regions)] + [None] * (len(regions) - len(self.executors))
+
+        # Keep the debounced state of regions that still exist
+        self.transitions = self.transitions[:len(regions)]
+        for index, region in enumerate(regions):
+            if index < len(self.transitions):
+                self.transitions[index].configure(region.on_frames, region.off_frames)
+            else:
+                self.transitions.append(TransitionFilter(region.on_frames, region.off_frames))
+        if executors is not None:
+            # New actions take over regions that are already triggered
+            for transition, executor in zip(self.transitions, self.executors):
+                if transition.state and executor:
+                    executor.activate()
+
+        # Stateful detectors survive a settings change unless their type or size changed
+        detectors = []
+        for index, region in enumerate(regions):
+            old = self.regions[index] if index < len(self.regions) else None
+            keep = (old is not None and old.detector == region.detector and old.rect[2:] == region.rect[2:]
+                    and old.background_alpha == region.background_alpha and old.template is region.template)
+            detectors.append(self.detectors[index] if keep else self._make_detector(region))
+        self.detectors = detectors
+
+        self.regions = regions
+
+        # One grab per monitor in use, so a grab never spans the gap between screens
+        groups = {}
+        for index, region in enumerate(regions):
+            groups.setdefault(self._monitor_index(region.rect), []).append(index)
+        self.grabs = []
+        for members in groups.values():
+            bounds = bounding_rect([regions[i].rect for i in members])
+            # Where each region sits inside the shared grab
+            left, top = bounds[0], bounds[1]
+            self.grabs.append((bounds, [
+                (i, slice(regions[i].rect[1] - top, regions[i].rect[1] - top + regions[i].rect[3]),
+                 slice(regions[i].rect[0] - left, regions[i].rect[0] - left + regions[i].rect[2]))
+                for i in members
+            ]))
+        # The grab holding the first region is the one exposed as frame and bounds
+        self.bounds = self.grabs[0][0]
+
+    def _monitor_index(self, rect: Region) -> int:
+        x, y = rect[0] + rect[2] / 2, rect[1] + rect[3] / 2
+        for index, (left, top, width, height) in enumerate(self.monitors):
+            if left <= x < left + width and top <= y < top + height:
+                return index
+        return -1
+
+    @staticmethod
+    def _make_detector(region: RegionConfig):
+        if region.detector == "motion":
+            return MotionDetector(region.background_alpha)
+        if region.detector == "template":
+            return TemplateDetector(region.template)
+        return None
+
+    def _evaluate(self, index: int, frame) -> Tuple[bool, bool]:
+        """Returns (changed, activity) for one region.
+
+        activity is True when any scanned pixel deviated, even below the
+        threshold, so the caller can react to a change before it triggers.
+        """
+        region = self.regions[index]
+        detector = self.detectors[index]
+        if region.detector == "motion":
+            changed, total = detector.count(frame, region.tolerance)
+            return changed > mismatch_limit(total, region.threshold_percent), changed > 0
+        if region.detector == "template":
+            triggered = detector.detect(frame, region.min_score)
+            return triggered, triggered
+        # Trigger once more than threshold_percent of the region differs from its colors
+        changed, mismatches = scan_change(
+            frame, region.base_color, region.tolerance, region.threshold_percent,
+            scan_order=region.scan_order, match_mode=region.match_mode,
+            extra_colors=region.extra_colors
+        )
+        return changed, mismatches > 0
+
+    def matches(self) -> List[Optional[Tuple[int, int, float]]]:
+        """Returns the last (x, y, score) template match for each region, or None."""
+        return [getattr(detector, "last_match", None) for detector in self.detectors]
+
+    @property
+    def active(self) -> bool:
+        """True while any region is in the triggered state."""
+        return any(t.state for t in self.transitions)
+
+    def step(self) -> List[Tuple[int, bool]]:
+        """Capture and analyse one frame; returns (region index, new state) for each transition."""
+        regions = self.pending_regions
+        if regions is not self.regions:
+            executors = self.pending_executors
+            self._apply_regions(regions, executors)
+            if self.pending_executors is executors:
+                self.pending_executors = None
+
+        self.capture_ns = time.perf_counter_ns()
+        results = [None] * len(self.regions)
+        grab_total_ns = 0
+        # Each grab is analysed before the next, as a backend may reuse its buffer
+        for group, (bounds, members) in enumerate(self.grabs):
+            start_ns = time.perf_counter_ns()
+            frame = self.capture.grab(bounds)
+            grab_total_ns += time.perf_counter_ns() - start_ns
+            if group == 0:
+                self.frame = frame
+            for index, rows, cols in members:
+                results[index] = self._evaluate(index, frame[rows, cols])
+        self.analysis_ns = time.perf_counter_ns()
+        self.recorder.record_frame(self.capture_ns, self.capture_ns + grab_total_ns, self.analysis_ns)
+        self.activity = any(activity for _, activity in results)
+
+        changes = []
+        for index, (changed, _) in enumerate(results):
+            state = self.transitions[index].update(changed)
+            if state is None:
+                continue
+            changes.append((index, state))
+            executor = self.executors[index]
+            if executor:
+                if state:
+                    executor.activate(self.analysis_ns, self.capture_ns)
+                else:
+                    executor.deactivate()
+        return changes
+
+    def stop(self):
+        """Stop all actions and return every region to the off state."""
+        for transitions in self.transitions:
+            transitions.reset()
+        for executor in self.executors:
+            if executor:
+                executor.deactivate()
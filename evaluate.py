@@ -0,0 +1,222 @@
+"""Offline sweep of color detection settings over recorded frame dumps.
+
+Each dump's frames are sampled once per match mode, and every pixel's deviation
+from the region's colors is turned into mismatch counts for all tolerances in a
+single histogram pass. Thresholds and debouncing are then applied across the
+whole grid at once, and each setting is scored against the labeled trigger
+points by precision, recall and detection latency.
+
+Labels for DUMP.atr are read from DUMP.labels, one trigger frame index per line,
+or else taken from the triggers recorded in the dump.
+
+Run with: python evaluate.py DUMP [DUMP ...] [--tolerance 5:60:5] [--threshold 0.5,1,2,5]
+                             [--modes rgb,box,hsv,lab] [--window 10] [--top 20] [--csv FILE]
+"""
+import argparse
+import csv
+import os
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from detection import MATCH_MODES, deviation_table, mismatch_limit, palette_distance_sq, sample_stride, table_index
+from engine import RegionConfig
+from recording import Recording
+
+
+def parse_grid(text: str, cast=float) -> list:
+    """Parses "start:stop:step" (inclusive) or a comma-separated list."""
+    if ":" in text:
+        start, stop, step = (cast(part) for part in text.split(":"))
+        return [cast(v) for v in np.arange(start, stop + step / 2, step)]
+    return [cast(part) for part in text.split(",")]
+
+
+def onsets(active: np.ndarray) -> np.ndarray:
+    """Returns the frame indices at which a boolean sequence switches on."""
+    active = np.asarray(active, dtype=bool)
+    return np.flatnonzero(active & ~np.concatenate(([False], active[:-1])))
+
+
+def load_labels(path: str, recording: Recording) -> np.ndarray:
+    """Returns the labeled trigger frames for a dump."""
+    labels_path = os.path.splitext(path)[0] + ".labels"
+    if not os.path.exists(labels_path):
+        return onsets(recording.active)
+    with open(labels_path) as f:
+        lines = (line.split("#")[0].strip() for line in f)
+        return np.array(sorted(int(line) for line in lines if line), dtype=np.int64)
+
+
+def region_deviations(recording: Recording, region: RegionConfig, mode: str) -> np.ndarray:
+    """Returns (frames, samples) deviations of the region's sampled pixels from its colors.
+
+    The pixels sampled are the ones the live detector would look at: all of them
+    for the coarse-to-fine scan, which counts at full resolution wherever its
+    samples see a deviation.
+    """
+    left, top = region.rect[0] - recording.bounds[0], region.rect[1] - recording.bounds[1]
+    width, height = region.rect[2], region.rect[3]
+    stride = 1 if region.scan_order == "pyramid" else sample_stride(width, height, 4096)
+    samples = recording.frames[:, top:top + height:stride, left:left + width:stride]
+    count = len(samples)
+    colors = (tuple(region.base_color),) + tuple(region.extra_colors)
+    if mode == "rgb":
+        # The exact distance the live detector uses
+        return np.sqrt(palette_distance_sq(samples, colors)).reshape(count, -1)
+    return deviation_table(colors, mode)[table_index(samples)].reshape(count, -1)
+
+
+def mismatch_counts(deviations: np.ndarray, max_tolerance: int) -> np.ndarray:
+    """Returns (frames, max_tolerance + 1) counts of samples whose deviation exceeds each tolerance.
+
+    With integer tolerances, deviation > t exactly when ceil(deviation) > t, so
+    one bincount of the rounded-up deviations per frame covers every tolerance.
+    """
+    frames = len(deviations)
+    width = max_tolerance + 2
+    keys = np.minimum(np.ceil(deviations), max_tolerance + 1).astype(np.int64)
+    keys += np.arange(frames, dtype=np.int64)[:, None] * width
+    bins = np.bincount(keys.ravel(), minlength=frames * width).reshape(frames, width)
+    # at_least[:, k] counts samples whose rounded deviation is k or more
+    at_least = bins[:, ::-1].cumsum(axis=1)[:, ::-1]
+    return at_least[:, 1:]
+
+
+def debounce(changed: np.ndarray, on_frames: int, off_frames: int) -> np.ndarray:
+    """Applies TransitionFilter to every column of a (frames, settings) array at once."""
+    if on_frames <= 1 and off_frames <= 1:
+        return changed
+    states = np.empty_like(changed)
+    state = np.zeros(changed.shape[1], dtype=bool)
+    streak = np.zeros(changed.shape[1], dtype=np.int64)
+    needed_on, needed_off = max(1, on_frames), max(1, off_frames)
+    for index, row in enumerate(changed):
+        streak = np.where(row != state, streak + 1, 0)
+        flip = streak >= np.where(row, needed_on, needed_off)
+        state = np.where(flip, row, state)
+        streak[flip] = 0
+        states[index] = state
+    return states
+
+
+def sweep_recording(recording: Recording, regions: Sequence[RegionConfig], modes: Sequence[str],
+                    tolerances: Sequence[int], thresholds: Sequence[float]) -> np.ndarray:
+    """Returns (modes, tolerances, thresholds, frames) of whether any region was triggered."""
+    tolerance_index = np.asarray(tolerances, dtype=np.int64)
+    max_tolerance = int(tolerance_index.max())
+    frames = len(recording.frames)
+    active = np.zeros((len(modes), len(tolerances), len(thresholds), frames), dtype=bool)
+    for m, mode in enumerate(modes):
+        for region in regions:
+            deviations = region_deviations(recording, region, mode)
+            counts = mismatch_counts(deviations, max_tolerance)[:, tolerance_index]
+            limits = np.array([mismatch_limit(deviations.shape[1], t) for t in thresholds])
+            changed = (counts[:, :, None] > limits).reshape(frames, -1)
+            states = debounce(changed, region.on_frames, region.off_frames)
+            active[m] |= states.T.reshape(len(tolerances), len(thresholds), frames)
+    return active
+
+
+def score(predicted: np.ndarray, labels: np.ndarray, window: int) -> List[Tuple[int, int]]:
+    """Matches predicted trigger frames to labels.
+
+    A label is detected by the first unused prediction from its frame up to
+    window frames later. Returns the (label, prediction) frame pairs matched.
+    """
+    used = np.zeros(len(predicted), dtype=bool)
+    matches = []
+    for label in labels:
+        candidates = np.flatnonzero(~used & (predicted >= label) & (predicted <= label + window))
+        if candidates.size:
+            used[candidates[0]] = True
+            matches.append((int(label), int(predicted[candidates[0]])))
+    return matches
+
+
+def evaluate(paths: Sequence[str], modes: Sequence[str], tolerances: Sequence[int],
+             thresholds: Sequence[float], window: int) -> List[dict]:
+    """Sweeps every setting over every dump and returns one result row per setting."""
+    shape = (len(modes), len(tolerances), len(thresholds))
+    true_positives = np.zeros(shape, dtype=np.int64)
+    predictions = np.zeros(shape, dtype=np.int64)
+    offsets_frames = {index: [] for index in np.ndindex(shape)}
+    offsets_ms = {index: [] for index in np.ndindex(shape)}
+    label_count = 0
+
+    for path in paths:
+        recording = Recording.load(path)
+        regions = [r for r in recording.regions if r.detector == "color"]
+        if not regions:
+            print(f"Skipping {path}: no color regions to sweep")
+            continue
+        labels = load_labels(path, recording)
+        label_count += len(labels)
+        active = sweep_recording(recording, regions, modes, tolerances, thresholds)
+        for index in np.ndindex(shape):
+            predicted = onsets(active[index])
+            matches = score(predicted, labels, window)
+            true_positives[index] += len(matches)
+            predictions[index] += len(predicted)
+            offsets_frames[index].extend(hit - label for label, hit in matches)
+            offsets_ms[index].extend(
+                (recording.capture_ns[hit] - recording.capture_ns[label]) / 1e6 for label, hit in matches
+            )
+
+    rows = []
+    for index in np.ndindex(shape):
+        m, t, h = index
+        tp, predicted = int(true_positives[index]), int(predictions[index])
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / label_count if label_count else 0.0
+        rows.append({
+            "mode": modes[m],
+            "tolerance": tolerances[t],
+            "threshold": thresholds[h],
+            "precision": precision,
+            "recall": recall,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+            "latency_frames": float(np.mean(offsets_frames[index])) if offsets_frames[index] else None,
+            "latency_ms": float(np.median(offsets_ms[index])) if offsets_ms[index] else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep detection settings over recorded frame dumps")
+    parser.add_argument("dumps", nargs="+", help="Files written by a frame dump")
+    parser.add_argument("--tolerance", default="5:60:5", help="Tolerances as start:stop:step or a list")
+    parser.add_argument("--threshold", default="0.5,1,2,5,10", help="Threshold percents as start:stop:step or a list")
+    parser.add_argument("--modes", default=",".join(MATCH_MODES), help="Comma-separated match modes")
+    parser.add_argument("--window", type=int, default=10, help="Frames after a label in which a trigger counts")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print, best F1 first")
+    parser.add_argument("--csv", help="Also write every row to this CSV file")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    for mode in modes:
+        if mode not in MATCH_MODES:
+            parser.error(f"Unknown match mode: {mode}")
+    tolerances = parse_grid(args.tolerance, int)
+    thresholds = parse_grid(args.threshold, float)
+
+    rows = evaluate(args.dumps, modes, tolerances, thresholds, args.window)
+    rows.sort(key=lambda row: (-row["f1"], row["latency_frames"] if row["latency_frames"] is not None else np.inf))
+
+    print(f"{'Mode':<5} {'Tol':>4} {'Thr %':>6} {'Precision':>10} {'Recall':>7} {'F1':>6} "
+          f"{'Frames':>7} {'ms':>7}")
+    for row in rows[:args.top]:
+        frames = f"{row['latency_frames']:.1f}" if row["latency_frames"] is not None else "-"
+        ms = f"{row['latency_ms']:.1f}" if row["latency_ms"] is not None else "-"
+        print(f"{row['mode']:<5} {row['tolerance']:>4} {row['threshold']:>6.2f} {row['precision']:>10.2f} "
+              f"{row['recall']:>7.2f} {row['f1']:>6.2f} {frames:>7} {ms:>7}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
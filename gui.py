@@ -0,0 +1,2016 @@
+"""The Auto-Trigger window; main.py starts it."""
+import argparse
+import sys
+import threading
+import time
+from functools import partial
+from typing import TYPE_CHECKING, List, Tuple
+
+from PySide6.QtCore import (QObject, QRunnable, QSize, Qt, QThreadPool, Signal,
+                            Slot, QTimer, QRect, QPoint)
+from PySide6.QtGui import QFont, QPainter, QPen, QColor, QScreen, QCursor
+from PySide6.QtWidgets import (QApplication, QCheckBox, QFormLayout, QMainWindow, 
+                               QPushButton, QSlider, QWidget, QComboBox, QLabel, 
+                               QLineEdit, QStackedWidget, QHBoxLayout, QVBoxLayout, QSpinBox,
+                               QDoubleSpinBox, QFileDialog,
+                               QDialog, QListWidget, QDialogButtonBox, QMessageBox, QScrollArea)
+
+from actions import ClickExecutor, DirectInputBackend
+from latency import LatencyRecorder
+from scheduler import AdaptiveScheduler
+from screens import ScreenTopology, match_monitors
+from startup import TARGET_INTERACTIVE_MS, StartupProfile
+
+if TYPE_CHECKING:
+    from capture import CaptureService
+    from engine import RegionConfig
+    from profiles import Profile, ProfileStore
+
+# keyboard, pydirectinput, numpy and everything built on it (capture, detection,
+# the engine and profiles), the detection process and frame recording are
+# imported on first use or in the background once the window is up
+IMPORTED_NS = time.perf_counter_ns()
+
+# The names of capture.BACKENDS, listed here so the window opens without importing capture
+CAPTURE_BACKENDS = ("mss", "xshm", "qt")
+
+
+class DetectionBox(QWidget):
+    """A movable, semi-transparent box for visual detection area feedback."""
+    geometry_changed = Signal()
+    
+    BORDER = 2  # Border width around the detection area
+    MIN_REGION_SIZE = 4
+    MAX_REGION_SIZE = 512
+    
+    def __init__(self, region_size: int = 16, color: QColor = QColor(255, 0, 0)):
+        super().__init__()
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.region_size = region_size
+        self.color = color  # Border color while unlocked
+        self.setFixedSize(region_size + 2 * self.BORDER, region_size + 2 * self.BORDER)
+        
+        # For dragging
+        self.dragging = False
+        self.drag_position = QPoint()
+        self.locked = False  # Lock state for the box
+        
+        # Center on screen initially
+        self.reset_to_center()
+        
+    def paintEvent(self, event):
+        """Draw the detection box with border and nearly-invisible fill for mouse events."""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # Draw a nearly-invisible fill (alpha=1) so the entire box area receives mouse events
+        # This won't interfere with detection since we offset by 2 pixels
+        painter.fillRect(self.rect(), QColor(255, 0, 0, 1))
+        
+        # Draw the solid border (box color if unlocked, yellow if locked)
+        border_color = QColor(255, 255, 0, 255) if self.locked else self.color
+        pen = QPen(border_color, 2)
+        painter.setPen(pen)
+        painter.drawRect(1, 1, self.width() - 2, self.height() - 2)  # Draw border around the box
+        
+    def mousePressEvent(self, event):
+        """Start dragging the box (if not locked)."""
+        if event.button() == Qt.LeftButton and not self.locked:
+            self.dragging = True
+            self.drag_position = event.globalPosition().toPoint() - self.frameGeometry().topLeft()
+            event.accept()
+    
+    def mouseMoveEvent(self, event):
+        """Move the box while dragging (if not locked)."""
+        if self.dragging and not self.locked:
+            self.move(event.globalPosition().toPoint() - self.drag_position)
+            event.accept()
+    
+    def mouseReleaseEvent(self, event):
+        """Stop dragging the box."""
+        if event.button() == Qt.LeftButton:
+            self.dragging = False
+            event.accept()
+    
+    def moveEvent(self, event):
+        """Notify listeners that the detection area moved."""
+        super().moveEvent(event)
+        self.geometry_changed.emit()
+    
+    def resizeEvent(self, event):
+        """Notify listeners that the detection area was resized."""
+        super().resizeEvent(event)
+        self.geometry_changed.emit()
+    
+    def get_detection_rect(self) -> QRect:
+        """Returns the inner detection area (excluding the border)."""
+        pos = self.pos()
+        # Offset by the border width to avoid capturing the border itself
+        return QRect(pos.x() + self.BORDER, pos.y() + self.BORDER, self.region_size, self.region_size)
+    
+    def set_region_size(self, size: int):
+        """Resize the detection area, keeping the box centered where it was."""
+        center = self.geometry().center()
+        self.region_size = size
+        self.setFixedSize(size + 2 * self.BORDER, size + 2 * self.BORDER)
+        self.move(center.x() - self.width() // 2, center.y() - self.height() // 2)
+        self.update()
+    
+    def set_detection_rect(self, rect: Tuple[int, int, int, int]):
+        """Place the box so its inner detection area is the (left, top, width, height) rect."""
+        self.set_region_size(rect[2])
+        self.move(rect[0] - self.BORDER, rect[1] - self.BORDER)
+    
+    def set_locked(self, locked: bool):
+        """Set the lock state of the box."""
+        self.locked = locked
+        self.update()  # Redraw to show color change
+    
+    def is_locked(self) -> bool:
+        """Check if the box is locked."""
+        return self.locked
+    
+    def get_position(self) -> QPoint:
+        """Get the current position of the box."""
+        return self.pos()
+    
+    def set_position(self, position: QPoint):
+        """Set the position of the box."""
+        self.move(position)
+    
+    def reset_to_center(self):
+        """Reset the box to the center of the screen it is on."""
+        screen = QApplication.screenAt(self.geometry().center()) or QApplication.instance().primaryScreen()
+        screen_geometry = screen.geometry()
+        center = screen_geometry.center()
+        self.move(center.x() - self.width() // 2, center.y() - self.height() // 2)
+
+
+class PositionManagerDialog(QDialog):
+    """Dialog for managing saved detection box positions."""
+    
+    # ==================== DEFAULT POSITIONS ====================
+    # Add your default positions here in the format: "Name": QPoint(x, y)
+    DEFAULT_POSITIONS = {
+        # Example: "Top Left": QPoint(100, 100),
+        # Example: "Center": QPoint(960, 540),
+    }
+    # ===========================================================
+    
+    def __init__(self, parent=None, current_position: QPoint = None, store: "ProfileStore" = None):
+        super().__init__(parent)
+        self.setWindowTitle("Manage Positions")
+        self.setModal(True)
+        self.setMinimumSize(400, 300)
+        
+        self.current_position = current_position
+        self.saved_positions = dict(self.DEFAULT_POSITIONS)  # Start with defaults
+        # Positions saved in earlier sessions
+        self.store = store
+        if store:
+            try:
+                for name, (x, y) in store.load_positions().items():
+                    self.saved_positions[name] = QPoint(x, y)
+            except (OSError, ValueError) as e:
+                print(f"Could not read saved positions: {e}")
+        self.selected_position = None
+        
+        self.init_ui()
+        
+        # Apply dark theme
+        self.setStyleSheet(parent.styleSheet() if parent else "")
+    
+    def init_ui(self):
+        """Initialize the UI components."""
+        layout = QVBoxLayout()
+        
+        # Title
+        title = QLabel("Saved Positions")
+        title_font = QFont("Segoe UI", 11, QFont.Bold)
+        title.setFont(title_font)
+        layout.addWidget(title)
+        
+        # List of saved positions
+        self.position_list = QListWidget()
+        self.position_list.itemDoubleClicked.connect(self.load_selected_position)
+        self.refresh_position_list()
+        layout.addWidget(self.position_list)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        
+        save_button = QPushButton("Save Current")
+        save_button.clicked.connect(self.save_current_position)
+        button_layout.addWidget(save_button)
+        
+        load_button = QPushButton("Load Selected")
+        load_button.clicked.connect(self.load_selected_position)
+        button_layout.addWidget(load_button)
+        
+        delete_button = QPushButton("Delete Selected")
+        delete_button.clicked.connect(self.delete_selected_position)
+        button_layout.addWidget(delete_button)
+        
+        layout.addLayout(button_layout)
+        
+        # Dialog buttons
+        dialog_buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        dialog_buttons.rejected.connect(self.reject)
+        layout.addLayout(button_layout)
+        layout.addWidget(dialog_buttons)
+        
+        self.setLayout(layout)
+    
+    def refresh_position_list(self):
+        """Refresh the list of saved positions."""
+        self.position_list.clear()
+        for name, pos in self.saved_positions.items():
+            self.position_list.addItem(f"{name} ({pos.x()}, {pos.y()})")
+    
+    def save_current_position(self):
+        """Save the current position with a user-provided name."""
+        from PySide6.QtWidgets import QInputDialog
+        
+        name, ok = QInputDialog.getText(self, "Save Position", "Enter a name for this position:")
+        if ok and name:
+            if name in self.saved_positions:
+                reply = QMessageBox.question(
+                    self, "Overwrite?",
+                    f"Position '{name}' already exists. Overwrite?",
+                    QMessageBox.Yes | QMessageBox.No
+                )
+                if reply != QMessageBox.Yes:
+                    return
+            
+            self.saved_positions[name] = QPoint(self.current_position)
+            self.persist_positions()
+            self.refresh_position_list()
+            QMessageBox.information(self, "Saved", f"Position '{name}' saved successfully!")
+    
+    def load_selected_position(self):
+        """Load the selected position."""
+        current_item = self.position_list.currentItem()
+        if not current_item:
+            QMessageBox.warning(self, "No Selection", "Please select a position to load.")
+            return
+        
+        # Extract name from the list item text (format: "Name (x, y)")
+        item_text = current_item.text()
+        name = item_text.split(" (")[0]
+        
+        if name in self.saved_positions:
+            self.selected_position = self.saved_positions[name]
+            self.accept()
+    
+    def delete_selected_position(self):
+        """Delete the selected position."""
+        current_item = self.position_list.currentItem()
+        if not current_item:
+            QMessageBox.warning(self, "No Selection", "Please select a position to delete.")
+            return
+        
+        # Extract name from the list item text
+        item_text = current_item.text()
+        name = item_text.split(" (")[0]
+        
+        # Don't allow deleting default positions
+        if name in self.DEFAULT_POSITIONS:
+            QMessageBox.warning(self, "Cannot Delete", "Cannot delete default positions.")
+            return
+        
+        reply = QMessageBox.question(
+            self, "Confirm Delete",
+            f"Are you sure you want to delete '{name}'?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            del self.saved_positions[name]
+            self.persist_positions()
+            self.refresh_position_list()
+    
+    def persist_positions(self):
+        """Write the user's positions (not the defaults) to disk."""
+        if not self.store:
+            return
+        positions = {name: (pos.x(), pos.y()) for name, pos in self.saved_positions.items()
+                     if name not in self.DEFAULT_POSITIONS}
+        try:
+            self.store.save_positions(positions)
+        except OSError as e:
+            QMessageBox.warning(self, "Save Failed", f"Could not save positions:\n{e}")
+    
+    def get_selected_position(self) -> QPoint:
+        """Get the position that was selected to load."""
+        return self.selected_position
+
+
+class ColorPickerOverlay(QWidget):
+    """Full-screen overlay for picking a color from anywhere on screen."""
+    color_picked = Signal(tuple)
+    cancelled = Signal()
+    
+    def __init__(self, capture_service: "CaptureService", topology: ScreenTopology):
+        super().__init__()
+        self.capture_service = capture_service
+        self.topology = topology
+        # Cover every screen so a color can be picked from any monitor
+        geometry = QApplication.instance().primaryScreen().virtualGeometry()
+        self.setGeometry(geometry)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setCursor(Qt.CrossCursor)
+        self.show()
+        self.activateWindow()
+        self.raise_()
+    
+    def mousePressEvent(self, event):
+        """Pick the color at the clicked position."""
+        pos = event.globalPosition().toPoint()
+        
+        # Capture the single physical pixel under the clicked logical position
+        self.color_picked.emit(self.capture_service.pixel(*self.topology.point_to_physical(pos.x(), pos.y())))
+        
+        self.close()
+    
+    def keyPressEvent(self, event):
+        """Cancel on Escape key."""
+        if event.key() == Qt.Key_Escape:
+            self.cancelled.emit()
+            self.close()
+
+
+class WorkerSignals(QObject):
+    """Defines the signals available from a running worker thread."""
+    detection_changed = Signal(bool, object)  # (state, perf_counter_ns when analysis finished)
+    stats_updated = Signal(dict)
+    frames_dumped = Signal(str)
+
+
+class DetectionWorker(QRunnable):
+    """Worker thread for background change detection."""
+    
+    SPIN_NS = 500_000  # Busy-wait the last 0.5ms before each deadline in precise mode
+    STATS_INTERVAL_NS = 1_000_000_000
+    
+    def __init__(self, regions: List["RegionConfig"], executors: List[ClickExecutor],
+                 rate_hz: float = 33.0, precise_timing: bool = False,
+                 recorder: LatencyRecorder = None, capture: "CaptureService" = None,
+                 idle: Tuple[bool, float, float] = (False, 5.0, 2.0), separate_process: bool = False,
+                 recording: Tuple[int, bool] = (0, False), monitors: List[Tuple[int, int, int, int]] = ()):
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.is_running = True
+        self.executors = executors
+        # idle is (enabled, idle rate in Hz, quiet period in seconds)
+        idle_enabled, idle_hz, quiet_s = idle
+        self.scheduler = AdaptiveScheduler(rate_hz, idle_hz, quiet_s, idle_enabled,
+                                           spin_ns=self.SPIN_NS if precise_timing else 0)
+        self.recorder = recorder or LatencyRecorder()
+        
+        # With separate_process, capture and analysis run in a child process and
+        # this thread only relays its transitions to the executors and the GUI
+        # recording is (frames kept in the ring, dump on trigger); no ring when zero
+        # monitors are the physical monitor rectangles, so each monitor gets its own grab
+        from capture import CaptureService, MssCapture, QtCapture
+        from engine import DetectionEngine
+        self.process = None
+        self.region_states = {}
+        if separate_process:
+            from detection_process import DetectionProcess
+            backend_factory = capture.backend_factory if capture else MssCapture
+            if backend_factory is QtCapture:
+                # The child has no Qt application to grab through
+                backend_factory = MssCapture
+            self.process = DetectionProcess(regions, rate_hz, self.scheduler.spin_ns, idle, recording=recording,
+                                            monitors=monitors, capture_factory=partial(CaptureService, backend_factory))
+            return
+        ring_frames, dump_on_trigger = recording
+        self.frame_recorder = None
+        if ring_frames:
+            from recording import TriggerRecorder
+            self.frame_recorder = TriggerRecorder(ring_frames, dump_on_trigger)
+        
+        # Regions on the same monitor share one grab of their bounding rectangle;
+        # the capture service keeps the worker thread's grabber open between runs
+        self.engine = DetectionEngine(capture or CaptureService(), regions, executors, recorder=self.recorder,
+                                      monitors=monitors)
+    
+    def update_settings(self, regions: List["RegionConfig"], rate_hz: float, precise_timing: bool,
+                        idle: Tuple[bool, float, float] = (False, 5.0, 2.0),
+                        executors: List[ClickExecutor] = None):
+        """Apply new settings from any thread; the loop picks them up on its next frame.
+        
+        executors replaces the regions' actions too, for switching to a different profile.
+        """
+        spin_ns = self.SPIN_NS if precise_timing else 0
+        if executors is not None:
+            self.executors = executors
+        if self.process:
+            if executors is not None:
+                # New actions take over regions that are already triggered
+                for index, state in list(self.region_states.items()):
+                    if state and index < len(executors) and executors[index]:
+                        executors[index].activate()
+            self.process.update_settings(regions, rate_hz, spin_ns, idle)
+            return
+        self.engine.set_regions(regions, executors)
+        idle_enabled, idle_hz, quiet_s = idle
+        self.scheduler.configure(rate_hz, idle_hz, quiet_s, idle_enabled)
+        self.scheduler.spin_ns = spin_ns
+    
+    @Slot()
+    def run(self):
+        """Main worker loop for screen capture and analysis."""
+        if self.process:
+            self.relay_process()
+            return
+        engine = self.engine
+        next_stats = 0
+        was_active = False
+        try:
+            while self.is_running:
+                # Wait for the next absolute deadline before capturing
+                self.scheduler.wait()
+                # stop() may have been called while waiting
+                if not self.is_running:
+                    break
+                
+                # The engine drives the executors itself; only flips of the
+                # overall "any region triggered" state reach the GUI
+                changes = engine.step()
+                if changes and engine.active != was_active:
+                    was_active = engine.active
+                    self.signals.detection_changed.emit(was_active, engine.analysis_ns)
+                
+                if self.frame_recorder:
+                    self.frame_recorder.after_step(engine, any(state for _, state in changes))
+                    while self.frame_recorder.saved:
+                        self.signals.frames_dumped.emit(self.frame_recorder.saved.popleft())
+                
+                # Any deviation, even below the threshold, returns to the full rate
+                self.scheduler.report(engine.activity, engine.analysis_ns - engine.capture_ns)
+                
+                # Report the achieved rate and jitter about once a second
+                if self.scheduler.last_tick >= next_stats:
+                    stats = self.scheduler.stats()
+                    stats["matches"] = engine.matches()
+                    self.signals.stats_updated.emit(stats)
+                    next_stats = self.scheduler.last_tick + self.STATS_INTERVAL_NS
+        finally:
+            # Nothing stays triggered once the loop exits, also after an error
+            engine.stop()
+            if was_active:
+                self.signals.detection_changed.emit(False, None)
+    
+    def request_dump(self):
+        """Write the recent frames to a file after the next frame, if a ring is kept."""
+        if self.process:
+            self.process.request_dump()
+        elif self.frame_recorder:
+            self.frame_recorder.request_dump()
+    
+    def relay_process(self):
+        """Forward the child process's transitions to the executors and its stats to the GUI."""
+        self.region_states = states = {}
+        was_active = False
+        try:
+            while self.is_running:
+                for event in self.process.poll(0.05):
+                    if not self.is_running:
+                        break
+                    if event[0] == "stats":
+                        self.signals.stats_updated.emit(event[1])
+                        continue
+                    if event[0] == "dumped":
+                        self.signals.frames_dumped.emit(event[1])
+                        continue
+                    _, index, state, capture_ns, analysis_ns = event
+                    states[index] = state
+                    executor = self.executors[index] if index < len(self.executors) else None
+                    if executor:
+                        if state:
+                            executor.activate(analysis_ns, capture_ns)
+                        else:
+                            executor.deactivate()
+                    if any(states.values()) != was_active:
+                        was_active = not was_active
+                        self.signals.detection_changed.emit(was_active, analysis_ns)
+                if not self.process.alive:
+                    break
+        finally:
+            self.process.stop()
+            for executor in self.executors:
+                if executor:
+                    executor.deactivate()
+            if was_active:
+                self.signals.detection_changed.emit(False, None)
+    
+    def stop(self):
+        self.is_running = False
+        for executor in self.executors:
+            if executor:
+                executor.deactivate()
+        # Emit False on stop to ensure spamming ceases
+        self.signals.detection_changed.emit(False, None)
+
+
+class MainWindow(QMainWindow):
+    BACKGROUND_ALPHA = 0.05  # Weight of each new frame in the rolling motion background
+    NEXT_PROFILE_HOTKEY = 'f7'
+    
+    # Carries profile hotkeys from the keyboard hook's thread to the GUI thread
+    profile_hotkey_pressed = Signal(str)
+    # Carries capture backend timings from the worker thread to the GUI thread
+    capture_benchmarked = Signal(object)
+    # Carries (task name, result) of background startup tasks to the GUI thread
+    background_done = Signal(str, object)
+    # Emitted once every background startup task has finished
+    startup_finished = Signal()
+    
+    def __init__(self, startup: StartupProfile = None):
+        super().__init__()
+        self.startup = startup or StartupProfile(time.perf_counter_ns())
+        self.startup_done = False
+        self.setWindowTitle("Auto-Trigger")
+        # The settings scroll when the window is shorter than the full form, as on 768 px screens
+        self.setMinimumSize(QSize(440, 360))
+        available = QApplication.primaryScreen().availableGeometry()
+        self.resize(QSize(440, min(880, available.height() * 9 // 10)))
+        
+        # Apply dark theme before any widget exists, so each is styled once when first shown
+        self.apply_dark_theme()
+        self.startup.mark("theme")
+        
+        # Startup tasks and benchmarks run on the general pool. Detection always runs on the
+        # one thread of its own pool, kept alive between runs so its capture handle stays warm
+        self.threadpool = QThreadPool()
+        self.detection_pool = QThreadPool()
+        self.detection_pool.setMaxThreadCount(1)
+        self.detection_pool.setExpiryTimeout(-1)
+        self.worker = None
+        # Created on first use, which is normally the startup capture benchmark off the
+        # GUI thread, so numpy and the capture backends load after the window is up
+        self._capture_service = None
+        self._capture_lock = threading.Lock()
+        self.capture_benchmarked.connect(self.on_capture_benchmarked)
+        self.background_done.connect(self.on_background_done)
+        self.color_picker_overlay = None
+        
+        # --- Screens ---
+        # Boxes live in Qt's logical coordinates; capture needs physical pixels.
+        # Until the backend reports the physical monitors, each screen's
+        # logical geometry is scaled, which is exact with a single scale factor
+        self.screen_topology = None
+        self.physical_monitors = []
+        self.update_screen_topology()
+        app = QApplication.instance()
+        app.screenAdded.connect(self.on_screen_added)
+        app.screenRemoved.connect(self.on_screens_changed)
+        for screen in app.screens():
+            self.watch_screen(screen)
+        
+        # --- App State ---
+        self.base_color = (0, 0, 0)
+        self.extra_colors = []  # Further shades that also count as unchanged
+        self.template = None  # BGRA patch searched for by the template detector
+        self.is_running = False
+        
+        # --- Detection Box ---
+        self.detection_box = DetectionBox()
+        self.detection_box.geometry_changed.connect(self.push_live_settings)
+        self.detection_box.show()
+        
+        # --- Additional Regions ---
+        # Each entry is (DetectionBox, settings captured by region_settings())
+        self.extra_regions = []
+        self.region_executors = []
+        
+        # --- Profiles ---
+        # Every saved profile is loaded and compiled in the background after
+        # launch, so switching is instant once they arrive; until then there is no store
+        self.profile_store = None
+        self.current_profile = None
+        self.applying_profile = False
+        self.profile_hotkeys = []
+        self.profile_hotkey_pressed.connect(self.switch_profile)
+        
+        # --- Latency Instrumentation ---
+        self.latency_recorder = LatencyRecorder()
+        
+        # --- Input Backend ---
+        # pydirectinput and keyboard are loaded in the background after launch
+        self.action_backend = DirectInputBackend()
+        self.hotkeys_ready = False
+        
+        # --- Click Executor ---
+        self.click_executor = ClickExecutor(self.action_backend.click, interval_ms=30,  # 30ms delay between clicks
+                                            recorder=self.latency_recorder)
+        self.click_executor.start()
+        
+        # --- Auto Reload Timer ---
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setInterval(1000)  # 1 second default
+        self.reload_timer.timeout.connect(self.perform_reload)
+        self.startup.mark("state and detection box")
+        
+        # --- Build UI ---
+        self.build_ui()
+        
+        # Set default color
+        self.update_base_color((0, 0, 0))
+        self.startup.mark("widgets")
+        
+        # Everything else loads once the event loop is running and the window is up
+        QTimer.singleShot(0, self.finish_startup)
+    
+    @property
+    def capture_service(self) -> "CaptureService":
+        """The capture service shared by detection, the color picker and template capture."""
+        with self._capture_lock:
+            if self._capture_service is None:
+                from capture import CaptureService
+                self._capture_service = CaptureService()
+            return self._capture_service
+    
+    def finish_startup(self):
+        """Start the subsystems not needed to show the window, on the thread pool."""
+        self.startup.interactive()
+        self.run_in_background("input backend", self.action_backend.load)
+        self.run_in_background("keyboard hooks", self.load_keyboard)
+        self.run_in_background("profiles", self.load_profiles)
+        self.run_in_background("monitors", self.load_monitors)
+        # Pick the fastest capture backend, then open it on the detection thread
+        # so the first F6 press starts detecting immediately
+        self.benchmark_capture()
+    
+    def run_in_background(self, name: str, job):
+        """Run job on the thread pool as a startup task; its result arrives in on_background_done."""
+        self.startup.begin(name)
+        
+        def run():
+            try:
+                result = job()
+            except Exception as e:
+                result = e
+            self.background_done.emit(name, result)
+        self.threadpool.start(run)
+    
+    @staticmethod
+    def load_keyboard():
+        import keyboard
+        return keyboard
+    
+    @staticmethod
+    def load_monitors():
+        from capture import MssCapture
+        # A throwaway grabber, so the answer does not depend on the backend being benchmarked
+        with MssCapture() as capture:
+            return capture.monitors()
+    
+    @staticmethod
+    def load_profiles():
+        from profiles import ProfileStore
+        store = ProfileStore()
+        return store, store.load_all()
+    
+    @Slot(str, object)
+    def on_background_done(self, name: str, result):
+        """Put a finished startup task's result to use on the GUI thread."""
+        self.startup.end(name)
+        if isinstance(result, Exception):
+            print(f"Startup task {name} failed: {result}")
+        elif name == "keyboard hooks":
+            self.hotkeys_ready = True
+            self.setup_hotkey()
+            self.setup_profile_hotkeys()
+        elif name == "profiles":
+            store, errors = result
+            for error in errors:
+                print(f"Could not load profile {error}")
+            # Keep anything saved while the profiles were loading
+            if self.profile_store is not None:
+                store.profiles.update(self.profile_store.profiles)
+            self.profile_store = store
+            self.refresh_profile_combo()
+            self.setup_profile_hotkeys()
+        elif name == "monitors":
+            self.physical_monitors = result
+            self.on_screens_changed()
+        self.check_startup_finished()
+    
+    def check_startup_finished(self):
+        if self.startup.pending == 0 and not self.startup_done:
+            self.startup_done = True
+            self.startup_finished.emit()
+    
+    def apply_dark_theme(self):
+        """Apply a modern dark theme to the application."""
+        dark_stylesheet = """
+            QMainWindow {
+                background-color: #1e1e1e;
+            }
+            QWidget {
+                background-color: #1e1e1e;
+                color: #e0e0e0;
+                font-family: 'Segoe UI', Arial, sans-serif;
+            }
+            QLabel {
+                color: #e0e0e0;
+                font-size: 10pt;
+            }
+            QPushButton {
+                background-color: #2d2d30;
+                color: #e0e0e0;
+                border: 1px solid #3f3f46;
+                border-radius: 4px;
+                padding: 6px 12px;
+                font-size: 10pt;
+            }
+            QPushButton:hover {
+                background-color: #3e3e42;
+                border: 1px solid #007acc;
+            }
+            QPushButton:pressed {
+                background-color: #007acc;
+            }
+            QPushButton:disabled {
+                background-color: #2d2d30;
+                color: #656565;
+            }
+            QCheckBox {
+                color: #e0e0e0;
+                font-size: 10pt;
+                spacing: 8px;
+            }
+            QCheckBox::indicator {
+                width: 18px;
+                height: 18px;
+                border: 1px solid #3f3f46;
+                border-radius: 3px;
+                background-color: #2d2d30;
+            }
+            QCheckBox::indicator:checked {
+                background-color: #007acc;
+                border: 1px solid #007acc;
+            }
+            QCheckBox::indicator:hover {
+                border: 1px solid #007acc;
+            }
+            QSlider::groove:horizontal {
+                height: 6px;
+                background: #2d2d30;
+                border-radius: 3px;
+            }
+            QSlider::handle:horizontal {
+                background: #007acc;
+                width: 16px;
+                margin: -5px 0;
+                border-radius: 8px;
+            }
+            QSlider::handle:horizontal:hover {
+                background: #1e8ad6;
+            }
+            QComboBox {
+                background-color: #2d2d30;
+                color: #e0e0e0;
+                border: 1px solid #3f3f46;
+                border-radius: 4px;
+                padding: 4px 8px;
+                font-size: 10pt;
+            }
+            QComboBox:hover {
+                border: 1px solid #007acc;
+            }
+            QComboBox::drop-down {
+                border: none;
+            }
+            QComboBox QAbstractItemView {
+                background-color: #2d2d30;
+                color: #e0e0e0;
+                selection-background-color: #007acc;
+                border: 1px solid #3f3f46;
+            }
+            QLineEdit {
+                background-color: #2d2d30;
+                color: #e0e0e0;
+                border: 1px solid #3f3f46;
+                border-radius: 4px;
+                padding: 4px 8px;
+                font-size: 10pt;
+            }
+            QLineEdit:focus {
+                border: 1px solid #007acc;
+            }
+            QSpinBox, QDoubleSpinBox {
+                background-color: #2d2d30;
+                color: #e0e0e0;
+                border: 1px solid #3f3f46;
+                border-radius: 4px;
+                padding: 4px 8px;
+                font-size: 10pt;
+            }
+            QSpinBox:focus, QDoubleSpinBox:focus {
+                border: 1px solid #007acc;
+            }
+            QSpinBox::up-button, QSpinBox::down-button,
+            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
+                background-color: #3e3e42;
+                border: 1px solid #3f3f46;
+                border-radius: 2px;
+            }
+            QSpinBox::up-button:hover, QSpinBox::down-button:hover,
+            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
+                background-color: #007acc;
+            }
+        """
+        self.setStyleSheet(dark_stylesheet)
+    
+    def build_ui(self):
+        """Build the main UI layout."""
+        main_layout = QVBoxLayout()
+        main_layout.setSpacing(10)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        
+        # Title
+        title_label = QLabel("Auto-Trigger Configuration")
+        title_font = QFont("Segoe UI", 12, QFont.Bold)
+        title_label.setFont(title_font)
+        title_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(title_label)
+        
+        # Enable Toggle and Click Delay
+        enable_layout = QHBoxLayout()
+        self.enable_toggle = QCheckBox("Enable Detection (F6)")
+        self.enable_toggle.toggled.connect(self.handle_toggle)
+        enable_layout.addWidget(self.enable_toggle)
+        
+        enable_layout.addStretch()
+        
+        delay_label = QLabel("Click Delay (ms):")
+        enable_layout.addWidget(delay_label)
+        
+        self.click_delay_input = QSpinBox()
+        self.click_delay_input.setMinimum(10)
+        self.click_delay_input.setMaximum(1000)
+        self.click_delay_input.setValue(30)
+        self.click_delay_input.setSuffix(" ms")
+        self.click_delay_input.setToolTip("Delay between clicks in milliseconds")
+        self.click_delay_input.valueChanged.connect(self.on_click_delay_changed)
+        enable_layout.addWidget(self.click_delay_input)
+        
+        main_layout.addLayout(enable_layout)
+        
+        # Saved profiles
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("Profile:"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.setToolTip(f"Switch to a saved profile, also while running.\n"
+                                      f"{self.NEXT_PROFILE_HOTKEY.upper()} cycles through profiles.")
+        self.profile_combo.activated.connect(lambda index: self.switch_profile(self.profile_combo.itemText(index)))
+        profile_layout.addWidget(self.profile_combo, 1)
+        self.save_profile_button = QPushButton("Save")
+        self.save_profile_button.setToolTip("Save the regions and settings as a profile")
+        self.save_profile_button.clicked.connect(self.save_profile)
+        profile_layout.addWidget(self.save_profile_button)
+        self.delete_profile_button = QPushButton("Delete")
+        self.delete_profile_button.clicked.connect(self.delete_profile)
+        profile_layout.addWidget(self.delete_profile_button)
+        main_layout.addLayout(profile_layout)
+        self.refresh_profile_combo()
+        
+        # Detection rate
+        rate_layout = QHBoxLayout()
+        rate_layout.addWidget(QLabel("Detection Rate:"))
+        self.rate_input = QSpinBox()
+        self.rate_input.setMinimum(1)
+        self.rate_input.setMaximum(500)
+        self.rate_input.setValue(33)
+        self.rate_input.setSuffix(" Hz")
+        self.rate_input.setToolTip("How many times per second the detection area is checked")
+        self.rate_input.valueChanged.connect(self.push_live_settings)
+        rate_layout.addWidget(self.rate_input)
+        
+        rate_layout.addStretch()
+        
+        self.precise_timing_toggle = QCheckBox("Precise Timing")
+        self.precise_timing_toggle.setToolTip("Busy-wait the last fraction of a millisecond before each check.\n"
+                                              "Steadier rate at the cost of some CPU.")
+        self.precise_timing_toggle.toggled.connect(self.push_live_settings)
+        rate_layout.addWidget(self.precise_timing_toggle)
+        
+        self.separate_process_toggle = QCheckBox("Own Process")
+        self.separate_process_toggle.setToolTip("Capture and analyse in a separate process so the GUI and\n"
+                                                "hotkeys cannot add jitter. Applies on the next start.")
+        rate_layout.addWidget(self.separate_process_toggle)
+        main_layout.addLayout(rate_layout)
+        
+        # Idle throttling: drop to a low rate while nothing in the region deviates
+        idle_layout = QHBoxLayout()
+        self.idle_throttle_toggle = QCheckBox("Idle Throttle")
+        self.idle_throttle_toggle.setChecked(False)
+        self.idle_throttle_toggle.setToolTip("Check less often while nothing changes and return to the\n"
+                                             "full detection rate as soon as any pixel deviates.\n"
+                                             "Saves CPU, but a change that arrives while idle is seen up to\n"
+                                             "one idle interval late (200 ms at 5 Hz)")
+        self.idle_throttle_toggle.toggled.connect(self.push_live_settings)
+        idle_layout.addWidget(self.idle_throttle_toggle)
+        idle_layout.addStretch()
+        idle_layout.addWidget(QLabel("After"))
+        self.quiet_period_input = QDoubleSpinBox()
+        self.quiet_period_input.setRange(0.1, 600.0)
+        self.quiet_period_input.setSingleStep(0.5)
+        self.quiet_period_input.setValue(2.0)
+        self.quiet_period_input.setSuffix(" s")
+        self.quiet_period_input.setToolTip("How long the region must stay quiet before throttling")
+        self.quiet_period_input.valueChanged.connect(self.push_live_settings)
+        idle_layout.addWidget(self.quiet_period_input)
+        idle_layout.addWidget(QLabel("check at"))
+        self.idle_rate_input = QSpinBox()
+        self.idle_rate_input.setMinimum(1)
+        self.idle_rate_input.setMaximum(100)
+        self.idle_rate_input.setValue(5)
+        self.idle_rate_input.setSuffix(" Hz")
+        self.idle_rate_input.setToolTip("Detection rate while idle")
+        self.idle_rate_input.valueChanged.connect(self.push_live_settings)
+        idle_layout.addWidget(self.idle_rate_input)
+        main_layout.addLayout(idle_layout)
+        
+        # Debounce: consecutive frames needed before switching on or off
+        debounce_layout = QHBoxLayout()
+        debounce_layout.addWidget(QLabel("Confirm Frames:"))
+        debounce_layout.addStretch()
+        debounce_layout.addWidget(QLabel("On"))
+        self.on_frames_input = QSpinBox()
+        self.on_frames_input.setMinimum(1)
+        self.on_frames_input.setMaximum(30)
+        self.on_frames_input.setValue(1)
+        self.on_frames_input.setToolTip("Consecutive changed frames required before clicking starts")
+        self.on_frames_input.valueChanged.connect(self.push_live_settings)
+        debounce_layout.addWidget(self.on_frames_input)
+        debounce_layout.addWidget(QLabel("Off"))
+        self.off_frames_input = QSpinBox()
+        self.off_frames_input.setMinimum(1)
+        self.off_frames_input.setMaximum(30)
+        self.off_frames_input.setValue(1)
+        self.off_frames_input.setToolTip("Consecutive unchanged frames required before clicking stops")
+        self.off_frames_input.valueChanged.connect(self.push_live_settings)
+        debounce_layout.addWidget(self.off_frames_input)
+        main_layout.addLayout(debounce_layout)
+        
+        # Tolerance Slider
+        tolerance_layout = QVBoxLayout()
+        tolerance_layout.setSpacing(5)
+        tolerance_label = QLabel("Tolerance:")
+        self.tolerance_value_label = QLabel("20")
+        tolerance_header = QHBoxLayout()
+        tolerance_header.addWidget(tolerance_label)
+        tolerance_header.addStretch()
+        self.match_mode_combo = QComboBox()
+        self.match_mode_combo.addItems(["RGB Distance", "Per-Channel", "Hue/Saturation", "Lab \u0394E"])
+        self.match_mode_combo.setToolTip("How a pixel's difference from the base color is measured:\n"
+                                         "RGB Distance - straight-line distance in RGB\n"
+                                         "Per-Channel - any of R, G or B differs by more than the tolerance\n"
+                                         "Hue/Saturation - hue (degrees) or saturation (%) differs; ignores brightness\n"
+                                         "Lab \u0394E - perceptual color difference")
+        self.match_mode_combo.currentIndexChanged.connect(self.push_live_settings)
+        tolerance_header.addWidget(self.match_mode_combo)
+        tolerance_header.addWidget(self.tolerance_value_label)
+        tolerance_layout.addLayout(tolerance_header)
+        
+        self.tolerance_slider = QSlider(Qt.Horizontal)
+        self.tolerance_slider.setMinimum(1)
+        self.tolerance_slider.setMaximum(100)
+        self.tolerance_slider.setValue(20)
+        self.tolerance_slider.setToolTip("How different a color must be to trigger detection.\nLower is more sensitive.")
+        self.tolerance_slider.valueChanged.connect(self.on_tolerance_changed)
+        self.tolerance_slider.valueChanged.connect(self.push_live_settings)
+        tolerance_layout.addWidget(self.tolerance_slider)
+        main_layout.addLayout(tolerance_layout)
+        
+        # Detection Box Controls
+        box_layout = QVBoxLayout()
+        box_layout.setSpacing(5)
+        box_label = QLabel("Detection Box:")
+        box_layout.addWidget(box_label)
+        
+        # First row of buttons
+        box_buttons_row1 = QHBoxLayout()
+        self.toggle_box_button = QPushButton("Hide Box")
+        self.toggle_box_button.clicked.connect(self.toggle_detection_box)
+        box_buttons_row1.addWidget(self.toggle_box_button)
+        
+        self.lock_box_button = QPushButton("Lock Box")
+        self.lock_box_button.setCheckable(True)
+        self.lock_box_button.clicked.connect(self.toggle_lock_box)
+        box_buttons_row1.addWidget(self.lock_box_button)
+        box_layout.addLayout(box_buttons_row1)
+        
+        # Second row of buttons
+        box_buttons_row2 = QHBoxLayout()
+        self.reset_box_button = QPushButton("Reset Position")
+        self.reset_box_button.clicked.connect(self.reset_detection_box)
+        box_buttons_row2.addWidget(self.reset_box_button)
+        
+        self.manage_positions_button = QPushButton("Save/Load Position")
+        self.manage_positions_button.clicked.connect(self.open_position_manager)
+        box_buttons_row2.addWidget(self.manage_positions_button)
+        box_layout.addLayout(box_buttons_row2)
+        
+        # Third row: extra regions sharing the same screen grab
+        box_buttons_row3 = QHBoxLayout()
+        self.add_region_button = QPushButton("Add Region")
+        self.add_region_button.setToolTip("Add another detection box using the current color, tolerance and action")
+        self.add_region_button.clicked.connect(self.add_region)
+        box_buttons_row3.addWidget(self.add_region_button)
+        
+        self.clear_regions_button = QPushButton("Clear Regions")
+        self.clear_regions_button.clicked.connect(self.clear_regions)
+        box_buttons_row3.addWidget(self.clear_regions_button)
+        
+        self.capture_template_button = QPushButton("Capture Template")
+        self.capture_template_button.setToolTip("Save what is inside the box now as the template to search for.\n"
+                                                "Enlarge the box afterwards to search a wider area.")
+        self.capture_template_button.clicked.connect(self.capture_template)
+        box_buttons_row3.addWidget(self.capture_template_button)
+        box_layout.addLayout(box_buttons_row3)
+        
+        # Region size and trigger threshold
+        box_settings_row = QHBoxLayout()
+        box_settings_row.addWidget(QLabel("Size:"))
+        self.region_size_input = QSpinBox()
+        self.region_size_input.setMinimum(DetectionBox.MIN_REGION_SIZE)
+        self.region_size_input.setMaximum(DetectionBox.MAX_REGION_SIZE)
+        self.region_size_input.setValue(16)
+        self.region_size_input.setSuffix(" px")
+        self.region_size_input.setToolTip("Width and height of the detection area in pixels")
+        self.region_size_input.valueChanged.connect(self.on_region_size_changed)
+        box_settings_row.addWidget(self.region_size_input)
+        
+        box_settings_row.addStretch()
+        
+        box_settings_row.addWidget(QLabel("Threshold:"))
+        self.threshold_input = QDoubleSpinBox()
+        self.threshold_input.setDecimals(1)
+        self.threshold_input.setMinimum(0.0)
+        self.threshold_input.setMaximum(100.0)
+        self.threshold_input.setSingleStep(0.5)
+        self.threshold_input.setValue(2.0)
+        self.threshold_input.setSuffix(" %")
+        self.threshold_input.setToolTip("Percentage of the area that must change to trigger detection")
+        self.threshold_input.valueChanged.connect(self.push_live_settings)
+        box_settings_row.addWidget(self.threshold_input)
+        
+        box_settings_row.addStretch()
+        
+        box_settings_row.addWidget(QLabel("Scan:"))
+        self.scan_order_combo = QComboBox()
+        self.scan_order_combo.addItems(["Center-out", "Interleaved", "Row by row", "Coarse-to-fine"])
+        self.scan_order_combo.setToolTip("Order pixels are checked in; scanning stops as soon as the result is known.\n"
+                                         "Coarse-to-fine summarizes large boxes from a fixed number of samples\n"
+                                         "and counts full-resolution pixels only in tiles where those deviate")
+        self.scan_order_combo.currentIndexChanged.connect(self.push_live_settings)
+        box_settings_row.addWidget(self.scan_order_combo)
+        box_layout.addLayout(box_settings_row)
+        
+        main_layout.addLayout(box_layout)
+        
+        # Color Selection Mode
+        color_mode_label = QLabel("Color Mode:")
+        main_layout.addWidget(color_mode_label)
+        
+        self.color_mode_combo = QComboBox()
+        self.color_mode_combo.addItems(["Enter Hex Value", "Pick from Screen"])
+        self.color_mode_combo.currentIndexChanged.connect(self.on_color_mode_changed)
+        main_layout.addWidget(self.color_mode_combo)
+        
+        # Color Input Stack
+        self.color_input_stack = QStackedWidget()
+        
+        # Hex input widget
+        self.hex_input = QLineEdit("#000000")
+        self.hex_input.textChanged.connect(self.on_hex_input_changed)
+        self.color_input_stack.addWidget(self.hex_input)
+        
+        # Pick color button widget
+        self.pick_color_button = QPushButton("Click to Pick Color from Screen")
+        self.pick_color_button.clicked.connect(self.start_color_picker)
+        self.color_input_stack.addWidget(self.pick_color_button)
+        
+        main_layout.addWidget(self.color_input_stack)
+        
+        # Base Color Display
+        self.base_color_display = QLabel("Base Color: (Not Set)")
+        self.base_color_display.setStyleSheet("padding: 8px; border-radius: 4px;")
+        self.base_color_display.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.base_color_display)
+        
+        # Color set: extra shades matched alongside the base color
+        color_set_layout = QHBoxLayout()
+        self.add_color_button = QPushButton("Add to Color Set")
+        self.add_color_button.setToolTip("Also treat the current base color as unchanged,\n"
+                                         "then pick or enter the next shade")
+        self.add_color_button.clicked.connect(self.add_to_color_set)
+        color_set_layout.addWidget(self.add_color_button)
+        self.clear_colors_button = QPushButton("Clear Set")
+        self.clear_colors_button.clicked.connect(self.clear_color_set)
+        color_set_layout.addWidget(self.clear_colors_button)
+        self.color_set_label = QLabel("No extra colors")
+        color_set_layout.addWidget(self.color_set_label)
+        main_layout.addLayout(color_set_layout)
+        
+        # What counts as a change, and the action performed while the region is triggered
+        action_layout = QHBoxLayout()
+        action_layout.addWidget(QLabel("Detect:"))
+        self.detector_combo = QComboBox()
+        self.detector_combo.addItems(["Color", "Motion", "Motion (Background)", "Template"])
+        self.detector_combo.setToolTip("Color - pixels differ from the base color\n"
+                                       "Motion - pixels changed since the previous frame\n"
+                                       "Motion (Background) - pixels differ from a slowly updated average;\n"
+                                       "no base color needed for either motion mode\n"
+                                       "Template - the captured template appears in the box\n"
+                                       "(match score of at least 1 - tolerance/100)")
+        self.detector_combo.currentIndexChanged.connect(self.on_detector_changed)
+        action_layout.addWidget(self.detector_combo)
+        action_layout.addStretch()
+        action_layout.addWidget(QLabel("Action:"))
+        self.action_combo = QComboBox()
+        self.action_combo.addItems(["Click", "Press Key"])
+        self.action_combo.currentIndexChanged.connect(self.on_action_changed)
+        action_layout.addWidget(self.action_combo)
+        self.action_key_input = QLineEdit("e")
+        self.action_key_input.setMaxLength(12)
+        self.action_key_input.setToolTip("Key to press repeatedly while the region is triggered")
+        self.action_key_input.setEnabled(False)
+        action_layout.addWidget(self.action_key_input)
+        main_layout.addLayout(action_layout)
+        
+        # Auto Reload Section
+        reload_layout = QVBoxLayout()
+        reload_layout.setSpacing(5)
+        
+        # Reload toggle and delay input
+        reload_controls = QHBoxLayout()
+        self.auto_reload_toggle = QCheckBox("Auto Reload (Press R)")
+        self.auto_reload_toggle.toggled.connect(self.toggle_auto_reload)
+        reload_controls.addWidget(self.auto_reload_toggle)
+        
+        reload_controls.addStretch()
+        
+        reload_delay_label = QLabel("Delay (s):")
+        reload_controls.addWidget(reload_delay_label)
+        
+        self.reload_delay_input = QSpinBox()
+        self.reload_delay_input.setMinimum(1)
+        self.reload_delay_input.setMaximum(60)
+        self.reload_delay_input.setValue(1)
+        self.reload_delay_input.setSuffix(" s")
+        self.reload_delay_input.setToolTip("Delay between reload presses in seconds")
+        self.reload_delay_input.valueChanged.connect(self.on_reload_delay_changed)
+        reload_controls.addWidget(self.reload_delay_input)
+        
+        reload_layout.addLayout(reload_controls)
+        main_layout.addLayout(reload_layout)
+        
+        # Ring of recent frames that can be dumped for offline replay
+        recording_layout = QHBoxLayout()
+        recording_layout.addWidget(QLabel("Keep Frames:"))
+        self.ring_frames_input = QSpinBox()
+        self.ring_frames_input.setMinimum(0)
+        self.ring_frames_input.setMaximum(1000)
+        self.ring_frames_input.setValue(0)
+        self.ring_frames_input.setToolTip("How many recent frames to keep for dumping (0 = off).\n"
+                                          "Replay a dump with: python recording.py FILE")
+        recording_layout.addWidget(self.ring_frames_input)
+        self.dump_on_trigger_toggle = QCheckBox("Dump on Trigger")
+        self.dump_on_trigger_toggle.setToolTip("Save the kept frames to the recordings folder each time detection triggers")
+        recording_layout.addWidget(self.dump_on_trigger_toggle)
+        recording_layout.addStretch()
+        self.dump_frames_button = QPushButton("Dump Now")
+        self.dump_frames_button.setToolTip("Save the kept frames to the recordings folder")
+        self.dump_frames_button.clicked.connect(self.dump_frames)
+        recording_layout.addWidget(self.dump_frames_button)
+        main_layout.addLayout(recording_layout)
+        
+        # Screen capture backend
+        capture_layout = QHBoxLayout()
+        capture_layout.addWidget(QLabel("Capture:"))
+        self.capture_combo = QComboBox()
+        self.capture_combo.addItems(["Auto"] + list(CAPTURE_BACKENDS))
+        self.capture_combo.setToolTip("How the screen is read. Auto times every backend on the\n"
+                                      "detection box and uses the fastest.")
+        self.capture_combo.currentIndexChanged.connect(self.on_capture_backend_changed)
+        capture_layout.addWidget(self.capture_combo)
+        self.capture_result_label = QLabel("")
+        self.capture_result_label.setStyleSheet("color: #9e9e9e;")
+        capture_layout.addWidget(self.capture_result_label)
+        capture_layout.addStretch()
+        self.benchmark_capture_button = QPushButton("Benchmark")
+        self.benchmark_capture_button.setToolTip("Time every capture backend on the detection box now")
+        self.benchmark_capture_button.clicked.connect(self.benchmark_capture)
+        capture_layout.addWidget(self.benchmark_capture_button)
+        main_layout.addLayout(capture_layout)
+        
+        # Status Label
+        self.status_label = QLabel("Status: Ready")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        status_font = QFont("Segoe UI", 10, QFont.Bold)
+        self.status_label.setFont(status_font)
+        main_layout.addWidget(self.status_label)
+        
+        # Achieved detection rate
+        self.rate_stats_label = QLabel("")
+        self.rate_stats_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.rate_stats_label)
+        
+        # Detection-to-click latency percentiles
+        latency_layout = QHBoxLayout()
+        self.latency_label = QLabel("Latency: no samples")
+        self.latency_label.setToolTip("Capture start to first click: p50 / p95 / p99")
+        latency_layout.addWidget(self.latency_label)
+        latency_layout.addStretch()
+        self.export_latency_button = QPushButton("Export")
+        self.export_latency_button.setToolTip("Save per-stage latency percentiles to a CSV file")
+        self.export_latency_button.clicked.connect(self.export_latency)
+        latency_layout.addWidget(self.export_latency_button)
+        main_layout.addLayout(latency_layout)
+        
+        main_layout.addStretch()
+        
+        container = QWidget()
+        container.setLayout(main_layout)
+        scroll_area = QScrollArea()
+        scroll_area.setFrameShape(QScrollArea.NoFrame)
+        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(container)
+        self.setCentralWidget(scroll_area)
+    
+    def setup_hotkey(self):
+        """Register the F6 hotkey for toggling detection."""
+        import keyboard
+        try:
+            keyboard.add_hotkey('f6', self.toggle_detection_hotkey)
+            print("F6 hotkey registered successfully.")
+        except Exception as e:
+            print(f"Failed to register F6 hotkey: {e}")
+            print("Please try running the script with administrator privileges.")
+            self.status_label.setText("Status: Hotkey failed to register!")
+    
+    @Slot()
+    def toggle_detection_hotkey(self):
+        """Toggles the detection state, called by the global hotkey."""
+        if self.enable_toggle.isEnabled():
+            self.enable_toggle.toggle()
+    
+    @Slot(int)
+    def on_tolerance_changed(self, value):
+        """Update the tolerance value label."""
+        self.tolerance_value_label.setText(str(value))
+    
+    @Slot(int)
+    def on_click_delay_changed(self, value):
+        """Update the click interval when delay changes, including while running."""
+        for executor in [self.click_executor] + self.region_executors:
+            executor.set_interval(value)
+    
+    @Slot(int)
+    def on_region_size_changed(self, value):
+        """Resize the detection box to the new region size."""
+        self.detection_box.set_region_size(value)
+    
+    @Slot(int)
+    def on_detector_changed(self, index):
+        """Switch detector type, requiring a captured template for template matching."""
+        if index == 3 and self.template is None:
+            QMessageBox.information(self, "No Template", "Use \"Capture Template\" first to save a template.")
+            self.detector_combo.setCurrentIndex(0)
+            return
+        self.push_live_settings()
+    
+    @Slot()
+    def capture_template(self):
+        """Save the current contents of the detection box as the template."""
+        rect = self.physical_rect(self.detection_box)
+        # Hide the box while grabbing so its border is not part of the template
+        visible = self.detection_box.isVisible()
+        self.detection_box.hide()
+        QApplication.processEvents()
+        frame = self.capture_service.grab(rect)
+        self.template = frame.copy()
+        if visible:
+            self.detection_box.show()
+        self.status_label.setText(f"Status: Template captured ({rect[2]}x{rect[3]})")
+        self.push_live_settings()
+    
+    @Slot(int)
+    def on_action_changed(self, index):
+        """Only enable the key input for key-press actions."""
+        self.action_key_input.setEnabled(index == 1 and not self.is_running)
+    
+    def all_boxes(self) -> List[DetectionBox]:
+        """The main detection box followed by any additional region boxes."""
+        return [self.detection_box] + [box for box, _ in self.extra_regions]
+    
+    def region_settings(self) -> dict:
+        """Snapshot the current controls as RegionConfig keyword arguments (without the rect)."""
+        from detection import MATCH_MODES, SCAN_ORDERS
+        key = self.action_key_input.text().strip()
+        action = key if self.action_combo.currentIndex() == 1 and key else "click"
+        detector_index = self.detector_combo.currentIndex()
+        return {
+            "detector": ("color", "motion", "motion", "template")[detector_index],
+            "background_alpha": self.BACKGROUND_ALPHA if detector_index == 2 else 0.0,
+            "template": self.template if detector_index == 3 else None,
+            "min_score": 1 - self.tolerance_slider.value() / 100,
+            "base_color": self.base_color,
+            "tolerance": self.tolerance_slider.value(),
+            "threshold_percent": self.threshold_input.value(),
+            "scan_order": SCAN_ORDERS[self.scan_order_combo.currentIndex()],
+            "on_frames": self.on_frames_input.value(),
+            "off_frames": self.off_frames_input.value(),
+            "action": action,
+            "match_mode": MATCH_MODES[self.match_mode_combo.currentIndex()],
+            "extra_colors": tuple(self.extra_colors),
+        }
+    
+    def current_regions(self) -> List["RegionConfig"]:
+        """Build the region list; the main box uses the current controls, extra boxes their saved settings."""
+        from engine import RegionConfig
+        regions = []
+        for box, settings in [(self.detection_box, self.region_settings())] + self.extra_regions:
+            regions.append(RegionConfig(rect=self.physical_rect(box), **settings))
+        return regions
+    
+    def physical_rect(self, box: DetectionBox) -> Tuple[int, int, int, int]:
+        """Returns a box's detection area in physical screen pixels, as capture addresses it."""
+        rect = box.get_detection_rect()
+        return self.screen_topology.to_physical((rect.left(), rect.top(), rect.width(), rect.height()))
+    
+    def update_screen_topology(self):
+        """Pair Qt's screens with the capture backend's monitors, once those are known."""
+        screens = []
+        for screen in QApplication.instance().screens():
+            geometry = screen.geometry()
+            screens.append(((geometry.x(), geometry.y(), geometry.width(), geometry.height()),
+                            screen.devicePixelRatio()))
+        self.screen_topology = ScreenTopology(match_monitors(screens, self.physical_monitors))
+    
+    def watch_screen(self, screen: QScreen):
+        screen.geometryChanged.connect(self.on_screens_changed)
+        screen.logicalDotsPerInchChanged.connect(self.on_screens_changed)
+    
+    @Slot(QScreen)
+    def on_screen_added(self, screen: QScreen):
+        self.watch_screen(screen)
+        self.on_screens_changed()
+    
+    def on_screens_changed(self, *args):
+        """Rebuild the coordinate mapping after a monitor is added, removed, moved or rescaled."""
+        self.update_screen_topology()
+        self.push_live_settings()
+    
+    @Slot()
+    def push_live_settings(self):
+        """Send the current settings to the running worker without restarting it."""
+        if self.worker and self.is_running and not self.applying_profile:
+            self.worker.update_settings(
+                self.current_regions(), self.rate_input.value(), self.precise_timing_toggle.isChecked(),
+                idle=self.idle_settings()
+            )
+    
+    def idle_settings(self) -> Tuple[bool, float, float]:
+        """Returns (enabled, idle rate in Hz, quiet period in seconds) from the idle controls."""
+        return (self.idle_throttle_toggle.isChecked(), self.idle_rate_input.value(),
+                self.quiet_period_input.value())
+    
+    @Slot()
+    def add_region(self):
+        """Add a detection box that keeps the current settings."""
+        box = DetectionBox(self.region_size_input.value(), QColor(0, 200, 255))
+        offset = 30 * (len(self.extra_regions) + 1)
+        box.set_position(self.detection_box.get_position() + QPoint(offset, offset))
+        box.set_locked(self.detection_box.is_locked())
+        box.geometry_changed.connect(self.push_live_settings)
+        if self.detection_box.isVisible():
+            box.show()
+        self.extra_regions.append((box, self.region_settings()))
+        self.status_label.setText(f"Status: {len(self.extra_regions) + 1} regions")
+    
+    @Slot()
+    def clear_regions(self):
+        """Remove all additional detection boxes."""
+        for box, _ in self.extra_regions:
+            box.close()
+            box.deleteLater()
+        self.extra_regions = []
+        self.status_label.setText("Status: Ready")
+    
+    @Slot()
+    def toggle_detection_box(self):
+        """Toggle the visibility of the detection boxes."""
+        if self.detection_box.isVisible():
+            for box in self.all_boxes():
+                box.hide()
+            self.toggle_box_button.setText("Show Box")
+        else:
+            for box in self.all_boxes():
+                box.show()
+            self.toggle_box_button.setText("Hide Box")
+    
+    @Slot()
+    def reset_detection_box(self):
+        """Reset the detection box to the center of the screen."""
+        self.detection_box.reset_to_center()
+    
+    @Slot(bool)
+    def toggle_lock_box(self, checked: bool):
+        """Toggle the lock state of the detection boxes."""
+        for box in self.all_boxes():
+            box.set_locked(checked)
+        if checked:
+            self.lock_box_button.setText("Unlock Box")
+        else:
+            self.lock_box_button.setText("Lock Box")
+    
+    @Slot()
+    def open_position_manager(self):
+        """Open the position manager dialog."""
+        current_pos = self.detection_box.get_position()
+        dialog = PositionManagerDialog(self, current_pos, self.ensure_profile_store())
+        
+        if dialog.exec() == QDialog.Accepted:
+            selected_pos = dialog.get_selected_position()
+            if selected_pos:
+                self.detection_box.set_position(selected_pos)
+    
+    @Slot(bool)
+    def toggle_auto_reload(self, checked: bool):
+        """Toggle the auto reload feature."""
+        if checked:
+            self.reload_timer.start()
+        else:
+            self.reload_timer.stop()
+    
+    @Slot(int)
+    def on_reload_delay_changed(self, value):
+        """Update the reload timer interval when delay changes."""
+        if self.reload_timer:
+            self.reload_timer.setInterval(value * 1000)  # Convert seconds to milliseconds
+    
+    @Slot()
+    def perform_reload(self):
+        """Press the R key for reload."""
+        self.action_backend.press('r')
+    
+    @Slot(int)
+    def on_color_mode_changed(self, index):
+        """Handle color mode selection change."""
+        self.color_input_stack.setCurrentIndex(index)
+    
+    @Slot(str)
+    def on_hex_input_changed(self, text: str):
+        """Validates hex code and updates the base color."""
+        text = text.strip()
+        if not text.startswith("#") or len(text) != 7:
+            return
+        
+        try:
+            hex_val = text[1:]
+            r = int(hex_val[0:2], 16)
+            g = int(hex_val[2:4], 16)
+            b = int(hex_val[4:6], 16)
+            self.update_base_color((r, g, b))
+        except (ValueError, IndexError):
+            # Invalid hex code, do nothing
+            pass
+    
+    @Slot()
+    def start_color_picker(self):
+        """Start the color picker overlay."""
+        # Clean up any existing overlay first
+        if self.color_picker_overlay:
+            try:
+                self.color_picker_overlay.close()
+                self.color_picker_overlay.deleteLater()
+            except:
+                pass
+            self.color_picker_overlay = None
+        
+        self.status_label.setText("Status: Click anywhere to pick color...")
+        self.color_picker_overlay = ColorPickerOverlay(self.capture_service, self.screen_topology)
+        self.color_picker_overlay.color_picked.connect(self.on_color_picked)
+        self.color_picker_overlay.cancelled.connect(self.on_color_picker_cancelled)
+    
+    @Slot()
+    def on_color_picker_cancelled(self):
+        """Handle color picker cancellation."""
+        if self.color_picker_overlay:
+            try:
+                self.color_picker_overlay.close()
+                self.color_picker_overlay.deleteLater()
+            except:
+                pass
+            self.color_picker_overlay = None
+        self.status_label.setText("Status: Color picking cancelled")
+    
+    @Slot(tuple)
+    def on_color_picked(self, color: Tuple[int, int, int]):
+        """Handle the color picked from screen."""
+        self.update_base_color(color)
+        # Update hex input to reflect the picked color
+        hex_color = f"#{color[0]:02x}{color[1]:02x}{color[2]:02x}"
+        self.hex_input.setText(hex_color)
+        
+        # Clean up the overlay
+        if self.color_picker_overlay:
+            try:
+                self.color_picker_overlay.close()
+                self.color_picker_overlay.deleteLater()
+            except:
+                pass
+            self.color_picker_overlay = None
+    
+    @Slot()
+    def add_to_color_set(self):
+        """Keep the current base color as an extra allowed shade."""
+        if self.base_color not in self.extra_colors:
+            self.extra_colors.append(self.base_color)
+        self.update_color_set_label()
+        self.push_live_settings()
+    
+    @Slot()
+    def clear_color_set(self):
+        """Match against the base color only."""
+        self.extra_colors = []
+        self.update_color_set_label()
+        self.push_live_settings()
+    
+    def update_color_set_label(self):
+        """Show how many extra shades are in the color set."""
+        count = len(self.extra_colors)
+        self.color_set_label.setText(f"+{count} color{'s' if count != 1 else ''}" if count else "No extra colors")
+    
+    def update_base_color(self, color: Tuple[int, int, int]):
+        """Updates the base color and UI display."""
+        self.base_color = color
+        self.base_color_display.setText(f"Base Color: RGB{color}")
+        
+        # Calculate contrast for text color
+        luminance = color[0] * 0.299 + color[1] * 0.587 + color[2] * 0.114
+        text_color = 'white' if luminance < 140 else 'black'
+        
+        self.base_color_display.setStyleSheet(
+            f"background-color: rgb{color}; "
+            f"color: {text_color}; "
+            f"padding: 8px; "
+            f"border-radius: 4px; "
+            f"border: 1px solid #3f3f46;"
+        )
+        self.push_live_settings()
+        
+        if not self.is_running:
+            self.enable_toggle.setEnabled(True)
+            self.status_label.setText("Status: Ready")
+    
+    @Slot(bool)
+    def handle_toggle(self, checked: bool):
+        """Handle the enable/disable toggle."""
+        if checked:
+            self.start_worker()
+        else:
+            self.stop_worker()
+    
+    def start_worker(self):
+        """Start the detection worker thread."""
+        self.is_running = True
+        self.status_label.setText("Status: Running")
+        # Everything else is applied live; the set of regions and their actions is fixed per run
+        self.add_region_button.setEnabled(False)
+        self.clear_regions_button.setEnabled(False)
+        self.action_combo.setEnabled(False)
+        self.action_key_input.setEnabled(False)
+        self.separate_process_toggle.setEnabled(False)
+        self.ring_frames_input.setEnabled(False)
+        self.dump_on_trigger_toggle.setEnabled(False)
+        
+        regions = self.current_regions()
+        executors = self.make_executors(regions)
+        
+        self.worker = DetectionWorker(
+            regions=regions,
+            executors=executors,
+            rate_hz=self.rate_input.value(),
+            precise_timing=self.precise_timing_toggle.isChecked(),
+            recorder=self.latency_recorder,
+            capture=self.capture_service,
+            idle=self.idle_settings(),
+            separate_process=self.separate_process_toggle.isChecked(),
+            recording=(self.ring_frames_input.value(), self.dump_on_trigger_toggle.isChecked()),
+            monitors=self.screen_topology.physical_monitors()
+        )
+        self.worker.signals.detection_changed.connect(self.on_detection_changed)
+        self.worker.signals.stats_updated.connect(self.on_stats_updated)
+        self.worker.signals.frames_dumped.connect(self.on_frames_dumped)
+        self.detection_pool.start(self.worker)
+    
+    def make_executors(self, regions: List["RegionConfig"]) -> List[ClickExecutor]:
+        """Start an action executor per region; the shared click executor serves the main box."""
+        from engine import action_callable
+        executors = []
+        for index, region in enumerate(regions):
+            if index == 0 and region.action == "click":
+                executors.append(self.click_executor)
+                continue
+            executor = ClickExecutor(
+                action_callable(self.action_backend, region.action),
+                interval_ms=self.click_delay_input.value(), recorder=self.latency_recorder
+            )
+            executor.start()
+            self.region_executors.append(executor)
+            executors.append(executor)
+        return executors
+    
+    def stop_worker(self):
+        """Stop the detection worker thread."""
+        self.is_running = False
+        if self.worker:
+            self.worker.stop()
+        self.click_executor.deactivate()
+        for executor in self.region_executors:
+            executor.shutdown()
+        self.region_executors = []
+        self.status_label.setText("Status: Stopped")
+        self.rate_stats_label.setText("")
+        self.add_region_button.setEnabled(True)
+        self.clear_regions_button.setEnabled(True)
+        self.action_combo.setEnabled(True)
+        self.action_key_input.setEnabled(self.action_combo.currentIndex() == 1)
+        self.separate_process_toggle.setEnabled(True)
+        self.ring_frames_input.setEnabled(True)
+        self.dump_on_trigger_toggle.setEnabled(True)
+    
+    @Slot(bool, object)
+    def on_detection_changed(self, is_changed: bool, detected_ns=None):
+        """Reflect detection state changes in the status; clicking is driven by the worker."""
+        if detected_ns is not None:
+            self.latency_recorder.record("signal", time.perf_counter_ns() - detected_ns)
+        if not self.is_running:
+            return
+        if is_changed:
+            self.status_label.setText("Status: SPAMMING")
+        else:
+            self.status_label.setText("Status: Running")
+    
+    @Slot(dict)
+    def on_stats_updated(self, stats: dict):
+        """Show the achieved detection rate, jitter and time spent idle."""
+        if self.is_running:
+            text = f"{stats['mode'].title()} {stats['rate_hz']:.1f} Hz, jitter {stats['jitter_us'] / 1000:.2f} ms"
+            if stats["idle_s"]:
+                text += f", idle {stats['idle_s']:.0f}s saved {stats['cpu_saved_s']:.1f}s CPU"
+            match = stats.get("matches", [None])[0]
+            if match is not None:
+                text += f", match ({match[0]}, {match[1]}) {match[2]:.2f}"
+            self.rate_stats_label.setText(text)
+            self.update_latency_label()
+    
+    def update_latency_label(self):
+        """Show the capture-to-click latency percentiles."""
+        total = self.latency_recorder.summary()["total"]
+        if not total["count"]:
+            self.latency_label.setText("Latency: no samples")
+            return
+        self.latency_label.setText(
+            f"Latency: {total['p50'] / 1000:.1f} / {total['p95'] / 1000:.1f} / "
+            f"{total['p99'] / 1000:.1f} ms (n={total['count']})"
+        )
+    
+    @Slot()
+    def export_latency(self):
+        """Save the latency histogram summary to a CSV file."""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Latency", "latency.csv", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            self.latency_recorder.export(path)
+            self.status_label.setText("Status: Latency exported")
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not write {path}:\n{e}")
+    
+    @Slot()
+    def dump_frames(self):
+        """Ask the running worker to save its recent frames."""
+        if self.worker and self.is_running:
+            self.worker.request_dump()
+        else:
+            self.status_label.setText("Status: Start detection to keep frames")
+    
+    @Slot(str)
+    def on_frames_dumped(self, path: str):
+        """Report where a frame dump was written."""
+        self.status_label.setText(f"Status: Frames saved to {path}")
+    
+    @Slot()
+    def benchmark_capture(self):
+        """Time the capture backends on the detection box off the GUI thread; on Auto, switch to the fastest."""
+        if not self.startup_done:
+            self.startup.begin("capture benchmark")
+        rect = self.physical_rect(self.detection_box)
+        auto = self.capture_combo.currentIndex() == 0
+        self.benchmark_capture_button.setEnabled(False)
+        self.capture_result_label.setText("timing...")
+        
+        def run():
+            from capture import BACKENDS, benchmark_backends, fastest_backend
+            timings = benchmark_backends(rect)
+            fastest = fastest_backend(timings)
+            if auto and fastest is not None:
+                self.capture_service.set_backend(BACKENDS[fastest])
+            # Opens the chosen backend on the detection thread ahead of the first frame; while
+            # detection runs this waits its turn, and the worker switches on its next grab anyway
+            self.detection_pool.start(partial(self.capture_service.warm, rect))
+            self.capture_benchmarked.emit(timings)
+        self.threadpool.start(run)
+    
+    @Slot(object)
+    def on_capture_benchmarked(self, timings):
+        """Report the timings and, if Auto is still selected, make sure the fastest backend is in use."""
+        from capture import BACKENDS, fastest_backend, format_timings
+        self.startup.end("capture benchmark")
+        self.check_startup_finished()
+        self.benchmark_capture_button.setEnabled(True)
+        report = format_timings(timings)
+        self.capture_result_label.setToolTip(report)
+        print(report)
+        fastest = fastest_backend(timings)
+        if fastest is None:
+            self.capture_result_label.setText("no backend works")
+            return
+        if self.capture_combo.currentIndex() == 0:
+            self.capture_service.set_backend(BACKENDS[fastest])
+        name = self.capture_combo.currentText() if self.capture_combo.currentIndex() else fastest
+        timing = next((t for t in timings if t.name == name), None)
+        if timing is not None and timing.median_us is not None:
+            self.capture_result_label.setText(f"{name}, {timing.median_us / 1000:.2f} ms per grab")
+        else:
+            self.capture_result_label.setText(f"{name} (failed, see tooltip)")
+        self.status_label.setText(f"Status: Capturing with {name} (fastest: {fastest})")
+    
+    @Slot(int)
+    def on_capture_backend_changed(self, index: int):
+        """Use the chosen backend, or benchmark again for Auto; a running detector switches on its next frame."""
+        if index == 0:
+            self.benchmark_capture()
+            return
+        from capture import BACKENDS
+        name = self.capture_combo.currentText()
+        self.capture_service.set_backend(BACKENDS[name])
+        self.capture_result_label.setText(name)
+    
+    def ensure_profile_store(self) -> "ProfileStore":
+        """The profile store, made empty here if it is needed before the startup load delivers it."""
+        if self.profile_store is None:
+            from profiles import ProfileStore
+            self.profile_store = ProfileStore()
+        return self.profile_store
+    
+    def refresh_profile_combo(self):
+        """List the saved profiles, keeping the current one selected."""
+        self.profile_combo.clear()
+        store = self.profile_store
+        if store is not None:
+            self.profile_combo.addItems(store.names())
+        if store is not None and self.current_profile in store.profiles:
+            self.profile_combo.setCurrentText(self.current_profile)
+        else:
+            self.profile_combo.setCurrentIndex(-1)
+        self.delete_profile_button.setEnabled(self.profile_combo.count() > 0)
+    
+    def setup_profile_hotkeys(self):
+        """Register the next-profile hotkey and each profile's own hotkey."""
+        if not self.hotkeys_ready:
+            return
+        import keyboard
+        for handle in self.profile_hotkeys:
+            try:
+                keyboard.remove_hotkey(handle)
+            except (KeyError, ValueError):
+                pass
+        self.profile_hotkeys = []
+        bindings = [(self.NEXT_PROFILE_HOTKEY, "")]
+        if self.profile_store is not None:
+            bindings += [(p.hotkey, name) for name, p in self.profile_store.profiles.items() if p.hotkey]
+        for hotkey, name in bindings:
+            try:
+                # The hook runs on its own thread; the signal hands the switch to the GUI thread
+                self.profile_hotkeys.append(
+                    keyboard.add_hotkey(hotkey, lambda name=name: self.profile_hotkey_pressed.emit(name))
+                )
+            except Exception as e:
+                print(f"Failed to register profile hotkey {hotkey}: {e}")
+    
+    def current_profile_settings(self, hotkey: str = "") -> "Profile":
+        """Bundle the regions and run settings shown in the window into a profile."""
+        from profiles import Profile
+        return Profile(
+            regions=tuple(self.current_regions()),
+            click_delay_ms=self.click_delay_input.value(),
+            reload_interval_s=self.reload_delay_input.value() if self.auto_reload_toggle.isChecked() else 0.0,
+            rate_hz=self.rate_input.value(),
+            precise_timing=self.precise_timing_toggle.isChecked(),
+            idle=self.idle_settings(),
+            hotkey=hotkey,
+        )
+    
+    @Slot()
+    def save_profile(self):
+        """Save the current setup under a name, compiling its detector state alongside it."""
+        from PySide6.QtWidgets import QInputDialog
+        
+        name, ok = QInputDialog.getText(self, "Save Profile", "Profile name:", text=self.current_profile or "")
+        name = name.strip()
+        if not ok or not name:
+            return
+        existing = self.ensure_profile_store().profiles.get(name)
+        if existing:
+            reply = QMessageBox.question(
+                self, "Overwrite?",
+                f"Profile '{name}' already exists. Overwrite?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+        hotkey, ok = QInputDialog.getText(self, "Save Profile", "Hotkey to switch to it (optional, e.g. ctrl+1):",
+                                          text=existing.hotkey if existing else "")
+        if not ok:
+            return
+        try:
+            self.profile_store.save(name, self.current_profile_settings(hotkey.strip()))
+        except OSError as e:
+            QMessageBox.warning(self, "Save Failed", f"Could not save profile '{name}':\n{e}")
+            return
+        self.current_profile = name
+        self.refresh_profile_combo()
+        self.setup_profile_hotkeys()
+        self.status_label.setText(f"Status: Profile '{name}' saved")
+    
+    @Slot()
+    def delete_profile(self):
+        """Delete the selected profile from disk."""
+        name = self.profile_combo.currentText()
+        if not name:
+            return
+        reply = QMessageBox.question(
+            self, "Confirm Delete",
+            f"Are you sure you want to delete profile '{name}'?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        try:
+            self.ensure_profile_store().delete(name)
+        except OSError as e:
+            QMessageBox.warning(self, "Delete Failed", f"Could not delete profile '{name}':\n{e}")
+        if self.current_profile == name:
+            self.current_profile = None
+        self.refresh_profile_combo()
+        self.setup_profile_hotkeys()
+    
+    @Slot(str)
+    def switch_profile(self, name: str):
+        """Apply a saved profile; an empty name moves to the next one.
+        
+        While running, the worker gets the new regions and actions in one update,
+        so the switch takes effect on its next frame.
+        """
+        store = self.ensure_profile_store()
+        if not name:
+            name = store.next_name(self.current_profile)
+        profile = store.profiles.get(name)
+        if profile is None:
+            return
+        
+        # Fill in the controls without sending every intermediate state to the worker
+        self.applying_profile = True
+        try:
+            self.apply_profile_controls(profile)
+        finally:
+            self.applying_profile = False
+        self.current_profile = name
+        self.profile_combo.setCurrentText(name)
+        
+        if self.worker and self.is_running:
+            old_executors = self.region_executors
+            self.region_executors = []
+            regions = list(profile.regions)
+            executors = self.make_executors(regions)
+            self.worker.update_settings(
+                regions, profile.rate_hz, profile.precise_timing, idle=profile.idle, executors=executors
+            )
+            # Executors the new profile does not use stop now rather than waiting for the swap
+            if self.click_executor not in executors:
+                self.click_executor.deactivate()
+            for executor in old_executors:
+                executor.shutdown()
+        self.status_label.setText(f"Status: {'Running' if self.is_running else 'Ready'} - profile '{name}'")
+    
+    def apply_profile_controls(self, profile: "Profile"):
+        """Show a profile's settings in the controls and place its detection boxes."""
+        from detection import MATCH_MODES, SCAN_ORDERS
+        from engine import region_to_dict
+        main, extras = profile.regions[0], profile.regions[1:]
+        
+        self.click_delay_input.setValue(profile.click_delay_ms)
+        self.rate_input.setValue(int(profile.rate_hz))
+        self.precise_timing_toggle.setChecked(profile.precise_timing)
+        idle_enabled, idle_hz, quiet_s = profile.idle
+        self.idle_throttle_toggle.setChecked(idle_enabled)
+        self.idle_rate_input.setValue(int(idle_hz))
+        self.quiet_period_input.setValue(quiet_s)
+        if profile.reload_interval_s > 0:
+            self.reload_delay_input.setValue(int(profile.reload_interval_s))
+        self.auto_reload_toggle.setChecked(profile.reload_interval_s > 0)
+        
+        if main.template is not None:
+            self.template = main.template
+        detector_index = {"color": 0, "motion": 2 if main.background_alpha else 1, "template": 3}[main.detector]
+        self.detector_combo.setCurrentIndex(detector_index)
+        self.extra_colors = list(main.extra_colors)
+        self.update_color_set_label()
+        self.update_base_color(main.base_color)
+        self.hex_input.setText(f"#{main.base_color[0]:02x}{main.base_color[1]:02x}{main.base_color[2]:02x}")
+        self.tolerance_slider.setValue(main.tolerance)
+        self.threshold_input.setValue(main.threshold_percent)
+        self.scan_order_combo.setCurrentIndex(SCAN_ORDERS.index(main.scan_order))
+        self.match_mode_combo.setCurrentIndex(MATCH_MODES.index(main.match_mode))
+        self.on_frames_input.setValue(main.on_frames)
+        self.off_frames_input.setValue(main.off_frames)
+        if main.action == "click":
+            self.action_combo.setCurrentIndex(0)
+        else:
+            self.action_combo.setCurrentIndex(1)
+            self.action_key_input.setText(main.action)
+        # Profiles store physical rects; the boxes are placed in logical coordinates
+        main_rect = self.screen_topology.to_logical(main.rect)
+        self.region_size_input.setValue(main_rect[2])
+        self.detection_box.set_detection_rect(main_rect)
+        
+        # Extra regions keep their own settings, exactly as saved
+        for box, _ in self.extra_regions:
+            box.close()
+            box.deleteLater()
+        self.extra_regions = []
+        for region in extras:
+            rect = self.screen_topology.to_logical(region.rect)
+            box = DetectionBox(rect[2], QColor(0, 200, 255))
+            box.set_detection_rect(rect)
+            box.set_locked(self.detection_box.is_locked())
+            box.geometry_changed.connect(self.push_live_settings)
+            if self.detection_box.isVisible():
+                box.show()
+            settings = region_to_dict(region)
+            del settings["rect"]
+            settings["template"] = region.template
+            self.extra_regions.append((box, settings))
+    
+    def closeEvent(self, event):
+        """Clean up when closing the application."""
+        self.stop_worker()
+        self.click_executor.shutdown()
+        self.threadpool.waitForDone(1000)
+        self.detection_pool.waitForDone(1000)
+        if self._capture_service is not None:
+            self._capture_service.close()
+        self.reload_timer.stop()
+        for box in self.all_boxes():
+            box.close()
+        if self.hotkeys_ready:
+            import keyboard
+            keyboard.remove_all_hotkeys()
+        event.accept()
+
+
+def main(launch_ns: int) -> int:
+    """Run the window until it closes; launch_ns is when main.py began importing."""
+    parser = argparse.ArgumentParser(description="Auto-Trigger")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print launch time by phase once everything has loaded, then exit; "
+                             f"the exit status is 1 if the window took over {TARGET_INTERACTIVE_MS:.0f} ms to respond")
+    args, qt_args = parser.parse_known_args()
+    
+    startup = StartupProfile(launch_ns)
+    startup.mark("imports", IMPORTED_NS)
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup.mark("Qt application")
+    window = MainWindow(startup)
+    window.show()
+    startup.mark("window shown")
+    
+    if args.profile_startup:
+        def report():
+            print(startup.report())
+            app.exit(0 if startup.interactive_ms <= TARGET_INTERACTIVE_MS else 1)
+        window.startup_finished.connect(report)
+    return app.exec()
@@ -0,0 +1,201 @@
+"""Runs a saved profile with no Qt: capture, detection and actions only.
+
+Nothing from PySide6 is imported, so startup is a fraction of the GUI's and the
+process stays small, which suits dedicated automation machines. Detection runs
+from launch until Ctrl+C, SIGTERM or --duration.
+
+Run with: python headless.py PROFILE [--duration S] [--dry-run] [--stats S] [--backend NAME]
+"""
+import time
+
+LAUNCH_NS = time.perf_counter_ns()
+
+import argparse
+import signal
+import sys
+import threading
+from typing import Optional
+
+from actions import ClickExecutor, NullActionBackend
+from capture import BACKENDS, CaptureService, benchmark_backends, fastest_backend, format_timings
+from engine import DetectionEngine, action_callable, bounding_rect
+from latency import LatencyRecorder
+from profiles import Profile
+from scheduler import AdaptiveScheduler, FrameScheduler
+
+SPIN_NS = 500_000  # Busy-wait the last 0.5ms before each deadline with precise timing
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Returns the peak resident memory of this process in MiB, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+class HeadlessRunner:
+    """Drives a DetectionEngine from a profile on the calling thread.
+
+    Each region gets its own action executor. With a reload interval, a
+    background thread presses R that often, first after one full interval as in
+    the GUI.
+    """
+
+    def __init__(self, profile: Profile, backend, capture=None):
+        self.profile = profile
+        self.backend = backend
+        self.capture = capture or CaptureService()
+        self.recorder = LatencyRecorder()
+        self.executors = []
+        for region in profile.regions:
+            executor = ClickExecutor(action_callable(backend, region.action), profile.click_delay_ms, self.recorder)
+            executor.start()
+            self.executors.append(executor)
+        self.engine = DetectionEngine(self.capture, profile.regions, self.executors, recorder=self.recorder,
+                                      monitors=getattr(self.capture, "monitors", list)())
+        idle_enabled, idle_hz, quiet_s = profile.idle
+        self.scheduler = AdaptiveScheduler(profile.rate_hz, idle_hz, quiet_s, idle_enabled,
+                                           spin_ns=SPIN_NS if profile.precise_timing else 0)
+        self.running = False
+        self.frames = 0
+        self.first_frame_ns = None
+        self._stopped = threading.Event()
+
+    def _reload_loop(self):
+        scheduler = FrameScheduler(1 / self.profile.reload_interval_s)
+        scheduler.wait()
+        while not self._stopped.is_set():
+            scheduler.wait()
+            if not self._stopped.is_set():
+                self.backend.press("r")
+
+    def run(self, duration_s: float = 0.0, stats_interval_s: float = 0.0, on_transition=None):
+        """Detect until stop() is called or duration_s passes (0 runs forever)."""
+        self.running = True
+        if self.profile.reload_interval_s > 0:
+            threading.Thread(target=self._reload_loop, name="Reload", daemon=True).start()
+        engine, scheduler = self.engine, self.scheduler
+        end_ns = time.perf_counter_ns() + int(duration_s * 1e9) if duration_s else None
+        stats_ns = int(stats_interval_s * 1e9)
+        next_stats = time.perf_counter_ns() + stats_ns
+        try:
+            while self.running:
+                scheduler.wait()
+                changes = engine.step()
+                scheduler.report(engine.activity, engine.analysis_ns - engine.capture_ns)
+                self.frames += 1
+                if self.first_frame_ns is None:
+                    self.first_frame_ns = engine.analysis_ns
+                if on_transition:
+                    for index, state in changes:
+                        on_transition(index, state)
+                if stats_ns and scheduler.last_tick >= next_stats:
+                    print(format_stats(scheduler.stats()), flush=True)
+                    next_stats = scheduler.last_tick + stats_ns
+                if end_ns is not None and scheduler.last_tick >= end_ns:
+                    break
+        finally:
+            self.close()
+
+    def stop(self):
+        """Ask run() to return after the current frame; safe from signal handlers and other threads."""
+        self.running = False
+
+    def close(self):
+        self._stopped.set()
+        self.engine.stop()
+        for executor in self.executors:
+            executor.shutdown()
+        self.capture.close()
+
+
+def format_stats(stats: dict) -> str:
+    return (f"{stats['mode']} {stats['rate_hz']:.1f} Hz, jitter {stats['jitter_us'] / 1000:.2f} ms, "
+            f"idle {stats['idle_s']:.0f}s, saved {stats['cpu_saved_s']:.2f}s CPU")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a detection profile without the GUI")
+    parser.add_argument("profile", help="Profile JSON file")
+    parser.add_argument("--duration", type=float, default=0.0, help="Stop after this many seconds (default: run until stopped)")
+    parser.add_argument("--dry-run", action="store_true", help="Count actions instead of sending input")
+    parser.add_argument("--stats", type=float, default=0.0, help="Print rate statistics every this many seconds")
+    parser.add_argument("--backend", default="auto", choices=["auto"] + [n for n in BACKENDS if n != "qt"],
+                        help="Screen capture backend; auto times each on the profile's regions and picks the fastest")
+    args = parser.parse_args()
+
+    profile = Profile.load(args.profile)
+    backend_name = args.backend
+    if backend_name == "auto":
+        timings = benchmark_backends(bounding_rect([r.rect for r in profile.regions]),
+                                     names=[n for n in BACKENDS if n != "qt"])
+        print(format_timings(timings), flush=True)
+        backend_name = fastest_backend(timings)
+        if backend_name is None:
+            parser.error("No capture backend works on this display")
+    capture = CaptureService(BACKENDS[backend_name])
+    try:
+        # Opens the backend, so a missing display or library is reported here rather than as a traceback
+        capture.monitors()
+    # Backends fail in library-specific ways (mss raises its own XError and ScreenShotError)
+    except Exception as e:
+        capture.close()
+        parser.error(f"{backend_name} capture is unavailable: {str(e) or type(e).__name__}")
+    if args.dry_run:
+        backend = NullActionBackend()
+    else:
+        from actions import DirectInputBackend
+        backend = DirectInputBackend()
+    runner = HeadlessRunner(profile, backend, capture)
+
+    signal.signal(signal.SIGINT, lambda *_: runner.stop())
+    signal.signal(signal.SIGTERM, lambda *_: runner.stop())
+
+    def on_transition(index: int, state: bool):
+        print(f"region {index} {'triggered' if state else 'cleared'}", flush=True)
+
+    print(f"Running {args.profile}: {len(profile.regions)} region(s) at {profile.rate_hz:g} Hz, "
+          f"{backend_name} capture", flush=True)
+    runner.run(args.duration, args.stats, on_transition)
+
+    total = runner.recorder.summary()["total"]
+    memory = peak_memory_mb()
+    line = f"{runner.frames} frames"
+    if runner.first_frame_ns is not None:
+        line += f"; first frame {(runner.first_frame_ns - LAUNCH_NS) / 1e6:.0f} ms after the imports began"
+    print(line)
+    print(format_stats(runner.scheduler.stats()))
+    if total["count"]:
+        print(f"Capture to action: p50 {total['p50'] / 1000:.1f} ms, p99 {total['p99'] / 1000:.1f} ms")
+    if memory is not None:
+        print(f"Peak memory: {memory:.0f} MiB")
+    if args.dry_run:
+        print(f"Dry run: {backend.click_count} clicks, key presses {backend.presses or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Low-overhead latency histograms for the detection-to-action pipeline."""
+import csv
+from typing import Optional
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond durations.
+
+    Each power of two is split into 16 linear sub-buckets, so recording is a
+    couple of integer operations and percentiles are accurate to about 6%.
+    """
+
+    SUB_BITS = 4
+    SUB_BUCKETS = 1 << SUB_BITS
+    MAX_EXPONENT = 40
+
+    def __init__(self):
+        self.counts = [0] * ((self.MAX_EXPONENT + 2) * self.SUB_BUCKETS)
+        self.count = 0
+        self.max_ns = 0
+
+    def _index(self, value: int) -> int:
+        exponent = max(0, value.bit_length() - self.SUB_BITS - 1)
+        exponent = min(exponent, self.MAX_EXPONENT)
+        return min(exponent * self.SUB_BUCKETS + (value >> exponent), len(self.counts) - 1)
+
+    def _bucket_midpoint(self, index: int) -> float:
+        exponent = max(0, index // self.SUB_BUCKETS - 1)
+        mantissa = index - exponent * self.SUB_BUCKETS
+        return ((mantissa << exponent) + ((mantissa + 1) << exponent)) / 2
+
+    def record(self, duration_ns: int):
+        """Add one duration sample."""
+        duration_ns = max(0, int(duration_ns))
+        self.counts[self._index(duration_ns)] += 1
+        self.count += 1
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Returns the approximate duration in nanoseconds at the given percentile."""
+        if not self.count:
+            return None
+        target = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._bucket_midpoint(index), self.max_ns)
+        return float(self.max_ns)
+
+    def reset(self):
+        """Discard all samples."""
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.max_ns = 0
+
+
+class LatencyRecorder:
+    """Per-stage latency histograms for the detection pipeline.
+
+    Stages:
+        grab      capture start -> grab done (every frame)
+        analysis  grab done -> analysis done (every frame)
+        signal    analysis done -> signal delivered to the GUI (on transitions)
+        click     analysis done -> first click sent (on activation)
+        total     capture start -> first click sent (on activation)
+    """
+
+    STAGES = ("grab", "analysis", "signal", "click", "total")
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+
+    def record(self, stage: str, duration_ns: int):
+        """Add one sample to a stage."""
+        self.histograms[stage].record(duration_ns)
+
+    def record_frame(self, capture_ns: int, grab_ns: int, analysis_ns: int):
+        """Record the grab and analysis stages of one frame from its timestamps."""
+        self.histograms["grab"].record(grab_ns - capture_ns)
+        self.histograms["analysis"].record(analysis_ns - grab_ns)
+
+    def summary(self) -> dict:
+        """Returns {stage: {"count", "p50", "p95", "p99", "max"}} with times in microseconds."""
+        result = {}
+        for stage, histogram in self.histograms.items():
+            row = {"count": histogram.count, "max": histogram.max_ns / 1000}
+            for percent in self.PERCENTILES:
+                value = histogram.percentile(percent)
+                row[f"p{percent}"] = None if value is None else value / 1000
+            result[stage] = row
+        return result
+
+    def export(self, path: str):
+        """Write the per-stage summary to a CSV file."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "count", "p50_us", "p95_us", "p99_us", "max_us"])
+            for stage, row in self.summary().items():
+                writer.writerow([stage, row["count"], row["p50"], row["p95"], row["p99"], row["max"]])
+
+    def reset(self):
+        """Discard all samples."""
+        for histogram in self.histograms.values():
+            histogram.reset()
@@ -0,0 +1,194 @@
+"""Saved detector setups shared by the GUI and the headless runner.
+
+A profile is a JSON file of settings. Next to it, a .npz cache holds the state
+compiled from those settings, namely color tables and template patches, so
+loading a profile puts it in a ready-to-run state without recomputing anything.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from detection import TABLE_FORMAT, boundary_bins, color_table, preload_color_table, uses_color_table
+from engine import RegionConfig, region_from_dict, region_to_dict
+
+PROFILE_DIR = "profiles"
+POSITIONS_FILE = "positions.json"
+
+
+def table_key(region: RegionConfig) -> Optional[Tuple[Tuple[Tuple[int, int, int], ...], int, str]]:
+    """Returns the color_table() arguments a color region runs with, or None if it needs no table."""
+    if region.detector != "color" or not uses_color_table(region.match_mode, region.extra_colors):
+        return None
+    return (tuple(region.base_color),) + tuple(region.extra_colors), region.tolerance, region.match_mode
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Everything needed to run detection: the regions plus the loop and action settings.
+
+    idle is (enabled, idle rate in Hz, quiet period in seconds) for the adaptive
+    scheduler. reload_interval_s presses R that often while running; 0 turns it off.
+    hotkey, if set, switches to this profile in the GUI, e.g. "ctrl+1".
+    """
+    regions: Tuple[RegionConfig, ...]
+    click_delay_ms: int = 30
+    reload_interval_s: float = 0.0
+    rate_hz: float = 33.0
+    precise_timing: bool = False
+    idle: Tuple[bool, float, float] = (False, 5.0, 2.0)
+    hotkey: str = ""
+
+    def to_dict(self) -> dict:
+        """Returns JSON-friendly values; templates are saved separately by save()."""
+        return {
+            "regions": [region_to_dict(r) for r in self.regions],
+            "click_delay_ms": self.click_delay_ms,
+            "reload_interval_s": self.reload_interval_s,
+            "rate_hz": self.rate_hz,
+            "precise_timing": self.precise_timing,
+            "idle": {"enabled": self.idle[0], "rate_hz": self.idle[1], "quiet_s": self.idle[2]},
+            "hotkey": self.hotkey,
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict, templates: Optional[Dict[int, np.ndarray]] = None) -> "Profile":
+        """Builds a profile from to_dict() output; templates maps region index to template patch."""
+        templates = templates or {}
+        idle = values.get("idle", {})
+        return cls(
+            regions=tuple(region_from_dict(r, templates.get(i)) for i, r in enumerate(values["regions"])),
+            click_delay_ms=int(values.get("click_delay_ms", 30)),
+            reload_interval_s=float(values.get("reload_interval_s", 0.0)),
+            rate_hz=float(values.get("rate_hz", 33.0)),
+            precise_timing=bool(values.get("precise_timing", False)),
+            idle=(bool(idle.get("enabled", False)), float(idle.get("rate_hz", 5.0)), float(idle.get("quiet_s", 2.0))),
+            hotkey=str(values.get("hotkey", "")),
+        )
+
+    def compile(self):
+        """Builds every color table the regions run with, on the calling thread.
+
+        Tables come from the preloaded cache when a matching one exists, so the
+        detection loop never compiles one after a profile is loaded.
+        """
+        for region in self.regions:
+            key = table_key(region)
+            if key is not None:
+                color_table(*key)
+                if key[2] == "rgb":
+                    boundary_bins(*key[:2])
+
+    def save(self, path: str):
+        """Write the settings to path and the compiled state to the .npz next to it."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+        keys = [key for key in dict.fromkeys(table_key(r) for r in self.regions) if key is not None]
+        arrays = {
+            f"template_{i}": r.template for i, r in enumerate(self.regions) if r.template is not None
+        }
+        if keys:
+            arrays["tables"] = np.stack([np.packbits(color_table(*key)) for key in keys])
+        arrays["table_keys"] = np.array(json.dumps(keys))
+        arrays["table_format"] = np.array(TABLE_FORMAT)
+        np.savez(cache_path(path), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "Profile":
+        """Read a profile and install its cached tables so nothing has to be recompiled."""
+        with open(path) as f:
+            values = json.load(f)
+        templates = {}
+        cache = cache_path(path)
+        if os.path.exists(cache):
+            with np.load(cache) as arrays:
+                for name in arrays.files:
+                    if name.startswith("template_"):
+                        templates[int(name[len("template_"):])] = arrays[name]
+                keys = json.loads(str(arrays["table_keys"]))
+                current = "table_format" in arrays.files and int(arrays["table_format"]) == TABLE_FORMAT
+                if keys and current:
+                    tables = np.unpackbits(arrays["tables"], axis=1).astype(bool)
+                    for (colors, tolerance, mode), table in zip(keys, tables):
+                        preload_color_table(colors, tolerance, mode, table)
+        profile = cls.from_dict(values, templates)
+        if not profile.regions:
+            raise ValueError(f"{path} has no regions")
+        # Anything the cache did not cover (a hand-edited file, say) is compiled now rather than mid-run
+        profile.compile()
+        return profile
+
+
+def cache_path(path: str) -> str:
+    """Returns the compiled-state cache file that belongs to a profile file."""
+    return os.path.splitext(path)[0] + ".npz"
+
+
+class ProfileStore:
+    """The profiles saved in a directory, loaded once and kept in memory.
+
+    Because every profile is already loaded and compiled, switching between them
+    costs no disk access or table building.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR):
+        self.directory = directory
+        self.profiles: Dict[str, Profile] = {}
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def load_all(self) -> List[str]:
+        """Load every profile in the directory; returns an error message per file that failed."""
+        errors = []
+        self.profiles = {}
+        if not os.path.isdir(self.directory):
+            return errors
+        for file_name in sorted(os.listdir(self.directory)):
+            name, ext = os.path.splitext(file_name)
+            if ext != ".json" or file_name == POSITIONS_FILE:
+                continue
+            try:
+                self.profiles[name] = Profile.load(self.path(name))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                errors.append(f"{file_name}: {e}")
+        return errors
+
+    def names(self) -> List[str]:
+        return sorted(self.profiles)
+
+    def save(self, name: str, profile: Profile):
+        os.makedirs(self.directory, exist_ok=True)
+        profile.save(self.path(name))
+        self.profiles[name] = profile
+
+    def delete(self, name: str):
+        self.profiles.pop(name, None)
+        for path in (self.path(name), cache_path(self.path(name))):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def next_name(self, current: Optional[str]) -> Optional[str]:
+        """Returns the profile after current in name order, wrapping around."""
+        names = self.names()
+        if not names:
+            return None
+        if current not in names:
+            return names[0]
+        return names[(names.index(current) + 1) % len(names)]
+
+    def load_positions(self) -> Dict[str, Tuple[int, int]]:
+        """Returns the saved detection box positions by name."""
+        path = os.path.join(self.directory, POSITIONS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return {name: (int(x), int(y)) for name, (x, y) in json.load(f).items()}
+
+    def save_positions(self, positions: Dict[str, Tuple[int, int]]):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, POSITIONS_FILE), "w") as f:
+            json.dump({name: list(pos) for name, pos in positions.items()}, f, indent=2)
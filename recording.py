@@ -0,0 +1,265 @@
+"""A ring of recent frames, compact binary dumps of it, and offline replay.
+
+The detection loop keeps the regions' pixels from the last N grabs in a
+preallocated ring. A dump, taken on demand or when a region triggers, writes
+the ring to a small binary file that can be replayed through the detection
+engine at full speed to tune settings.
+
+Replay with: python recording.py DUMP [--tolerance N] [--threshold PCT] [--mode MODE] [--color RRGGBB]
+"""
+import argparse
+import json
+import os
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from capture import Region
+from detection import MATCH_MODES
+from engine import DetectionEngine, RegionConfig, region_from_dict, region_to_dict
+
+MAGIC = b"ATRF"
+VERSION = 1
+# magic, version, frame count, height, width, metadata length
+HEADER = struct.Struct("<4sHIIII")
+# Upper limit on a frame ring, and on the frames of one dump
+MAX_RING_BYTES = 256 << 20
+
+
+@dataclass
+class Recording:
+    """A run of captured frames with the settings they were analysed with.
+
+    frames holds (count, height, width, 3) BGR pixels of the bounding grab at
+    bounds; the alpha channel is constant and is not stored. active is whether
+    any region was triggered after each frame.
+    """
+    frames: np.ndarray
+    capture_ns: np.ndarray
+    active: np.ndarray
+    bounds: Region
+    regions: Tuple[RegionConfig, ...]
+
+    def save(self, path: str):
+        """Write the recording as a header, JSON metadata, then the raw arrays."""
+        count, height, width = self.frames.shape[:3]
+        metadata = json.dumps({
+            "bounds": list(self.bounds),
+            "regions": [region_to_dict(r) for r in self.regions if r.detector != "template"],
+        }).encode()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, count, height, width, len(metadata)))
+            f.write(metadata)
+            f.write(self.capture_ns.astype("<i8").tobytes())
+            f.write(self.active.astype(np.uint8).tobytes())
+            f.write(np.ascontiguousarray(self.frames).tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        """Read a file written by save(); template regions are not stored and are dropped."""
+        with open(path, "rb") as f:
+            magic, version, count, height, width, metadata_length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} frame recording")
+            metadata = json.loads(f.read(metadata_length))
+            capture_ns = np.frombuffer(f.read(count * 8), dtype="<i8").astype(np.int64)
+            active = np.frombuffer(f.read(count), dtype=np.uint8).astype(bool)
+            frames = np.frombuffer(f.read(), dtype=np.uint8).reshape(count, height, width, 3)
+        regions = tuple(region_from_dict(values) for values in metadata["regions"])
+        return cls(frames, capture_ns, active, tuple(metadata["bounds"]), regions)
+
+
+class FrameRing:
+    """The last capacity frames of the recorded regions, in arrays allocated once.
+
+    append() copies only the regions' pixels out of each grab, so the ring grows
+    with the regions and not with the rectangle bounding them, and capacity is
+    lowered where needed to keep the ring within max_bytes. The arrays are only
+    reallocated when the grab's bounds or regions change, which starts the ring
+    over.
+    """
+
+    def __init__(self, capacity: int, max_bytes: int = MAX_RING_BYTES):
+        self.requested = capacity
+        self.max_bytes = max_bytes
+        self.capacity = 0
+        self.pixels = None
+        self.capture_ns = None
+        self.active = None
+        self.bounds = None
+        self.rects = ()
+        self.count = 0
+        self.next = 0
+
+    def _allocate(self, bounds: Region, rects: Tuple[Region, ...]):
+        size = sum(width * height for _, _, width, height in rects)
+        self.capacity = max(1, min(self.requested, self.max_bytes // max(1, size * 3)))
+        # Each slot holds the regions' BGR pixels one after another
+        self.pixels = np.empty((self.capacity, size, 3), dtype=np.uint8)
+        self.capture_ns = np.zeros(self.capacity, dtype=np.int64)
+        self.active = np.zeros(self.capacity, dtype=bool)
+        self.bounds, self.rects = bounds, rects
+        self.count = self.next = 0
+
+    def append(self, frame: np.ndarray, capture_ns: int, active: bool, bounds: Region,
+               rects: Sequence[Region]):
+        """Store the pixels of rects, screen rectangles inside the BGRA grab of bounds."""
+        rects = tuple(dict.fromkeys(tuple(rect) for rect in rects))
+        if bounds != self.bounds or rects != self.rects:
+            self._allocate(bounds, rects)
+        slot = self.pixels[self.next]
+        offset = 0
+        for left, top, width, height in rects:
+            x, y = left - bounds[0], top - bounds[1]
+            slot[offset:offset + width * height].reshape(height, width, 3)[...] = frame[y:y + height, x:x + width, :3]
+            offset += width * height
+        self.capture_ns[self.next] = capture_ns
+        self.active[self.next] = active
+        self.next = (self.next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def snapshot(self, regions: Sequence[RegionConfig]) -> Optional[Recording]:
+        """Returns a copy of the ring, oldest frame first, or None if it is empty.
+
+        The recording holds whole frames of the grab's bounds, black outside the
+        recorded regions. As those frames can be much larger than the regions,
+        only the newest that fit in max_bytes are kept.
+        """
+        if not self.count:
+            return None
+        left, top, width, height = self.bounds
+        count = min(self.count, max(1, self.max_bytes // (width * height * 3)))
+        order = (np.arange(count) + self.next - count) % self.capacity
+        frames = np.zeros((count, height, width, 3), dtype=np.uint8)
+        offset = 0
+        for x, y, w, h in self.rects:
+            patch = self.pixels[order, offset:offset + w * h]
+            frames[:, y - top:y - top + h, x - left:x - left + w] = patch.reshape(count, h, w, 3)
+            offset += w * h
+        # Regions on other monitors were grabbed separately and are not in these frames
+        inside = tuple(r for r in regions if tuple(r.rect) in self.rects)
+        return Recording(frames, self.capture_ns[order], self.active[order], self.bounds, inside)
+
+
+def dump_path(directory: str) -> str:
+    """Returns a new timestamped dump file name in directory."""
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"frames-{stamp}-{time.perf_counter_ns() % 1_000_000:06d}.atr")
+
+
+class TriggerRecorder:
+    """Feeds a FrameRing from the detection loop and writes dumps on a background thread.
+
+    The loop calls after_step() once per frame. Dumps are taken after the next
+    frame when requested with request_dump() from any thread, and right away
+    when a region triggers if dump_on_trigger is set. The paths of finished
+    dumps are queued in saved for the owner to report.
+    """
+
+    def __init__(self, capacity: int, dump_on_trigger: bool = False, directory: str = "recordings"):
+        self.ring = FrameRing(capacity)
+        self.dump_on_trigger = dump_on_trigger
+        self.directory = directory
+        self.pending_dump = None
+        self.saved = deque()
+
+    def request_dump(self, path: Optional[str] = None):
+        """Dump the ring after the next frame, to path or a new file in the directory."""
+        self.pending_dump = path or dump_path(self.directory)
+
+    def after_step(self, engine: DetectionEngine, triggered: bool):
+        """Record the engine's latest grab; triggered is whether a region just switched on."""
+        # Only the regions in the exposed grab are kept, not the rest of its rectangle
+        rects = [engine.regions[index].rect for index, _, _ in engine.grabs[0][1]]
+        self.ring.append(engine.frame, engine.capture_ns, engine.active, engine.bounds, rects)
+        path, self.pending_dump = self.pending_dump, None
+        if path is None and triggered and self.dump_on_trigger:
+            path = dump_path(self.directory)
+        if path is None:
+            return
+        recording = self.ring.snapshot(engine.regions)
+        threading.Thread(target=self._save, args=(recording, path), name="FrameDump", daemon=True).start()
+
+    def _save(self, recording: Recording, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        recording.save(path)
+        self.saved.append(path)
+
+
+class ReplayCapture:
+    """Serves a recording's frames to the engine, one per grab, in place of the screen."""
+
+    def __init__(self, recording: Recording):
+        count, height, width = recording.frames.shape[:3]
+        self.frames = np.empty((count, height, width, 4), dtype=np.uint8)
+        self.frames[..., :3] = recording.frames
+        self.frames[..., 3] = 255
+        self.bounds = recording.bounds
+        self.frame_index = 0
+
+    def grab(self, region: Region) -> np.ndarray:
+        left, top = region[0] - self.bounds[0], region[1] - self.bounds[1]
+        frame = self.frames[self.frame_index, top:top + region[3], left:left + region[2]]
+        self.frame_index += 1
+        return frame
+
+    def close(self):
+        pass
+
+
+def replay(recording: Recording, regions: Sequence[RegionConfig]) -> Tuple[List[Tuple[int, int, bool]], float]:
+    """Runs every frame through a fresh engine unpaced.
+
+    Returns the (frame index, region index, state) transitions and the frames
+    per second achieved.
+    """
+    engine = DetectionEngine(ReplayCapture(recording), regions)
+    transitions = []
+    start = time.perf_counter_ns()
+    for index in range(len(recording.frames)):
+        transitions.extend((index, region, state) for region, state in engine.step())
+    elapsed_ns = time.perf_counter_ns() - start
+    return transitions, len(recording.frames) / (elapsed_ns / 1e9) if elapsed_ns else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a frame dump through the detector")
+    parser.add_argument("dump", help="File written by a frame dump")
+    parser.add_argument("--tolerance", type=int, help="Override the tolerance of every color region")
+    parser.add_argument("--threshold", type=float, help="Override the threshold percent of every region")
+    parser.add_argument("--mode", choices=MATCH_MODES, help="Override the match mode of every color region")
+    parser.add_argument("--color", help="Override the base color as RRGGBB")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.dump)
+    overrides = {}
+    if args.tolerance is not None:
+        overrides["tolerance"] = args.tolerance
+    if args.threshold is not None:
+        overrides["threshold_percent"] = args.threshold
+    if args.mode is not None:
+        overrides["match_mode"] = args.mode
+    if args.color is not None:
+        color = args.color.lstrip("#")
+        overrides["base_color"] = tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+    regions = [replace(r, **overrides) for r in recording.regions]
+    if not regions:
+        parser.error("The dump holds no replayable regions")
+
+    transitions, fps = replay(recording, regions)
+    recorded = [i for i in range(len(recording.active)) if recording.active[i] and (i == 0 or not recording.active[i - 1])]
+    print(f"{len(recording.frames)} frames of {recording.bounds[2]}x{recording.bounds[3]} replayed at {fps:.0f} FPS")
+    print(f"Recorded triggers at frames: {recorded or 'none'}")
+    for frame, region, state in transitions:
+        print(f"  frame {frame:>5}  region {region}  {'on' if state else 'off'}")
+    if not transitions:
+        print("  no transitions with these settings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""High-resolution pacing for the detection loop."""
+import time
+from collections import deque
+
+
+class FrameScheduler:
+    """Paces a loop against absolute perf_counter_ns deadlines.
+
+    Deadlines advance by a fixed period from the previous deadline rather than
+    from the time the frame finished, so sleep overshoot does not accumulate into
+    drift. With spin_ns set, the scheduler sleeps until spin_ns before the deadline
+    and busy-waits the rest, trading a little CPU for sub-millisecond accuracy.
+    """
+
+    MAX_RATE_HZ = 1000
+
+    def __init__(self, rate_hz: float, spin_ns: int = 0, window: int = 256):
+        self.spin_ns = spin_ns
+        self.period_ns = 0
+        self.set_rate(rate_hz)
+        self.next_deadline = None
+        self.last_tick = None
+        self.missed_deadlines = 0
+        self.intervals = deque(maxlen=window)
+
+    def set_rate(self, rate_hz: float):
+        """Change the target loop rate; takes effect from the next deadline."""
+        rate_hz = min(max(rate_hz, 1e-3), self.MAX_RATE_HZ)
+        self.period_ns = int(1_000_000_000 / rate_hz)
+
+    def reset(self):
+        """Forget the deadline and statistics so the next wait returns immediately."""
+        self.next_deadline = None
+        self.last_tick = None
+        self.missed_deadlines = 0
+        self.intervals.clear()
+
+    def wait(self):
+        """Block until the next deadline, then record the tick."""
+        now = time.perf_counter_ns()
+        if self.next_deadline is None:
+            self.next_deadline = now
+        else:
+            self.next_deadline += self.period_ns
+            if now - self.next_deadline > self.period_ns:
+                # More than a whole frame behind: resync instead of bursting to catch up
+                self.missed_deadlines += 1
+                self.next_deadline = now
+
+            sleep_ns = self.next_deadline - now - self.spin_ns
+            if sleep_ns > 0:
+                time.sleep(sleep_ns / 1_000_000_000)
+            if self.spin_ns:
+                while time.perf_counter_ns() < self.next_deadline:
+                    pass
+
+        tick = time.perf_counter_ns()
+        if self.last_tick is not None:
+            self.intervals.append(tick - self.last_tick)
+        self.last_tick = tick
+
+    def stats(self) -> dict:
+        """Returns the achieved rate and interval jitter over the recent window."""
+        count = len(self.intervals)
+        if not count:
+            return {"rate_hz": 0.0, "jitter_us": 0.0, "missed": self.missed_deadlines}
+
+        mean = sum(self.intervals) / count
+        variance = sum((i - mean) ** 2 for i in self.intervals) / count
+        return {
+            "rate_hz": 1_000_000_000 / mean if mean else 0.0,
+            "jitter_us": variance ** 0.5 / 1000,
+            "missed": self.missed_deadlines,
+        }
+
+
+class AdaptiveScheduler(FrameScheduler):
+    """A FrameScheduler that drops to an idle rate while nothing is happening.
+
+    The loop reports each frame's activity and cost through report(). In burst
+    mode it runs at the full rate; after quiet_s seconds without activity it
+    switches to idle_hz, and the first active frame switches it straight back and
+    makes the next wait return immediately. Time spent in each mode and the
+    analysis time saved by idling are included in stats().
+    """
+
+    BURST = "burst"
+    IDLE = "idle"
+
+    def __init__(self, rate_hz: float, idle_hz: float = 5.0, quiet_s: float = 2.0,
+                 enabled: bool = True, spin_ns: int = 0, window: int = 256):
+        self.mode = self.BURST
+        super().__init__(rate_hz, spin_ns=spin_ns, window=window)
+        self.configure(rate_hz, idle_hz, quiet_s, enabled)
+        self.mode_since = None
+        self.last_activity = None
+        self.mode_ns = {self.BURST: 0, self.IDLE: 0}
+        self.idle_frames = 0
+        self.frames = 0
+        self.cost_ns = 0
+
+    def configure(self, rate_hz: float, idle_hz: float, quiet_s: float, enabled: bool = True):
+        """Change the burst rate, idle rate and quiet period from any thread."""
+        self.set_rate(idle_hz)
+        self.idle_period_ns = self.period_ns
+        self.set_rate(rate_hz)
+        self.burst_period_ns = self.period_ns
+        self.quiet_ns = int(quiet_s * 1_000_000_000)
+        self.enabled = enabled
+        if self.mode == self.IDLE:
+            self.period_ns = self.idle_period_ns
+
+    def _switch(self, mode: str, now: int):
+        if self.mode_since is not None:
+            self.mode_ns[self.mode] += now - self.mode_since
+        self.mode = mode
+        self.mode_since = now
+        self.period_ns = self.idle_period_ns if mode == self.IDLE else self.burst_period_ns
+        # Keep the rate and jitter statistics about the current mode only
+        self.intervals.clear()
+
+    def report(self, active: bool, frame_cost_ns: int):
+        """Feed one frame's activity and capture-plus-analysis time."""
+        now = time.perf_counter_ns()
+        if self.mode_since is None:
+            self.mode_since = now
+        self.frames += 1
+        self.cost_ns += frame_cost_ns
+
+        # The quiet period also counts from the first frame
+        if active or self.last_activity is None:
+            self.last_activity = now
+        if self.mode == self.IDLE:
+            self.idle_frames += 1
+            if active or not self.enabled:
+                self._switch(self.BURST, now)
+                self.next_deadline = None
+        elif self.enabled and now - self.last_activity >= self.quiet_ns:
+            self._switch(self.IDLE, now)
+
+    def stats(self) -> dict:
+        """Adds the current mode, seconds spent in each mode and CPU seconds saved by idling."""
+        stats = super().stats()
+        mode_ns = dict(self.mode_ns)
+        if self.mode_since is not None:
+            mode_ns[self.mode] += time.perf_counter_ns() - self.mode_since
+
+        # Frames the idle time would have cost at the burst rate, less those actually run
+        mean_cost_ns = self.cost_ns / self.frames if self.frames else 0.0
+        skipped = max(0.0, mode_ns[self.IDLE] / self.burst_period_ns - self.idle_frames)
+        stats.update({
+            "mode": self.mode,
+            "burst_s": mode_ns[self.BURST] / 1_000_000_000,
+            "idle_s": mode_ns[self.IDLE] / 1_000_000_000,
+            "cpu_saved_s": skipped * mean_cost_ns / 1_000_000_000,
+        })
+        return stats
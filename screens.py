@@ -0,0 +1,126 @@
+"""Mapping between Qt's logical screen coordinates and physical capture pixels.
+
+With display scaling, Qt positions widgets in logical units while capture
+backends address physical pixels, and each monitor can have its own scale. The
+topology pairs every logical screen with its physical monitor rectangle once;
+conversions are then a lookup plus a multiply, and the results are memoized
+until the GUI builds a new topology after a screen change.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# capture.Region, spelled out so the GUI can map screens before numpy is imported
+Region = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class Monitor:
+    """One screen: where it is in logical units, where it is in physical pixels, and the scale between."""
+    logical: Region
+    physical: Region
+    scale: float
+
+
+def _contains(rect: Region, x: float, y: float) -> bool:
+    return rect[0] <= x < rect[0] + rect[2] and rect[1] <= y < rect[1] + rect[3]
+
+
+def _clip(rect: Region, bounds: Region) -> Region:
+    left = max(rect[0], bounds[0])
+    top = max(rect[1], bounds[1])
+    right = min(rect[0] + rect[2], bounds[0] + bounds[2])
+    bottom = min(rect[1] + rect[3], bounds[1] + bounds[3])
+    return (left, top, max(0, right - left), max(0, bottom - top))
+
+
+def match_monitors(screens: Sequence[Tuple[Region, float]], physical: Sequence[Region]) -> List[Monitor]:
+    """Pairs (logical geometry, scale) screens with physical monitor rectangles.
+
+    A screen is paired with an unused physical monitor of its scaled size,
+    taking them in left-to-right, top-to-bottom order. Screens with no match,
+    or no physical list at all, fall back to scaling the logical geometry,
+    which is right whenever one scale applies to the whole desktop.
+    """
+    unused = sorted(physical, key=lambda r: (r[0], r[1]))
+    monitors = []
+    for logical, scale in sorted(screens, key=lambda s: (s[0][0], s[0][1])):
+        size = (round(logical[2] * scale), round(logical[3] * scale))
+        match = next((r for r in unused if (r[2], r[3]) == size), None)
+        if match is not None:
+            unused.remove(match)
+        else:
+            match = (round(logical[0] * scale), round(logical[1] * scale)) + size
+        monitors.append(Monitor(tuple(logical), tuple(match), scale))
+    return monitors
+
+
+class ScreenTopology:
+    """Converts rectangles and points between logical and physical coordinates.
+
+    A rectangle belongs to the monitor containing its centre and is clipped to
+    it, so a grab never spans monitors. Conversions are cached per rectangle;
+    build a new topology when the screens change.
+    """
+
+    def __init__(self, monitors: Sequence[Monitor]):
+        self.monitors = tuple(monitors)
+        self._physical: Dict[Region, Region] = {}
+        self._logical: Dict[Region, Region] = {}
+
+    def monitor_at(self, x: float, y: float, physical: bool = False) -> Optional[Monitor]:
+        """Returns the monitor containing a logical (or physical) point, or None."""
+        for monitor in self.monitors:
+            if _contains(monitor.physical if physical else monitor.logical, x, y):
+                return monitor
+        return None
+
+    def _nearest(self, x: float, y: float, physical: bool) -> Optional[Monitor]:
+        monitor = self.monitor_at(x, y, physical)
+        if monitor is None and self.monitors:
+            # Off every screen: use the closest one
+            def distance(m: Monitor) -> float:
+                r = m.physical if physical else m.logical
+                return (max(r[0] - x, 0, x - r[0] - r[2]) ** 2 + max(r[1] - y, 0, y - r[1] - r[3]) ** 2)
+            monitor = min(self.monitors, key=distance)
+        return monitor
+
+    def to_physical(self, rect: Region) -> Region:
+        """Maps a logical (left, top, width, height) rectangle to physical pixels on its monitor."""
+        rect = tuple(rect)
+        cached = self._physical.get(rect)
+        if cached is not None:
+            return cached
+        monitor = self._nearest(rect[0] + rect[2] / 2, rect[1] + rect[3] / 2, physical=False)
+        if monitor is None:
+            result = rect
+        else:
+            log, phys, scale = monitor.logical, monitor.physical, monitor.scale
+            result = _clip((phys[0] + round((rect[0] - log[0]) * scale), phys[1] + round((rect[1] - log[1]) * scale),
+                            max(1, round(rect[2] * scale)), max(1, round(rect[3] * scale))), phys)
+        self._physical[rect] = result
+        return result
+
+    def to_logical(self, rect: Region) -> Region:
+        """Maps a physical rectangle back to logical coordinates on its monitor."""
+        rect = tuple(rect)
+        cached = self._logical.get(rect)
+        if cached is not None:
+            return cached
+        monitor = self._nearest(rect[0] + rect[2] / 2, rect[1] + rect[3] / 2, physical=True)
+        if monitor is None:
+            result = rect
+        else:
+            log, phys, scale = monitor.logical, monitor.physical, monitor.scale
+            result = (log[0] + round((rect[0] - phys[0]) / scale), log[1] + round((rect[1] - phys[1]) / scale),
+                      max(1, round(rect[2] / scale)), max(1, round(rect[3] / scale)))
+        self._logical[rect] = result
+        return result
+
+    def point_to_physical(self, x: int, y: int) -> Tuple[int, int]:
+        """Maps a logical point to the physical pixel under it."""
+        left, top, _, _ = self.to_physical((x, y, 1, 1))
+        return left, top
+
+    def physical_monitors(self) -> List[Region]:
+        """Returns every monitor's physical rectangle, for grouping grabs by monitor."""
+        return [monitor.physical for monitor in self.monitors]
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from detection import (MATCH_MODES, color_table, detect_change, mismatch_mask, palette_mismatch_mask,
+                       table_index)
+
+rng = np.random.default_rng(12)
+
+
+def random_colors(count):
+    return tuple(tuple(int(v) for v in rng.integers(0, 256, 3)) for _ in range(count))
+
+
+def exact_mismatches(rgb, colors, tolerance, mode):
+    """Per-pixel classification without any table: a pixel mismatches when it matches none of colors."""
+    return np.logical_and.reduce([mismatch_mask(rgb, color, tolerance, mode) for color in colors])
+
+
+def solid(height, width, rgb):
+    frame = np.full((height, width, 4), 255, dtype=np.uint8)
+    frame[..., :3] = rgb[::-1]
+    return frame
+
+
+@pytest.mark.parametrize("mode", MATCH_MODES)
+@pytest.mark.parametrize("count", [1, 3])
+def test_color_table_agrees_with_exact_classification(mode, count):
+    # Bins are judged by their best color, so a table mismatch is always an exact
+    # mismatch and an exact match is never a table mismatch
+    rgb = rng.integers(0, 256, (20000, 3), dtype=np.uint8)
+    bgr = np.ascontiguousarray(rgb[:, ::-1])
+    for _ in range(5):
+        colors = random_colors(count)
+        tolerance = int(rng.integers(0, 80))
+        table = color_table(colors, tolerance, mode)[table_index(bgr)]
+        exact = exact_mismatches(rgb, colors, tolerance, mode)
+        assert not (table & ~exact).any()
+
+
+@pytest.mark.parametrize("mode", MATCH_MODES)
+def test_color_table_never_rejects_its_own_colors(mode):
+    colors = random_colors(4) + ((0, 0, 0), (255, 255, 255))
+    bgr = np.array([color[::-1] for color in colors], dtype=np.uint8)
+    for tolerance in (0, 1, 5):
+        assert not color_table(colors, tolerance, mode)[table_index(bgr)].any()
+
+
+@pytest.mark.parametrize("count", [1, 2, 8, 40])
+@pytest.mark.parametrize("tolerance", [0, 3, 20, 90])
+def test_palette_mismatch_mask_is_exact(count, tolerance):
+    frame = rng.integers(0, 256, (64, 64, 4), dtype=np.uint8)
+    colors = random_colors(count)
+    # Put some pixels right around the colors, where bins straddle the tolerance
+    near = np.array([color[::-1] for color in colors], dtype=np.int64)[rng.integers(0, count, 1024)]
+    near += rng.integers(-tolerance - 2, tolerance + 3, near.shape)
+    frame.reshape(-1, 4)[:1024, :3] = np.clip(near, 0, 255)
+    expected = exact_mismatches(frame[..., 2::-1], colors, tolerance, "rgb")
+    assert np.array_equal(palette_mismatch_mask(frame, colors, tolerance), expected)
+
+
+@pytest.mark.parametrize("mode", MATCH_MODES)
+@pytest.mark.parametrize("scan_order", ["center", "interleaved", "raster", "pyramid"])
+def test_base_color_region_is_unchanged(mode, scan_order):
+    for color in ((100, 150, 200), (255, 0, 0), (7, 7, 7), (0, 0, 0), (255, 255, 255)):
+        for tolerance in (0, 1, 10):
+            for extra in ((), ((10, 20, 30),)):
+                assert not detect_change(solid(96, 96, color), color, tolerance, 2.0, match_mode=mode,
+                                         extra_colors=extra, scan_order=scan_order)
+
+
+@pytest.mark.parametrize("scan_order", ["center", "raster", "pyramid"])
+def test_detect_change_matches_exact_count(scan_order):
+    for _ in range(50):
+        frame = rng.integers(0, 256, (20, 20, 4), dtype=np.uint8)
+        frame[:10] = frame[0, 0]
+        base, extra = random_colors(1)[0], random_colors(2)
+        tolerance = int(rng.integers(0, 120))
+        mismatched = exact_mismatches(frame[..., 2::-1], (base,) + extra, tolerance, "rgb")
+        expected = np.count_nonzero(mismatched) > int(400 * 30 / 100)
+        assert detect_change(frame, base, tolerance, 30.0, max_samples=10 ** 6, scan_order=scan_order,
+                             extra_colors=extra) == expected
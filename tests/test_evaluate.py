@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from detection import TransitionFilter, color_table, detect_change, palette_mismatch_mask, table_index
+from engine import RegionConfig
+from evaluate import debounce, mismatch_counts, onsets, region_deviations, score, sweep_recording
+from recording import Recording, ReplayCapture
+
+rng = np.random.default_rng(7)
+
+
+def noisy_recording(count=12, height=24, width=32):
+    frames = np.empty((count, height, width, 3), dtype=np.uint8)
+    frames[:] = (40, 90, 200)
+    # Some frames drift a little from the base color, others are mostly replaced
+    for index in range(count):
+        noise = rng.integers(-12, 13, (height, width, 3))
+        frames[index] = np.clip(frames[index] + noise, 0, 255)
+        if index % 3 == 2:
+            frames[index, :height // 2] = rng.integers(0, 256, (height // 2, width, 3))
+    return Recording(frames, np.arange(count, dtype=np.int64) * 30_000_000, np.zeros(count, dtype=bool),
+                     (100, 50, width, height), ())
+
+
+def region_pixels(recording, region):
+    left, top = region.rect[0] - recording.bounds[0], region.rect[1] - recording.bounds[1]
+    return recording.frames[:, top:top + region.rect[3], left:left + region.rect[2]]
+
+
+@pytest.mark.parametrize("mode", ["rgb", "box", "hsv", "lab"])
+@pytest.mark.parametrize("extra_colors", [(), ((60, 60, 60), (200, 100, 30))])
+def test_region_deviations_match_the_live_classification(mode, extra_colors):
+    recording = noisy_recording()
+    region = RegionConfig((104, 54, 20, 16), (200, 90, 40), 10, match_mode=mode, extra_colors=extra_colors)
+    colors = (region.base_color,) + extra_colors
+    pixels = region_pixels(recording, region)
+    deviations = region_deviations(recording, region, mode)
+    for tolerance in (0, 5, 12, 40):
+        if mode == "rgb":
+            live = palette_mismatch_mask(pixels, colors, tolerance)
+        else:
+            live = color_table(colors, tolerance, mode)[table_index(pixels)]
+        assert np.array_equal(deviations > tolerance, live.reshape(len(pixels), -1))
+
+
+def test_mismatch_counts_cover_every_tolerance():
+    deviations = rng.uniform(0, 50, (6, 300))
+    deviations[:, :20] = np.round(deviations[:, :20])
+    counts = mismatch_counts(deviations, 40)
+    for tolerance in range(41):
+        assert np.array_equal(counts[:, tolerance], (deviations > tolerance).sum(axis=1))
+
+
+def test_debounce_matches_transition_filter():
+    changed = rng.random((200, 4)) < 0.4
+    for on_frames, off_frames in ((1, 1), (2, 1), (3, 4)):
+        states = debounce(changed, on_frames, off_frames)
+        for column in range(changed.shape[1]):
+            transition_filter = TransitionFilter(on_frames, off_frames)
+            for index, value in enumerate(changed[:, column]):
+                transition_filter.update(bool(value))
+                assert states[index, column] == transition_filter.state
+
+
+@pytest.mark.parametrize("mode", ["rgb", "lab"])
+def test_sweep_agrees_with_detect_change(mode):
+    recording = noisy_recording()
+    region = RegionConfig((100, 50, 32, 24), (200, 90, 40), 10, match_mode=mode)
+    tolerances, thresholds = [5, 15, 30], [1.0, 20.0]
+    active = sweep_recording(recording, [region], [mode], tolerances, thresholds)
+    # The live detector sees BGRA grabs, as replay serves them
+    capture = ReplayCapture(recording)
+    frames = [capture.grab(region.rect) for _ in range(len(recording.frames))]
+    for t, tolerance in enumerate(tolerances):
+        for h, threshold in enumerate(thresholds):
+            expected = [detect_change(frame, region.base_color, tolerance, threshold, match_mode=mode)
+                        for frame in frames]
+            assert active[0, t, h].tolist() == expected
+
+
+def test_onsets_and_score():
+    active = np.array([0, 1, 1, 0, 0, 1, 0, 1, 1, 1], dtype=bool)
+    assert onsets(active).tolist() == [1, 5, 7]
+    # The prediction at 9 is too late for the label at 2 and there is none for the label at 20
+    assert score(np.array([3, 9]), np.array([2, 8, 20]), window=2) == [(2, 3), (8, 9)]
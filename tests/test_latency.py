@@ -0,0 +1,47 @@
+import pytest
+
+from latency import LatencyHistogram, LatencyRecorder
+
+
+def test_bucket_index_grows_with_the_value():
+    histogram = LatencyHistogram()
+    values = sorted({int(1.07 ** k) for k in range(600)} | set(range(64)))
+    indices = [histogram._index(v) for v in values]
+    assert indices == sorted(indices)
+    assert indices[-1] < len(histogram.counts)
+
+
+@pytest.mark.parametrize("value", [0, 1, 15, 16, 17, 31, 32, 1000, 123_456, 9_999_999, 2 ** 35 + 12345])
+def test_single_sample_percentiles_are_within_a_sub_bucket(value):
+    histogram = LatencyHistogram()
+    histogram.record(value)
+    for percent in (1, 50, 99, 100):
+        assert abs(histogram.percentile(percent) - value) <= value / LatencyHistogram.SUB_BUCKETS
+
+
+def test_percentiles_of_a_spread():
+    histogram = LatencyHistogram()
+    for value in range(1, 10001):
+        histogram.record(value * 1000)
+    for percent in (50, 95, 99):
+        expected = percent * 100 * 1000
+        assert abs(histogram.percentile(percent) - expected) <= expected / LatencyHistogram.SUB_BUCKETS
+    assert histogram.percentile(100) == 10_000_000
+
+
+def test_empty_and_reset():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    histogram.record(500)
+    histogram.reset()
+    assert histogram.count == 0 and histogram.percentile(50) is None
+
+
+def test_recorder_splits_frames_into_stages():
+    recorder = LatencyRecorder()
+    for _ in range(3):
+        recorder.record_frame(capture_ns=0, grab_ns=1_000_000, analysis_ns=3_000_000)
+    summary = recorder.summary()
+    assert summary["grab"]["count"] == summary["analysis"]["count"] == 3
+    assert summary["grab"]["max"] == 1000 and summary["analysis"]["max"] == 2000
+    assert summary["total"]["count"] == 0 and summary["total"]["p50"] is None
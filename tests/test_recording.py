@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from engine import RegionConfig
+from recording import Recording
+
+rng = np.random.default_rng(3)
+
+
+def test_atr_round_trip(tmp_path):
+    regions = (
+        RegionConfig((10, 20, 16, 8), (1, 2, 3), 12, threshold_percent=3.5, scan_order="pyramid",
+                     on_frames=2, action="e", match_mode="lab", extra_colors=((9, 9, 9),)),
+        RegionConfig((30, 20, 4, 4), (0, 0, 0), 0, detector="motion", background_alpha=0.1),
+        RegionConfig((10, 24, 4, 4), (0, 0, 0), 0, detector="template",
+                     template=np.zeros((2, 2, 4), dtype=np.uint8)),
+    )
+    recording = Recording(rng.integers(0, 256, (5, 12, 24, 3), dtype=np.uint8),
+                          np.array([1, 5, 9, 2 ** 40, 2 ** 62], dtype=np.int64),
+                          np.array([False, True, True, False, True]), (10, 20, 24, 12), regions)
+    path = str(tmp_path / "frames.atr")
+    recording.save(path)
+    loaded = Recording.load(path)
+    assert np.array_equal(loaded.frames, recording.frames)
+    assert np.array_equal(loaded.capture_ns, recording.capture_ns)
+    assert np.array_equal(loaded.active, recording.active)
+    assert loaded.bounds == recording.bounds
+    # Template regions are not stored
+    assert loaded.regions == regions[:2]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "frames.atr"
+    path.write_bytes(b"not a recording" * 4)
+    with pytest.raises(ValueError):
+        Recording.load(str(path))
@@ -0,0 +1,58 @@
+from scheduler import AdaptiveScheduler, FrameScheduler
+
+
+def test_frame_scheduler_period():
+    scheduler = FrameScheduler(40)
+    assert scheduler.period_ns == 25_000_000
+    scheduler.set_rate(200)
+    assert scheduler.period_ns == 5_000_000
+
+
+def test_idles_after_the_quiet_period_and_bursts_on_activity():
+    scheduler = AdaptiveScheduler(100, idle_hz=5, quiet_s=0)
+    scheduler.report(False, 1_000_000)
+    assert scheduler.mode == AdaptiveScheduler.IDLE
+    assert scheduler.period_ns == 200_000_000
+    scheduler.report(True, 1_000_000)
+    assert scheduler.mode == AdaptiveScheduler.BURST
+    assert scheduler.period_ns == 10_000_000
+    # The first active frame is followed by an immediate one
+    assert scheduler.next_deadline is None
+
+
+def test_stays_in_burst_while_active_or_disabled():
+    scheduler = AdaptiveScheduler(100, idle_hz=5, quiet_s=60)
+    for _ in range(5):
+        scheduler.report(False, 1_000_000)
+    assert scheduler.mode == AdaptiveScheduler.BURST
+    disabled = AdaptiveScheduler(100, idle_hz=5, quiet_s=0, enabled=False)
+    disabled.report(False, 1_000_000)
+    assert disabled.mode == AdaptiveScheduler.BURST
+
+
+def test_configure_keeps_the_idle_rate_while_idle():
+    scheduler = AdaptiveScheduler(100, idle_hz=5, quiet_s=0)
+    scheduler.report(False, 1_000_000)
+    scheduler.configure(50, 10, 0)
+    assert scheduler.mode == AdaptiveScheduler.IDLE
+    assert scheduler.period_ns == 100_000_000
+    scheduler.report(True, 1_000_000)
+    assert scheduler.period_ns == 20_000_000
+
+
+def test_stats_report_the_mode():
+    scheduler = AdaptiveScheduler(100, idle_hz=5, quiet_s=0)
+    scheduler.report(False, 1_000_000)
+    stats = scheduler.stats()
+    assert stats["mode"] == "idle"
+    assert stats["idle_s"] >= 0 and stats["cpu_saved_s"] >= 0
+
+
+def test_wait_keeps_to_absolute_deadlines():
+    scheduler = FrameScheduler(200)
+    scheduler.wait()
+    start = scheduler.last_tick
+    for _ in range(10):
+        scheduler.wait()
+    # Ten periods of 5 ms; oversleeping one frame does not push the later ones back
+    assert 50_000_000 <= scheduler.last_tick - start < 80_000_000